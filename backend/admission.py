@@ -0,0 +1,281 @@
+"""Admission control for the API: rate limits and load shedding
+
+Two independent checks run before a request reaches its endpoint:
+
+RateLimiter keeps token buckets in Redis, one per API key (the X-API-Key
+header, or the client address without one) and one shared by everyone.
+A Lua script refills and debits all of a request's buckets atomically
+against Redis' clock, so every worker on every host enforces the same
+limits. A request over its own key's limit gets 429; one over the global
+limit gets 503. Both carry Retry-After.
+
+A request costs one token, except on the batch paths, where it costs one
+per decision or vote. Their endpoints charge the buckets themselves
+once the body is parsed, so the middleware leaves them alone. A request
+is admitted once every bucket holds its cost or is full, and it may
+then take the bucket below zero. A batch larger than the burst still
+gets through, but the key pays for it before anything else is admitted.
+
+ConcurrencyLimiter caps requests in progress per worker. Requests beyond
+the cap wait in a FIFO queue, but once the oldest waiter has been queued
+longer than the target delay, new arrivals are rejected at once with 503
+instead of joining a queue that is already too slow. Waiters that still
+get no slot within the timeout are rejected too. Rejecting early keeps
+the latency of admitted requests close to their service time.
+
+Only paths under the configured prefix are checked, so /health, /ready
+and /metrics always answer. Long-running paths (event streams, bulk
+import and export) are rate limited but do not hold a concurrency slot.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY_PREFIX = "ratelimit:"
+
+# Refill every bucket in KEYS from Redis' clock, then debit ARGV[1] tokens
+# from all of them, or from none if any bucket holds less than the cost
+# and is not full. A bucket can go negative. ARGV holds the rate (tokens
+# per second) and burst of each bucket after the cost.
+# Returns {allowed, retry_after_ms, index of the limiting bucket}.
+TOKEN_BUCKET_SCRIPT = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local levels = {}
+local wait = 0
+local limiting = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate / 1000)
+    levels[i] = tokens
+    local required = math.min(cost, burst)
+    if tokens < required then
+        local needed = math.ceil((required - tokens) * 1000 / rate)
+        if needed > wait then
+            wait = needed
+            limiting = i
+        end
+    end
+end
+if wait > 0 then
+    return {0, wait, limiting}
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local tokens = levels[i] - cost
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    -- Kept until it has refilled, which takes longer when it is in debt
+    redis.call('PEXPIRE', key, math.ceil((burst - tokens) * 1000 / rate) + 1000)
+end
+return {1, 0, 0}
+"""
+
+
+class Rejected(Exception):
+    """A request turned away by admission control"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float, reason: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class RateLimiter:
+    """Token buckets per API key and globally, shared through Redis
+
+    A rate of 0 disables that bucket.
+    """
+
+    def __init__(self, key_rate: float = 0, key_burst: float = 0, global_rate: float = 0, global_burst: float = 0):
+        self.key_rate = key_rate
+        self.key_burst = key_burst or key_rate
+        self.global_rate = global_rate
+        self.global_burst = global_burst or global_rate
+        self._script = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.key_rate > 0 or self.global_rate > 0
+
+    async def acquire(self, client: redis.Redis, api_key: str, cost: float = 1) -> None:
+        """Debit the caller's buckets or raise Rejected
+
+        If Redis cannot be reached the request is let through: a limiter
+        outage must not become an API outage.
+        """
+        keys, args, scopes = [], [cost], []
+        if self.key_rate > 0:
+            digest = hashlib.sha256(api_key.encode()).hexdigest()[:24]
+            keys.append(f"{BUCKET_KEY_PREFIX}key:{digest}")
+            args += [self.key_rate, self.key_burst]
+            scopes.append("key")
+        if self.global_rate > 0:
+            keys.append(f"{BUCKET_KEY_PREFIX}global")
+            args += [self.global_rate, self.global_burst]
+            scopes.append("global")
+        if not keys:
+            return
+
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        try:
+            allowed, retry_after_ms, limiting = await self._script(keys=keys, args=args)
+        except (redis.RedisError, OSError) as e:
+            logger.warning("Rate limiter unavailable, admitting request: %s", e)
+            return
+        if allowed:
+            return
+
+        retry_after = int(retry_after_ms) / 1000
+        if scopes[int(limiting) - 1] == "key":
+            raise Rejected(429, "Rate limit exceeded", retry_after, "key_rate_limit")
+        raise Rejected(503, "Service is at capacity", retry_after, "global_rate_limit")
+
+
+class ConcurrencyLimiter:
+    """Bounded in-flight requests with a FIFO queue that sheds on delay
+
+    A limit of 0 disables it.
+    """
+
+    def __init__(self, limit: int, target_delay: float = 0.1, timeout: float = 1.0):
+        self.limit = limit
+        self.target_delay = target_delay
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, waiter in self._waiters if not waiter.done())
+
+    def _oldest_wait(self, now: float) -> float:
+        while self._waiters and self._waiters[0][1].done():
+            self._waiters.popleft()
+        return now - self._waiters[0][0] if self._waiters else 0.0
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in line if needed, or raise Rejected"""
+        now = time.monotonic()
+        if self.active < self.limit and self._oldest_wait(now) == 0:
+            self.active += 1
+            return
+        if self._oldest_wait(now) > self.target_delay:
+            raise Rejected(503, "Server is overloaded", self.target_delay, "overloaded")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((now, waiter))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                raise Rejected(503, "Server is overloaded", self.timeout, "queue_timeout")
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        metrics.ADMISSION_QUEUE_WAIT.observe(time.monotonic() - now)
+
+    def release(self) -> None:
+        # Hand the slot straight to the next waiter so arrivals cannot jump the queue
+        while self._waiters:
+            _, waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def rate_limit_key(scope) -> str:
+    """Return the identity a request is rate limited under: its API key, or its client address"""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-api-key":
+            return "key:" + value.decode("latin-1")
+    client = scope.get("client")
+    return f"addr:{client[0]}" if client else "addr:unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying rate limits and the concurrency limit to API paths
+
+    Paths in `priced_per_item` are not rate limited here; their endpoints
+    charge the buckets by item count.
+    """
+
+    def __init__(self, app, rate_limiter: RateLimiter, concurrency: ConcurrencyLimiter,
+                 get_client: Callable[[], Optional[redis.Redis]], prefix: str = "/api/",
+                 long_running: Iterable[str] = (), priced_per_item: Iterable[str] = ()):
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.get_client = get_client
+        self.prefix = prefix
+        self.long_running = frozenset(long_running)
+        self.priced_per_item = frozenset(priced_per_item)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limit_concurrency = self.concurrency.limit > 0 and scope["path"] not in self.long_running
+        try:
+            client = self.get_client()
+            if self.rate_limiter.enabled and client is not None and scope["path"] not in self.priced_per_item:
+                await self.rate_limiter.acquire(client, rate_limit_key(scope))
+            if limit_concurrency:
+                await self.concurrency.acquire()
+        except Rejected as e:
+            metrics.ADMISSION_REJECTIONS.inc(e.reason)
+            await self._reject(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if limit_concurrency:
+                self.concurrency.release()
+
+    @staticmethod
+    async def _reject(send, rejection: Rejected) -> None:
+        body = json.dumps({"detail": rejection.detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": rejection.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *[(name.lower().encode(), value.encode()) for name, value in rejection.headers.items()],
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
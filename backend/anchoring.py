@@ -0,0 +1,424 @@
+"""Asynchronous anchoring of decisions on the NeurochainDecision contract
+
+create_decision appends each decision to a Redis Stream. A pool of consumer
+tasks in every API worker reads the stream through a consumer group,
+submits decisions to the chain in batches with retry and exponential
+backoff, and reports each batch's confirmations back so the decision
+statuses can be updated. Request latency therefore never depends on the
+chain.
+
+Each decision is handled on its own within a batch. One the contract would
+refuse is dead-lettered before anything is sent, and one whose transaction
+reverts is dead-lettered alone; the rest of the batch is still anchored.
+The hash of every transaction sent is saved in Redis before its receipt
+is awaited, so a retry, or a worker reclaiming the entry after a crash,
+waits for that transaction instead of recording the decision twice. Only
+decisions that were never sent are sent again.
+
+Entries still unconfirmed after ANCHOR_MAX_ATTEMPTS attempts are moved to
+a dead-letter stream, with their transaction hash when one was sent.
+Entries left pending by a crashed worker are reclaimed after
+ANCHOR_CLAIM_IDLE seconds.
+
+The stream has no MAXLEN: trimming by length would drop entries that no
+worker has acknowledged yet. An entry is deleted in the same transaction
+that acknowledges it instead, so the stream only ever holds decisions
+still waiting to be anchored.
+
+Two chain backends are provided: MockDecisionChain, an in-process stand-in
+that enforces the contract's checks, and Web3DecisionChain for a Hardhat
+node or any EVM RPC endpoint.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import socket
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "anchor:stream"
+DEAD_LETTER_KEY = "anchor:dead"
+GROUP_NAME = "anchorers"
+# Stream entry ID -> hash of the transaction sent for it, until the entry is acknowledged
+SENT_KEY = "anchor:sent"
+
+# Only the function the anchoring worker calls is needed from the contract ABI
+RECORD_DECISION_ABI = [{
+    "type": "function",
+    "name": "recordDecision",
+    "stateMutability": "nonpayable",
+    "inputs": [
+        {"name": "question", "type": "string"},
+        {"name": "reasoning", "type": "string"},
+        {"name": "decision", "type": "string"},
+        {"name": "confidence", "type": "uint256"}
+    ],
+    "outputs": [{"name": "", "type": "bytes32"}]
+}]
+
+
+class ChainSubmissionError(Exception):
+    """A decision the chain refused; sending it again would fail the same way"""
+
+
+def contract_error(item: dict) -> Optional[str]:
+    """Return why NeurochainDecision.recordDecision would revert for this item, or None"""
+    if not item["question"] or not item["reasoning"] or not item["decision"]:
+        return "Question, reasoning and decision cannot be empty"
+    if not 0 <= item["confidence"] <= 100:
+        return "Confidence must be <= 100"
+    return None
+
+
+class MockDecisionChain:
+    """In-process stand-in for NeurochainDecision.recordDecision
+
+    Applies the contract's require() checks and can simulate block latency
+    and transient RPC failures for testing the retry path. A decision is
+    recorded as soon as it is sent.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.decisions: Dict[str, dict] = {}
+
+    async def _call(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("Simulated RPC failure")
+
+    async def send_batch(self, items: List[dict]) -> List[Union[str, Exception]]:
+        await self._call()
+        results = []
+        for item in items:
+            error = contract_error(item)
+            if error:
+                results.append(ChainSubmissionError(error))
+                continue
+            tx_hash = "0x" + hashlib.sha256(
+                f"{item['id']}:{item['block_hash']}:{len(self.decisions)}".encode()
+            ).hexdigest()
+            self.decisions[tx_hash] = item
+            results.append(tx_hash)
+        return results
+
+    async def wait_batch(self, tx_hashes: List[str]) -> List[Optional[Exception]]:
+        await self._call()
+        return [None if tx_hash in self.decisions else ChainSubmissionError(f"Unknown transaction {tx_hash}")
+                for tx_hash in tx_hashes]
+
+
+class Web3DecisionChain:
+    """Submit decisions to a deployed NeurochainDecision contract over JSON-RPC
+
+    Transactions in a batch are signed with consecutive nonces and sent
+    back to back, then their receipts are awaited together. Requires the
+    optional `web3` package.
+
+    Both steps report per transaction. Sending stops at the first failure,
+    since later nonces would leave a gap, and the unsent rest get that
+    error. A receipt that is not available in time is reported as a
+    timeout rather than a failure: the transaction may still be mined.
+    """
+
+    def __init__(self, rpc_url: str, contract_address: str, private_key: str,
+                 receipt_timeout: float = 120):
+        from web3 import AsyncHTTPProvider, AsyncWeb3
+
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(rpc_url))
+        self.account = self.w3.eth.account.from_key(private_key)
+        self.contract = self.w3.eth.contract(
+            address=AsyncWeb3.to_checksum_address(contract_address),
+            abi=RECORD_DECISION_ABI
+        )
+        self.receipt_timeout = receipt_timeout
+        self._nonce_lock = asyncio.Lock()
+
+    async def send_batch(self, items: List[dict]) -> List[Union[str, Exception]]:
+        results: List[Union[str, Exception]] = []
+        async with self._nonce_lock:
+            nonce = await self.w3.eth.get_transaction_count(self.account.address, "pending")
+            chain_id = await self.w3.eth.chain_id
+            for offset, item in enumerate(items):
+                try:
+                    transaction = await self.contract.functions.recordDecision(
+                        item["question"], item["reasoning"], item["decision"], item["confidence"]
+                    ).build_transaction({
+                        "from": self.account.address,
+                        "nonce": nonce + offset,
+                        "chainId": chain_id
+                    })
+                    signed = self.account.sign_transaction(transaction)
+                    tx_hash = await self.w3.eth.send_raw_transaction(signed.raw_transaction)
+                except Exception as e:
+                    results += [e] * (len(items) - offset)
+                    break
+                results.append("0x" + tx_hash.hex().removeprefix("0x"))
+        return results
+
+    async def wait_batch(self, tx_hashes: List[str]) -> List[Optional[Exception]]:
+        receipts = await asyncio.gather(*[
+            self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+            for tx_hash in tx_hashes
+        ], return_exceptions=True)
+        results: List[Optional[Exception]] = []
+        for tx_hash, receipt in zip(tx_hashes, receipts):
+            if isinstance(receipt, Exception):
+                results.append(receipt)
+            elif receipt["status"] != 1:
+                results.append(ChainSubmissionError(f"Transaction {tx_hash} reverted"))
+            else:
+                results.append(None)
+        return results
+
+
+def create_chain_from_env():
+    """Build the chain backend selected by ANCHOR_BACKEND, or None when disabled"""
+    backend = os.getenv("ANCHOR_BACKEND", "disabled").lower()
+    if backend == "mock":
+        return MockDecisionChain(
+            latency=float(os.getenv("ANCHOR_MOCK_LATENCY", 0.05)),
+            failure_rate=float(os.getenv("ANCHOR_MOCK_FAILURE_RATE", 0))
+        )
+    if backend == "web3":
+        return Web3DecisionChain(
+            rpc_url=os.getenv("ANCHOR_RPC_URL", "http://127.0.0.1:8545"),
+            contract_address=os.environ["ANCHOR_CONTRACT_ADDRESS"],
+            private_key=os.environ["ANCHOR_PRIVATE_KEY"]
+        )
+    return None
+
+
+class AnchoringPipeline:
+    def __init__(self, chain, workers: int = 2, batch_size: int = 20, max_attempts: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30, claim_idle: float = 60,
+                 block_ms: int = 1000):
+        self.chain = chain
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.claim_idle = claim_idle
+        self.block_ms = block_ms
+
+        self._tasks: List[asyncio.Task] = []
+
+        self.anchored = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.chain is not None
+
+    def enqueue(self, pipe: redis.client.Pipeline, records: List[dict]) -> None:
+        """Queue created decisions for anchoring"""
+        if not self.enabled:
+            return
+        enqueued_at = str(time.time())
+        for record in records:
+            pipe.xadd(STREAM_KEY, {
+                "id": record["id"],
+                "question": record["question"],
+                "reasoning": record["reasoning"],
+                "decision": record["decision"],
+                "confidence": str(record["confidence"]),
+                "block_hash": record["block_hash"],
+                "enqueued_at": enqueued_at
+            })
+
+    def start(self, client: redis.Redis, on_confirmed: Callable[[Dict[str, str]], Awaitable[None]]) -> None:
+        """Start the worker tasks for this process
+
+        `on_confirmed` is called once per confirmed batch with a dict of
+        decision ID to transaction hash.
+        """
+        if not self.enabled:
+            return
+        consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._consume(client, f"{consumer_prefix}-{index}", on_confirmed))
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; unacknowledged entries are reclaimed later"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self, client: redis.Redis, consumer: str,
+                       on_confirmed: Callable[[Dict[str, str]], Awaitable[None]]) -> None:
+        group_ready = False
+        while True:
+            try:
+                if not group_ready:
+                    await self._ensure_group(client)
+                    group_ready = True
+
+                # Reclaim entries abandoned by crashed consumers before reading new ones
+                claimed = await client.xautoclaim(
+                    STREAM_KEY, GROUP_NAME, consumer, int(self.claim_idle * 1000), "0-0", count=self.batch_size
+                )
+                entries = claimed[1]
+                if not entries:
+                    response = await client.xreadgroup(
+                        GROUP_NAME, consumer, {STREAM_KEY: ">"}, count=self.batch_size, block=self.block_ms
+                    )
+                    entries = response[0][1] if response else []
+                if entries:
+                    await self._process(client, entries, on_confirmed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Anchoring worker %s failed", consumer)
+                await asyncio.sleep(self.backoff_base)
+
+    async def _ensure_group(self, client: redis.Redis) -> None:
+        try:
+            await client.xgroup_create(STREAM_KEY, GROUP_NAME, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _process(self, client: redis.Redis, entries: list,
+                       on_confirmed: Callable[[Dict[str, str]], Awaitable[None]]) -> None:
+        items = []
+        for entry_id, fields in entries:
+            item = dict(fields)
+            item["entry_id"] = entry_id
+            item["confidence"] = int(round(float(item["confidence"])))
+            items.append(item)
+
+        # Transactions already sent for these entries, by an earlier attempt or another worker
+        sent = await client.hmget(SENT_KEY, [item["entry_id"] for item in items])
+        for item, tx_hash in zip(items, sent):
+            item["tx_hash"] = tx_hash
+
+        confirmed: List[dict] = []
+        refused: List[tuple] = []
+        pending = []
+        for item in items:
+            error = contract_error(item) if not item["tx_hash"] else None
+            if error:
+                refused.append((item, error))
+            else:
+                pending.append(item)
+
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                unsent = [item for item in pending if not item["tx_hash"]]
+                if unsent:
+                    results = await self.chain.send_batch(unsent)
+                    hashes = {}
+                    for item, result in zip(unsent, results):
+                        if isinstance(result, str):
+                            item["tx_hash"] = hashes[item["entry_id"]] = result
+                        elif isinstance(result, ChainSubmissionError):
+                            refused.append((item, str(result)))
+                        else:
+                            error = result
+                    if hashes:
+                        await client.hset(SENT_KEY, mapping=hashes)
+
+                waiting = [item for item in pending if item["tx_hash"]]
+                if waiting:
+                    results = await self.chain.wait_batch([item["tx_hash"] for item in waiting])
+                    for item, result in zip(waiting, results):
+                        if result is None:
+                            confirmed.append(item)
+                        elif isinstance(result, ChainSubmissionError):
+                            refused.append((item, str(result)))
+                        else:
+                            error = result
+            except Exception as e:
+                error = e
+
+            done = {item["entry_id"] for item in confirmed} | {item["entry_id"] for item, _ in refused}
+            pending = [item for item in pending if item["entry_id"] not in done]
+            if not pending:
+                break
+            self.failed_attempts += 1
+            if attempt < self.max_attempts:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        dead = refused + [(item, f"Not confirmed after {self.max_attempts} attempts: {error}") for item in pending]
+        if dead:
+            logger.error("Giving up anchoring %d of %d decisions: %s", len(dead), len(items), dead[0][1])
+            await self._dead_letter(client, dead)
+        if not confirmed:
+            return
+
+        await on_confirmed({item["id"]: item["tx_hash"] for item in confirmed})
+        now = time.time()
+        for item in confirmed:
+            lag = now - float(item["enqueued_at"])
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag
+            self.anchored += 1
+
+        async with client.pipeline(transaction=True) as pipe:
+            self._acknowledge(pipe, confirmed)
+            await pipe.execute()
+
+    @staticmethod
+    def _acknowledge(pipe: redis.client.Pipeline, items: List[dict]) -> None:
+        # Acknowledged entries are done with, so they are deleted rather than left for trimming
+        entry_ids = [item["entry_id"] for item in items]
+        pipe.xack(STREAM_KEY, GROUP_NAME, *entry_ids)
+        pipe.xdel(STREAM_KEY, *entry_ids)
+        pipe.hdel(SENT_KEY, *entry_ids)
+
+    async def _dead_letter(self, client: redis.Redis, failures: List[tuple]) -> None:
+        """Move (item, error) pairs to the dead-letter stream"""
+        async with client.pipeline(transaction=True) as pipe:
+            for item, error in failures:
+                pipe.xadd(DEAD_LETTER_KEY, {
+                    "id": item["id"], "entry_id": item["entry_id"], "error": error, "tx_hash": item["tx_hash"] or ""
+                })
+            self._acknowledge(pipe, [item for item, _ in failures])
+            await pipe.execute()
+        self.dead_lettered += len(failures)
+
+    async def metrics(self, client: redis.Redis) -> dict:
+        """Return queue depth and anchoring lag"""
+        result = {
+            "enabled": self.enabled,
+            "queue_depth": 0,
+            "in_flight": 0,
+            "dead_letter": 0,
+            "anchored": self.anchored,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3),
+            "average_lag_seconds": round(self._lag_total / self.anchored, 3) if self.anchored else 0
+        }
+        if not self.enabled:
+            return result
+
+        groups = await client.xinfo_groups(STREAM_KEY)
+        for group in groups:
+            if group["name"] == GROUP_NAME:
+                # lag is entries not yet delivered, pending is delivered but unacknowledged
+                result["queue_depth"] = (group.get("lag") or 0) + group["pending"]
+                result["in_flight"] = group["pending"]
+        result["dead_letter"] = await client.xlen(DEAD_LETTER_KEY)
+        return result
@@ -0,0 +1,81 @@
+"""Compare tail latency under overload with and without the concurrency limiter
+
+create_decision requests arrive at a fixed rate, above what one worker
+can serve, through the in-process ASGI client. Redis round trips get a
+simulated network delay so requests overlap the way they do against a
+real server. /metrics is polled throughout to show that unlimited paths
+stay responsive.
+
+Usage (from backend/):
+    python -m benchmarks.bench_admission [--rate 600] [--duration 2] [--limit 20] [--rtt-ms 2]
+"""
+import argparse
+import asyncio
+import time
+
+import main
+from benchmarks.common import RoundTripCounter, asgi_client, create_benchmark_redis, sample_questions, summarize
+
+
+async def overload(client, questions, rate: float) -> dict:
+    admitted, rejected, health = [], 0, []
+    done = asyncio.Event()
+
+    async def create(question):
+        nonlocal rejected
+        start = time.perf_counter()
+        response = await client.post("/api/decisions", json={"question": question})
+        if response.status_code == 200:
+            admitted.append((time.perf_counter() - start) * 1000)
+        else:
+            rejected += 1
+
+    async def poll_health():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/metrics")
+            health.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    poller = asyncio.create_task(poll_health())
+    requests = []
+    start = time.perf_counter()
+    for i, question in enumerate(questions):
+        # Open loop: arrivals keep their schedule however slow responses get
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        requests.append(asyncio.create_task(create(question)))
+    await asyncio.gather(*requests)
+    done.set()
+    await poller
+
+    result = {"admitted": len(admitted), "rejected": rejected}
+    result.update({f"admitted_{name}": value for name, value in summarize(admitted).items()})
+    result.update({f"metrics_{name}": value for name, value in summarize(health).items()})
+    return result
+
+
+async def run(args) -> None:
+    main.redis_client = create_benchmark_redis()
+    await main.redis_client.flushdb()
+    questions = sample_questions(int(args.rate * args.duration))
+
+    async with asgi_client(main.app) as client:
+        with RoundTripCounter(args.rtt_ms):
+            for limit in (0, args.limit):
+                main.concurrency_limiter.limit = limit
+                result = await overload(client, questions, args.rate)
+                label = f"limit={limit}" if limit else "unlimited"
+                print(f"{label:>10} " + " ".join(f"{name}={value}" for name, value in result.items()))
+    await main.redis_client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=600, help="arrivals per second")
+    parser.add_argument("--duration", type=float, default=2, help="seconds of arrivals")
+    parser.add_argument("--limit", type=int, default=20, help="MAX_CONCURRENT_REQUESTS for the limited run")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="simulated Redis round-trip time")
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,62 @@
+"""Compare single-decision POSTs with the batch endpoint
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch_throughput [--count 2000] [--batch-size 100] [--rtt-ms 0.2]
+"""
+import argparse
+import asyncio
+import time
+
+import main
+from benchmarks.common import RoundTripCounter, asgi_client, create_benchmark_redis, sample_questions
+
+
+def check_equivalence(questions) -> None:
+    """analyze_batch must return exactly what analyze_question returns per item"""
+    batch = main.ai_engine.analyze_batch(questions)
+    single = [main.ai_engine.analyze_question(question) for question in questions]
+    assert batch == single, "analyze_batch diverged from analyze_question"
+
+
+async def run(count: int, batch_size: int, rtt_ms: float) -> None:
+    questions = sample_questions(count)
+    check_equivalence(questions)
+
+    main.redis_client = create_benchmark_redis()
+    await main.redis_client.flushdb()
+
+    async with asgi_client(main.app) as client:
+        with RoundTripCounter(rtt_ms) as counter:
+            start = time.perf_counter()
+            for question in questions:
+                response = await client.post("/api/decisions", json={"question": question})
+                response.raise_for_status()
+            single_elapsed = time.perf_counter() - start
+            single_round_trips = counter.count
+
+            counter.reset()
+            start = time.perf_counter()
+            for offset in range(0, count, batch_size):
+                chunk = questions[offset:offset + batch_size]
+                response = await client.post(
+                    "/api/decisions/batch",
+                    json={"decisions": [{"question": question} for question in chunk]}
+                )
+                response.raise_for_status()
+            batch_elapsed = time.perf_counter() - start
+            batch_round_trips = counter.count
+
+    await main.redis_client.aclose()
+
+    print(f"{'path':>8} {'decisions/s':>12} {'redis round trips':>18}")
+    print(f"{'single':>8} {count / single_elapsed:>12.0f} {single_round_trips:>18}")
+    print(f"{'batch':>8} {count / batch_elapsed:>12.0f} {batch_round_trips:>18}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated network round-trip time")
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.batch_size, args.rtt_ms))
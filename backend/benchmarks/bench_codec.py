@@ -0,0 +1,88 @@
+"""Compare the JSON and msgpack record codecs
+
+Reports bytes per record, Redis memory for 100k decisions and
+encode/decode throughput, including Decision model construction.
+
+Usage (from backend/):
+    python -m benchmarks.bench_codec [--records 10000]
+
+Memory is measured with INFO when REDIS_URL points at a real server;
+otherwise it is estimated from payload sizes alone.
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import main
+from benchmarks.common import create_benchmark_redis, sample_questions
+from record_codec import JSONCodec, MsgpackCodec, StringTable, decode_records
+
+MEMORY_SAMPLE = 100000
+
+
+def build_records(count: int) -> list:
+    timestamp = datetime.now().isoformat()
+    return [
+        main.build_decision_record(f"decision_{i}", timestamp, question, main.ai_engine.analyze_question(question))
+        for i, question in enumerate(sample_questions(count))
+    ]
+
+
+async def measure_memory(client, codec, records) -> int:
+    """Bytes of Redis memory used by MEMORY_SAMPLE records written with codec"""
+    await client.flushdb()
+    before = (await client.info("memory"))["used_memory"]
+    for offset in range(0, MEMORY_SAMPLE, 1000):
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(offset, offset + 1000):
+                record = dict(records[i % len(records)], id=f"decision_{i}")
+                pipe.setex(f"decision:{record['id']}", 3600, await codec.encode(client, record))
+            await pipe.execute()
+    used = (await client.info("memory"))["used_memory"] - before
+    await client.flushdb()
+    return used
+
+
+async def run(count: int) -> None:
+    client = create_benchmark_redis()
+    await client.flushdb()
+    records = build_records(count)
+    strings = StringTable()
+    codecs = [JSONCodec(), MsgpackCodec(strings, main.ai_engine)]
+
+    # Warm the string table so encode timings exclude first-time interning
+    await codecs[1].encode(client, records[0])
+    for record in records:
+        await codecs[1].encode(client, record)
+
+    print(f"{'codec':>8} {'bytes/rec':>10} {'MB/100k':>9} {'encode rec/s':>13} {'decode rec/s':>13}")
+    for codec in codecs:
+        start = time.perf_counter()
+        payloads = [await codec.encode(client, record) for record in records]
+        encode_rate = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decoded = await decode_records(client, strings, payloads)
+        models = [main.Decision(**record) for record in decoded]
+        decode_rate = count / (time.perf_counter() - start)
+        assert decoded == records and len(models) == count, f"{codec.name} did not round-trip"
+
+        bytes_per_record = sum(map(len, payloads)) / count
+        if os.getenv("REDIS_URL"):
+            memory = await measure_memory(client, codec, records)
+        else:
+            memory = bytes_per_record * MEMORY_SAMPLE
+        print(f"{codec.name:>8} {bytes_per_record:>10.1f} {memory / 1e6:>9.1f} {encode_rate:>13.0f} {decode_rate:>13.0f}")
+
+    if not os.getenv("REDIS_URL"):
+        print("MB/100k is a payload-only estimate; set REDIS_URL to measure real Redis memory")
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(run(args.records))
@@ -0,0 +1,55 @@
+"""Compare per-key reads with the bulk MGET path used by the read endpoints
+
+Usage (from backend/):
+    python -m benchmarks.bench_decision_reads [--rtt-ms 0.5] [--iterations 200]
+"""
+import argparse
+import asyncio
+
+import main
+from benchmarks.common import RoundTripCounter, create_benchmark_redis, time_async
+
+LIMITS = [1, 10, 25, 50, 100]
+
+
+async def seed(count: int) -> None:
+    for i in range(count):
+        await main.create_decision(main.DecisionRequest(question=f"Should we approve loan application {i}?"))
+
+
+async def per_key_reads(limit: int) -> list:
+    """The previous access pattern: one GET per decision ID"""
+    decision_ids = await main.redis_client.lrange("recent_decisions", 0, limit - 1)
+    decisions = []
+    for decision_id in decision_ids:
+        decision_dict = await main.read_decision(decision_id)
+        if decision_dict:
+            decisions.append(main.Decision(**decision_dict))
+    return decisions
+
+
+async def run(rtt_ms: float, iterations: int) -> None:
+    main.redis_client = create_benchmark_redis()
+    await main.redis_client.flushdb()
+    await seed(max(LIMITS))
+
+    print(f"{'limit':>6} {'path':>8} {'round trips':>12} {'mean ms':>10} {'p99 ms':>10}")
+    with RoundTripCounter(rtt_ms) as counter:
+        for limit in LIMITS:
+            for name, fn in (("per-key", per_key_reads), ("mget", main.get_decisions)):
+                await fn(limit)  # warm up connections
+                counter.reset()
+                await fn(limit)
+                round_trips = counter.count
+                timings = await time_async(lambda: fn(limit), iterations)
+                print(f"{limit:>6} {name:>8} {round_trips:>12} {timings['mean_ms']:>10} {timings['p99_ms']:>10}")
+
+    await main.redis_client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated network round-trip time")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.rtt_ms, args.iterations))
@@ -0,0 +1,67 @@
+"""Microbenchmark the compiled keyword matcher against per-keyword substring scans
+
+Usage (from backend/):
+    python -m benchmarks.bench_keyword_matcher [--number 20000]
+"""
+import argparse
+import random
+import timeit
+
+import main
+from benchmarks.common import SAMPLE_QUESTIONS
+
+engine = main.ai_engine
+
+
+def legacy_score(question: str) -> tuple:
+    """The previous implementation: one `in` scan per keyword"""
+    question_lower = question.lower()
+    category = "general"
+    for name, config in engine.decision_categories.items():
+        if any(keyword in question_lower for keyword in config["keywords"]):
+            category = name
+            break
+    return (
+        category,
+        sum(1 for keyword in engine.approval_keywords if keyword in question_lower),
+        sum(1 for keyword in engine.rejection_keywords if keyword in question_lower),
+        sum(1 for keyword in engine.conditional_keywords if keyword in question_lower),
+    )
+
+
+def check_equivalence(samples: int = 20000) -> None:
+    """Fuzz both implementations with keyword fragments glued together"""
+    rng = random.Random(0)
+    vocabulary = [
+        keyword
+        for config in engine.decision_categories.values()
+        for keyword in config["keywords"]
+    ] + engine.approval_keywords + engine.rejection_keywords + engine.conditional_keywords
+    vocabulary += ["dis", "un", "ing", "ed", " ", "the", "LOAN", "Review", "s"]
+    for _ in range(samples):
+        question = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12)))
+        assert engine._score_question(question) == legacy_score(question), question
+
+
+def main_benchmark(number: int) -> None:
+    inputs = (
+        ("short", SAMPLE_QUESTIONS[0]),
+        ("medium", " ".join(SAMPLE_QUESTIONS[:3])),
+        ("long", "Background: the applicant has provided several documents. " * 40 + SAMPLE_QUESTIONS[0]),
+        ("dense", " ".join(SAMPLE_QUESTIONS * 25)),
+    )
+
+    print(f"{'input':>6} {'chars':>6} {'legacy us':>10} {'compiled us':>12}")
+    for name, question in inputs:
+        # Best of five runs to reduce scheduler noise
+        legacy = min(timeit.repeat(lambda: legacy_score(question), number=number, repeat=5)) / number * 1e6
+        compiled = min(timeit.repeat(lambda: engine._score_question(question), number=number, repeat=5)) / number * 1e6
+        print(f"{name:>6} {len(question):>6} {legacy:>10.2f} {compiled:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    check_equivalence()
+    main_benchmark(args.number)
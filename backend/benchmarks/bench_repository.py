@@ -0,0 +1,109 @@
+"""Measure decision history query latency on a large SQLite repository
+
+Seeds the repository with --records decisions spread over the past year
+(10M by default, about 9 GB on disk) and reports p50/p99 latency for
+the queries GET /api/decisions issues: the newest page, each indexed
+filter, a time window and a page deep into the history via its cursor.
+
+Usage (from backend/):
+    python -m benchmarks.bench_repository [--records 10000000] [--db bench_decisions.db]
+
+Seeding is skipped when the database already holds enough records, so
+repeated runs against the same --db only pay for it once.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+
+import main
+from benchmarks.common import sample_questions, time_async
+from decision_repository import SQLiteDecisionRepository
+from ids import encode_ulid
+
+SEED_BATCH = 50000
+TEMPLATES = 1000
+YEAR_MS = 365 * 24 * 3600 * 1000
+STATUSES = ("pending", "anchored", "validated")
+
+
+def build_templates() -> list:
+    timestamp = datetime.now().isoformat()
+    return [
+        main.build_decision_record("", timestamp, question, main.ai_engine.analyze_question(question))
+        for question in sample_questions(TEMPLATES)
+    ]
+
+
+def seed(repository: SQLiteDecisionRepository, count: int) -> None:
+    existing = repository._writer.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+    if existing >= count:
+        print(f"Using {existing} existing records")
+        return
+
+    templates = build_templates()
+    rng = random.Random(0)
+    end_ms = int(time.time() * 1000)
+    step = YEAR_MS / count
+    start = time.perf_counter()
+    for offset in range(existing, count, SEED_BATCH):
+        batch = []
+        for i in range(offset, min(count, offset + SEED_BATCH)):
+            created_ms = end_ms - YEAR_MS + int(i * step)
+            record = dict(templates[i % TEMPLATES])
+            record["id"] = f"decision_{encode_ulid((created_ms << 80) | rng.getrandbits(80))}"
+            record["timestamp"] = datetime.fromtimestamp(created_ms / 1000).isoformat()
+            record["status"] = STATUSES[rng.randrange(3)]
+            # Spread the template scores so narrow confidence ranges are rare, as in real traffic
+            record["confidence"] = round(min(95, max(50, record["confidence"] + rng.gauss(0, 4))), 1)
+            batch.append(record)
+        repository._save_many(batch)
+
+        done = min(count, offset + SEED_BATCH)
+        rate = (done - existing) / (time.perf_counter() - start)
+        print(f"\rSeeded {done}/{count} ({rate:.0f} rec/s)", end="", flush=True)
+    print()
+
+
+async def run(count: int, db_path: str, iterations: int) -> None:
+    repository = SQLiteDecisionRepository(db_path)
+    seed(repository, count)
+
+    # A cursor roughly nine tenths of the way back through the history
+    deep_cursor = repository._writer.execute(
+        "SELECT id FROM decisions ORDER BY id LIMIT 1 OFFSET ?", (count // 10,)
+    ).fetchone()[0]
+    month_ago = datetime.fromtimestamp(time.time() - 30 * 24 * 3600)
+    week_ago = datetime.fromtimestamp(time.time() - 7 * 24 * 3600)
+
+    scenarios = {
+        "newest page": {},
+        "category": {"category": "medical"},
+        "status": {"status": "validated"},
+        "category + status": {"category": "financial", "status": "pending"},
+        "broad confidence": {"min_confidence": 60},
+        "narrow confidence": {"min_confidence": 94},
+        "time window": {"since": month_ago, "until": week_ago},
+        "deep cursor": {"cursor": deep_cursor},
+        "deep cursor + category": {"cursor": deep_cursor, "category": "legal"},
+    }
+
+    print(f"{'query (limit 50)':>24} {'rows':>5} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, filters in scenarios.items():
+        records, _ = await repository.query(limit=50, **filters)
+        result = await time_async(lambda: repository.query(limit=50, **filters), iterations)
+        print(f"{name:>24} {len(records):>5} {result['mean_ms']:>9.3f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}")
+
+    await repository.close()
+    print(f"Database size: {os.path.getsize(db_path) / 1e9:.2f} GB ({db_path})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000000)
+    parser.add_argument("--db", default="bench_decisions.db")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.records, args.db, args.iterations))
@@ -0,0 +1,239 @@
+"""Microbenchmark the compiled decision policy against the original branchy rules
+
+The legacy engine below is the hard-coded implementation the policy file
+replaced, kept verbatim so both can be fuzzed for identical results.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rule_engine [--number 20000]
+"""
+import argparse
+import random
+import timeit
+
+import main
+from benchmarks.common import SAMPLE_QUESTIONS
+
+engine = main.ai_engine
+
+
+class LegacyEngine:
+    """The previous implementation: `if category == ...` chains evaluated per request"""
+
+    def __init__(self):
+        self.ethical_guidelines = engine.ethical_guidelines
+        # Categories other than "general" carried their own rules
+        self.decision_categories = {
+            name: config for name, config in engine.decision_categories.items() if name != "general"
+        }
+
+    def _build_analysis(self, question: str, category: str, approval_score: int, rejection_score: int, conditional_score: int) -> dict:
+        # Category-specific decision logic
+        if category in self.decision_categories:
+            config = self.decision_categories[category]
+            considerations = config["considerations"]
+            confidence_factors = config["confidence_factors"]
+
+            # Enhanced decision logic based on category
+            if category == "financial":
+                decision, reasoning = self._analyze_financial_decision(question, approval_score, rejection_score, conditional_score)
+            elif category == "medical":
+                decision, reasoning = self._analyze_medical_decision(question, approval_score, rejection_score, conditional_score)
+            elif category == "legal":
+                decision, reasoning = self._analyze_legal_decision(question, approval_score, rejection_score, conditional_score)
+            elif category == "content":
+                decision, reasoning = self._analyze_content_decision(question, approval_score, rejection_score, conditional_score)
+            elif category == "hiring":
+                decision, reasoning = self._analyze_hiring_decision(question, approval_score, rejection_score, conditional_score)
+            elif category == "safety":
+                decision, reasoning = self._analyze_safety_decision(question, approval_score, rejection_score, conditional_score)
+            else:
+                decision, reasoning = self._analyze_general_decision(question, approval_score, rejection_score, conditional_score)
+        else:
+            decision, reasoning = self._analyze_general_decision(question, approval_score, rejection_score, conditional_score)
+            considerations = ["General best practices", "Risk assessment", "Stakeholder impact"]
+            confidence_factors = ["Information completeness", "Decision clarity", "Context availability"]
+
+        # Add ethical considerations
+        ethical_considerations = self._get_ethical_considerations(category)
+        reasoning += f" Ethical considerations: {', '.join(ethical_considerations)}."
+
+        # Calculate confidence based on multiple factors
+        confidence = self._calculate_confidence(approval_score, rejection_score, conditional_score, category, question)
+
+        return {
+            "decision": decision,
+            "reasoning": reasoning,
+            "confidence": confidence,
+            "category": category
+        }
+
+    def _analyze_financial_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0 or abs(approval_score - rejection_score) <= 1:
+            decision = "APPROVE WITH CONDITIONS"
+            reasoning = f"Financial decision analysis: {question}. Requires additional documentation or risk mitigation measures."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Financial decision analysis: {question}. All criteria met with acceptable risk profile."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Financial decision analysis: {question}. Risk factors exceed acceptable thresholds."
+        return decision, reasoning
+
+    def _analyze_medical_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "REQUIRE ADDITIONAL TESTING"
+            reasoning = f"Medical decision analysis: {question}. Insufficient information for confident diagnosis."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Medical decision analysis: {question}. Evidence supports the proposed course of action."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Medical decision analysis: {question}. Evidence does not support the proposed course of action."
+        return decision, reasoning
+
+    def _analyze_legal_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "REQUIRE LEGAL REVIEW"
+            reasoning = f"Legal decision analysis: {question}. Complex legal considerations require expert review."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Legal decision analysis: {question}. Complies with applicable laws and regulations."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Legal decision analysis: {question}. Does not comply with applicable laws and regulations."
+        return decision, reasoning
+
+    def _analyze_content_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "FLAG FOR MANUAL REVIEW"
+            reasoning = f"Content decision analysis: {question}. Content requires human review for context."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Content decision analysis: {question}. Content meets community guidelines."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Content decision analysis: {question}. Content violates community guidelines."
+        return decision, reasoning
+
+    def _analyze_hiring_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "REQUIRE ADDITIONAL INTERVIEWS"
+            reasoning = f"Hiring decision analysis: {question}. Candidate shows potential but needs further evaluation."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Hiring decision analysis: {question}. Candidate meets all requirements and is a good fit."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Hiring decision analysis: {question}. Candidate does not meet requirements or is not a good fit."
+        return decision, reasoning
+
+    def _analyze_safety_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "IMPLEMENT SAFETY MEASURES"
+            reasoning = f"Safety decision analysis: {question}. Proceed with additional safety protocols."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"Safety decision analysis: {question}. Safety requirements are met."
+        else:
+            decision = "REJECTED"
+            reasoning = f"Safety decision analysis: {question}. Safety requirements are not met."
+        return decision, reasoning
+
+    def _analyze_general_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
+        if conditional_score > 0:
+            decision = "REQUIRE ADDITIONAL INFORMATION"
+            reasoning = f"General decision analysis: {question}. More information needed for confident decision."
+        elif approval_score > rejection_score:
+            decision = "APPROVED"
+            reasoning = f"General decision analysis: {question}. Decision aligns with best practices and objectives."
+        else:
+            decision = "REJECTED"
+            reasoning = f"General decision analysis: {question}. Decision does not align with best practices or objectives."
+        return decision, reasoning
+
+    def _get_ethical_considerations(self, category: str) -> list:
+        """Get relevant ethical considerations for the decision category"""
+        if category == "financial":
+            return [self.ethical_guidelines[0], self.ethical_guidelines[1], self.ethical_guidelines[4]]
+        elif category == "medical":
+            return [self.ethical_guidelines[0], self.ethical_guidelines[1], self.ethical_guidelines[3]]
+        elif category == "legal":
+            return [self.ethical_guidelines[4], self.ethical_guidelines[6], self.ethical_guidelines[7]]
+        elif category == "content":
+            return [self.ethical_guidelines[1], self.ethical_guidelines[3], self.ethical_guidelines[4]]
+        elif category == "hiring":
+            return [self.ethical_guidelines[4], self.ethical_guidelines[5], self.ethical_guidelines[7]]
+        elif category == "safety":
+            return [self.ethical_guidelines[1], self.ethical_guidelines[6], self.ethical_guidelines[7]]
+        else:
+            return self.ethical_guidelines[:3]
+
+    def _calculate_confidence(self, approval_score: int, rejection_score: int, conditional_score: int, category: str, question: str) -> float:
+        """Calculate confidence score based on multiple factors"""
+        base_confidence = 70
+
+        # Decision clarity factor
+        decision_clarity = abs(approval_score - rejection_score) * 5
+        base_confidence += decision_clarity
+
+        # Category-specific confidence adjustments
+        category_confidence = {
+            "financial": 5,  # Financial decisions often have clear criteria
+            "medical": -5,   # Medical decisions can be complex
+            "legal": 0,      # Legal decisions vary in complexity
+            "content": 10,   # Content decisions often have clear guidelines
+            "hiring": -3,    # Hiring decisions can be subjective
+            "safety": 8,     # Safety decisions often have clear standards
+            "general": 0
+        }
+
+        base_confidence += category_confidence.get(category, 0)
+
+        # Conditional factor (reduces confidence)
+        if conditional_score > 0:
+            base_confidence -= conditional_score * 10
+
+        # Question complexity factor
+        question_length = len(question.split())
+        if question_length > 20:
+            base_confidence -= 5
+        elif question_length < 5:
+            base_confidence -= 3
+
+        # Ensure confidence is within bounds
+        return max(50, min(95, base_confidence))
+
+
+legacy = LegacyEngine()
+
+
+def check_equivalence(samples: int = 20000) -> None:
+    """Fuzz both implementations over random categories, scores and question lengths"""
+    rng = random.Random(0)
+    categories = list(engine.decision_categories) + ["unknown"]
+    words = ["loan", "review", "approve", "deny", "the", "patient", "safety", "x"]
+    for _ in range(samples):
+        question = " ".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+        args = (question, rng.choice(categories), rng.randint(0, 5), rng.randint(0, 5), rng.randint(0, 3))
+        assert engine._build_analysis(*args) == legacy._build_analysis(*args), args
+    for question in SAMPLE_QUESTIONS:
+        assert engine.analyze_question(question) == legacy._build_analysis(question, *engine._score_question(question))
+
+
+def main_benchmark(number: int) -> None:
+    print(f"{'category':>10} {'legacy us':>10} {'compiled us':>12}")
+    for category in engine.decision_categories:
+        question = SAMPLE_QUESTIONS[0]
+        args = (question, category, 1, 0, 0)
+        # Best of five runs to reduce scheduler noise
+        before = min(timeit.repeat(lambda: legacy._build_analysis(*args), number=number, repeat=5)) / number * 1e6
+        after = min(timeit.repeat(lambda: engine._build_analysis(*args), number=number, repeat=5)) / number * 1e6
+        print(f"{category:>10} {before:>10.2f} {after:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    check_equivalence()
+    main_benchmark(args.number)
@@ -0,0 +1,88 @@
+"""Measure validator vote throughput through the batch endpoint and check no vote is lost
+
+Every validator votes on every decision, in shuffled batches sent by
+several concurrent clients, with a share of the votes sent twice. The run
+then checks that each accepted vote is in exactly one tally, that every
+decision settled once and that its status matches its tally's outcome.
+
+fakeredis interprets Lua in Python and is far slower at it than Redis, so
+the votes/s it reports is a floor; set REDIS_URL for realistic numbers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_validation [--decisions 2000] [--validators 5] [--batch-size 1000] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import main
+from benchmarks.common import RoundTripCounter, asgi_client, create_benchmark_redis, sample_questions
+
+
+async def create_decisions(client, count: int) -> list:
+    decision_ids = []
+    for chunk in range(0, count, main.MAX_BATCH_SIZE):
+        response = await client.post("/api/decisions/batch", json={
+            "decisions": [{"question": question} for question in sample_questions(min(main.MAX_BATCH_SIZE, count - chunk))]
+        })
+        response.raise_for_status()
+        decision_ids += [decision["id"] for decision in response.json()["decisions"]]
+    return decision_ids
+
+
+async def run(args) -> None:
+    main.redis_client = create_benchmark_redis()
+    await main.redis_client.flushdb()
+    rng = random.Random(42)
+
+    async with asgi_client(main.app) as client:
+        decision_ids = await create_decisions(client, args.decisions)
+        votes = [
+            {"decision_id": decision_id, "validator": f"validator-{index}", "is_valid": rng.random() < 0.7}
+            for decision_id in decision_ids for index in range(args.validators)
+        ]
+        votes += rng.sample(votes, len(votes) // 10)
+        rng.shuffle(votes)
+        batches = [votes[offset:offset + args.batch_size] for offset in range(0, len(votes), args.batch_size)]
+        totals = {"accepted": 0, "duplicate": 0, "closed": 0, "not_found": 0}
+
+        async def submit_all():
+            while batches:
+                response = await client.post("/api/decisions/validations", json={"votes": batches.pop()})
+                response.raise_for_status()
+                for result in totals:
+                    totals[result] += response.json()[result]
+
+        with RoundTripCounter(args.rtt_ms) as counter:
+            batch_count = len(batches)
+            start = time.perf_counter()
+            await asyncio.gather(*[submit_all() for _ in range(args.concurrency)])
+            elapsed = time.perf_counter() - start
+
+        settled, mismatched, tallied = 0, 0, 0
+        for decision_id in decision_ids:
+            progress = (await client.get(f"/api/decisions/{decision_id}/validation")).json()
+            decision = (await client.get(f"/api/decisions/{decision_id}")).json()
+            tallied += progress["approvals"] + progress["rejections"]
+            settled += progress["outcome"] is not None
+            mismatched += decision["status"] != (progress["outcome"] or "pending")
+
+    await main.redis_client.aclose()
+
+    print(f"votes={len(votes)} batches={batch_count} votes_per_s={len(votes) / elapsed:.0f} "
+          f"round_trips_per_batch={counter.count / batch_count:.1f}")
+    print(" ".join(f"{result}={count}" for result, count in totals.items()))
+    print(f"settled={settled}/{len(decision_ids)} status_mismatches={mismatched} "
+          f"lost_votes={totals['accepted'] - tallied}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decisions", type=int, default=2000)
+    parser.add_argument("--validators", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="simulated network round-trip time")
+    args = parser.parse_args()
+    asyncio.run(run(args))
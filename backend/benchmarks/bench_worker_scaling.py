@@ -0,0 +1,141 @@
+"""Measure how API throughput scales with the number of serve.py workers
+
+For each worker count the benchmark starts `python serve.py --workers N`
+on a free port, waits for /ready, and drives it from several load
+generator processes over keep-alive HTTP connections.
+
+Workers need a Redis they can all reach: REDIS_HOST/REDIS_PORT when set,
+otherwise a fakeredis TCP server started here. fakeredis serves one
+command at a time in Python and soon becomes the bottleneck, so use a
+real Redis for meaningful numbers. The load generators share the machine
+with the workers, so leave cores free for them.
+
+Usage (from backend/):
+    python -m benchmarks.bench_worker_scaling [--workers 1,2,4] [--requests 5000]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from benchmarks.common import SAMPLE_QUESTIONS, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "create": ("POST", "/api/decisions", lambda i: {"question": SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]}),
+    "list": ("GET", "/api/decisions?limit=10", None),
+    "stats": ("GET", "/api/stats", None),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_redis() -> int:
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def generate_load(url: str, scenario: str, requests: int, concurrency: int) -> list:
+    """Load generator process: returns latency samples in ms"""
+    method, path, make_body = SCENARIOS[scenario]
+
+    async def run():
+        samples = []
+        next_index = iter(range(requests))
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+            async def worker():
+                for index in next_index:
+                    start = time.perf_counter()
+                    response = await client.request(method, path, json=make_body(index) if make_body else None)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    response.raise_for_status()
+
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return samples
+
+    return asyncio.run(run())
+
+
+def wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+def measure(workers: int, args, env: dict) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        wait_ready(url)
+        # Every worker must be up before timing; readiness only proves one is
+        time.sleep(1 + workers * 0.5)
+        generate_load(url, args.scenario, min(500, args.requests), args.concurrency)
+
+        per_client = args.requests // args.clients
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            start = time.perf_counter()
+            results = pool.starmap(
+                generate_load, [(url, args.scenario, per_client, args.concurrency)] * args.clients
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    samples = [sample for result in results for sample in result]
+    result = {"workers": workers, "requests_per_s": round(len(samples) / elapsed, 1)}
+    result.update(summarize(samples))
+    return result
+
+
+if __name__ == "__main__":
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16, 32) if n <= cores) or "1"
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=default_workers, help="comma-separated worker counts")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="create")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per worker count")
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per load generator")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DECISION_DB_PATH="", POLICY_RELOAD_INTERVAL="0")
+    if not os.getenv("REDIS_HOST") and not os.getenv("REDIS_PORT"):
+        env["REDIS_PORT"] = str(start_fake_redis())
+        print("Using an in-process fakeredis server; throughput will be capped by it")
+
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    baseline = None
+    for workers in [int(n) for n in args.workers.split(",")]:
+        result = measure(workers, args, env)
+        baseline = baseline or result["requests_per_s"]
+        print(f"{workers:>7} {result['requests_per_s']:>10.1f} {result['requests_per_s'] / baseline:>7.2f}x "
+              f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
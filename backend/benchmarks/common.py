@@ -0,0 +1,100 @@
+"""Shared helpers for the backend benchmarks
+
+Benchmarks run against fakeredis by default so they need no running server.
+Set REDIS_URL to point them at a real Redis instead.
+"""
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import redis.asyncio as redis
+from redis.asyncio.connection import AbstractConnection
+
+
+class RoundTripCounter:
+    """Count client/server round trips and optionally inject network latency
+
+    Every packed write to a connection is one round trip, so a pipeline or
+    MGET counts once no matter how many keys it touches.
+    """
+
+    def __init__(self, rtt_ms: float = 0.0):
+        self.rtt = rtt_ms / 1000
+        self.count = 0
+        self._original = None
+
+    def __enter__(self):
+        self._original = AbstractConnection.send_packed_command
+        counter = self
+
+        async def send_packed_command(conn, *args, **kwargs):
+            counter.count += 1
+            if counter.rtt:
+                await asyncio.sleep(counter.rtt)
+            return await counter._original(conn, *args, **kwargs)
+
+        AbstractConnection.send_packed_command = send_packed_command
+        return self
+
+    def __exit__(self, *exc_info):
+        AbstractConnection.send_packed_command = self._original
+
+    def reset(self) -> None:
+        self.count = 0
+
+
+def create_benchmark_redis() -> redis.Redis:
+    """Return a client for REDIS_URL, falling back to an in-process fakeredis"""
+    url = os.getenv("REDIS_URL")
+    if url:
+        return redis.from_url(url, decode_responses=True)
+
+    import fakeredis
+
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarise latency samples given in ms"""
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4),
+    }
+
+
+async def time_async(fn: Callable[[], Awaitable], iterations: int) -> Dict[str, float]:
+    """Run an async callable repeatedly and summarise its latency in ms"""
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+SAMPLE_QUESTIONS = [
+    "Should I approve this loan application?",
+    "Review this video content for moderation",
+    "Is this candidate a good fit for the job after the second interview?",
+    "Should the patient proceed with the proposed treatment?",
+    "Does this contract comply with the new regulation?",
+    "Should we halt production because of a safety hazard?",
+    "Deny the suspicious payment transaction pending further review",
+    "Can we continue with the plan?",
+]
+
+
+def sample_questions(count: int) -> List[str]:
+    """Return `count` questions cycling through SAMPLE_QUESTIONS with unique suffixes"""
+    return [f"{SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]} (case {i})" for i in range(count)]
+
+
+def asgi_client(app):
+    """Return an httpx client that calls the ASGI app in-process"""
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
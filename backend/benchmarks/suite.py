@@ -0,0 +1,237 @@
+"""Run the benchmark suite and write the results as JSON
+
+Microbenchmarks time the AIDecisionEngine hot paths in isolation. Load
+scenarios drive the API through an in-process ASGI client against
+fakeredis (or REDIS_URL), with a number of concurrent clients, and record
+throughput, latency percentiles and Redis round trips per request.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--output results.json] [--compare baseline.json]
+
+fakeredis answers without yielding to the event loop, so against it each
+request runs to completion before the next starts and latency is pure
+service time; compare requests_per_s across configurations instead.
+
+With --compare, every metric is checked against a previous results file
+and the run exits with status 1 if any is worse by more than --threshold.
+Results from different machines are not comparable; compare runs from
+the same host, e.g. before and after a commit.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+import main
+from benchmarks.common import (
+    SAMPLE_QUESTIONS,
+    RoundTripCounter,
+    asgi_client,
+    create_benchmark_redis,
+    sample_questions,
+    summarize,
+)
+from decision_repository import SQLiteDecisionRepository
+
+engine = main.ai_engine
+
+# Metrics where a larger value is an improvement; every other metric is a cost
+HIGHER_IS_BETTER = ("ops_per_s", "requests_per_s")
+
+
+def micro_benchmarks(number: int) -> dict:
+    """Time engine methods, best of five runs, in ns per call"""
+    question = SAMPLE_QUESTIONS[0]
+    long_question = "Background: the applicant has provided several documents. " * 40 + question
+    category, approval, rejection, conditional = engine._score_question(question)
+    analysis = engine.analyze_question(question)
+    record = main.build_decision_record("decision_benchmark", datetime.now().isoformat(), question, analysis)
+    hashed = {field: record[field] for field in main.HASHED_FIELDS}
+
+    cases = {
+        "categorize_question": lambda: engine.categorize_question(question),
+        "categorize_question_long": lambda: engine.categorize_question(long_question),
+        "analyze_question": lambda: engine.analyze_question(question),
+        "analyze_question_long": lambda: engine.analyze_question(long_question),
+        "calculate_confidence": lambda: engine._calculate_confidence(
+            approval, rejection, conditional, category, question
+        ),
+        "generate_block_hash": lambda: engine.generate_block_hash(hashed),
+    }
+
+    results = {}
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        results[name] = {"ns_per_op": round(best * 1e9, 1), "ops_per_s": round(1 / best)}
+    return results
+
+
+async def run_load(client, counter: RoundTripCounter, requests: int, concurrency: int, make_request) -> dict:
+    """Issue requests from `concurrency` clients and summarise them"""
+    samples = []
+    next_index = iter(range(requests))
+
+    async def worker():
+        for index in next_index:
+            start = time.perf_counter()
+            response = await make_request(client, index)
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    counter.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "requests_per_s": round(requests / elapsed, 1),
+        "redis_round_trips_per_request": round(counter.count / requests, 2),
+    }
+    result.update(summarize(samples))
+    return result
+
+
+async def load_scenarios(requests: int, concurrency: int, rtt_ms: float) -> dict:
+    questions = sample_questions(requests)
+    main.redis_client = create_benchmark_redis()
+    await main.redis_client.flushdb()
+    main.decision_cache.clear()
+
+    results = {}
+    async with asgi_client(main.app) as client:
+        with RoundTripCounter(rtt_ms) as counter:
+            results["create_decision"] = await run_load(
+                client, counter, requests, concurrency,
+                lambda client, i: client.post("/api/decisions", json={"question": questions[i]})
+            )
+
+            chunks = [questions[offset:offset + 50] for offset in range(0, requests, 50)]
+            results["create_decisions_batch_50"] = await run_load(
+                client, counter, len(chunks), concurrency,
+                lambda client, i: client.post(
+                    "/api/decisions/batch", json={"decisions": [{"question": question} for question in chunks[i]]}
+                )
+            )
+
+            results["list_decisions"] = await run_load(
+                client, counter, requests, concurrency,
+                lambda client, i: client.get("/api/decisions", params={"limit": 10})
+            )
+
+            results["get_stats"] = await run_load(
+                client, counter, requests, concurrency,
+                lambda client, i: client.get("/api/stats")
+            )
+
+            decision_ids = await main.redis_client.lrange("recent_decisions", 0, -1)
+            results["validate_decision"] = await run_load(
+                client, counter, requests, concurrency,
+                lambda client, i: client.post(f"/api/decisions/{decision_ids[i % len(decision_ids)]}/validate")
+            )
+
+            if main.decision_repository is not None:
+                results["list_decisions_filtered"] = await run_load(
+                    client, counter, requests, concurrency,
+                    lambda client, i: client.get("/api/decisions", params={"limit": 10, "category": "financial"})
+                )
+
+    await main.redis_client.aclose()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print changes against the baseline; return True if nothing regressed"""
+    ok = True
+    print(f"\n{'benchmark':>42} {'baseline':>12} {'current':>12} {'change':>8}")
+    for section in ("micro", "load"):
+        for name, metrics in results[section].items():
+            for metric, value in metrics.items():
+                previous = baseline.get(section, {}).get(name, {}).get(metric)
+                if not isinstance(value, (int, float)) or not previous or metric in ("requests", "concurrency"):
+                    continue
+                change = (value - previous) / previous
+                worse = -change if metric in HIGHER_IS_BETTER else change
+                flag = ""
+                if worse > threshold:
+                    flag = "  REGRESSION"
+                    ok = False
+                print(f"{name + '.' + metric:>42} {previous:>12.4g} {value:>12.4g} {change:>+8.1%}{flag}")
+    return ok
+
+
+async def run(args) -> dict:
+    if args.db is not None:
+        main.decision_repository = SQLiteDecisionRepository(args.db)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "redis": "REDIS_URL" if os.getenv("REDIS_URL") else "fakeredis",
+            "repository": "sqlite" if main.decision_repository is not None else "none",
+            "config": {
+                "number": args.number,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "rtt_ms": args.rtt_ms,
+            },
+        },
+        "micro": micro_benchmarks(args.number),
+        "load": await load_scenarios(args.requests, args.concurrency, args.rtt_ms),
+    }
+
+    if main.decision_repository is not None:
+        await main.decision_repository.close()
+        main.decision_repository = None
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="tolerated relative slowdown")
+    parser.add_argument("--number", type=int, default=20000, help="calls per microbenchmark run")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated network round-trip time")
+    parser.add_argument("--with-repository", dest="db", action="store_const", const="",
+                        help="also persist to a temporary SQLite repository")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.db == "":
+            args.db = os.path.join(directory, "decisions.db")
+        results = asyncio.run(run(args))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({"micro": results["micro"], "load": results["load"]}, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,125 @@
+"""Bulk import and export of decisions as NDJSON through the API
+
+Import streams a file to POST /api/decisions/import in 1 MiB chunks;
+export streams GET /api/decisions/export to a file. Neither holds more
+than a chunk in memory, so multi-gigabyte files work. Files ending in .gz
+are sent compressed (import) or written compressed (export). Progress is
+printed to stderr.
+
+Lines without an `id` get a new one on every import; include IDs (as
+exports do) to make re-running an interrupted import skip what is
+already stored.
+
+Usage (from backend/):
+    python bulk_cli.py [--url http://localhost:8000] import decisions.ndjson[.gz]
+    python bulk_cli.py [--url http://localhost:8000] export decisions.ndjson[.gz] [--category financial] [--since 2024-01-01]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import requests
+
+CHUNK_SIZE = 1 << 20
+
+
+class Progress:
+    """Rate-limited progress line on stderr"""
+
+    def __init__(self, label: str, total: int = 0, count_lines: bool = True):
+        self.label = label
+        self.total = total
+        self.count_lines = count_lines
+        self.done = 0
+        self.lines = 0
+        self.start = time.monotonic()
+        self._last = 0.0
+
+    def update(self, data: bytes) -> None:
+        self.done += len(data)
+        if self.count_lines:
+            self.lines += data.count(b"\n")
+        now = time.monotonic()
+        if now - self._last >= 0.5:
+            self._last = now
+            self.render()
+
+    def render(self, end: str = "") -> None:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        percent = f" {self.done / self.total:6.1%}" if self.total else ""
+        lines = f", {self.lines:,} lines" if self.count_lines else ""
+        sys.stderr.write(f"\r{self.label}{percent} {self.done / 1e6:,.1f} MB{lines}, {self.done / 1e6 / elapsed:,.1f} MB/s{end}")
+        sys.stderr.flush()
+
+
+def import_file(args) -> int:
+    compressed = args.path.endswith(".gz")
+    progress = Progress("Uploading", os.path.getsize(args.path), count_lines=not compressed)
+    headers = {"Content-Type": "application/x-ndjson"}
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+
+    def chunks():
+        with open(args.path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                progress.update(chunk)
+                yield chunk
+        progress.render(" - waiting for the server to finish\n")
+
+    response = requests.post(f"{args.url}/api/decisions/import", data=chunks(), headers=headers)
+    try:
+        summary = response.json()
+    except ValueError:
+        summary = {"error": response.text}
+    print(json.dumps(summary, indent=2))
+    return 0 if response.ok and not summary.get("failed") else 1
+
+
+def export_file(args) -> int:
+    params = {
+        name: getattr(args, name)
+        for name in ("category", "status", "min_confidence", "max_confidence", "since", "until")
+        if getattr(args, name) is not None
+    }
+    progress = Progress("Downloading")
+    with requests.get(f"{args.url}/api/decisions/export", params=params, stream=True) as response:
+        if not response.ok:
+            print(response.text, file=sys.stderr)
+            return 1
+        opener = gzip.open if args.path.endswith(".gz") else open
+        with opener(args.path, "wb") as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                progress.update(chunk)
+                f.write(chunk)
+    progress.render("\n")
+    print(f"Exported {progress.lines:,} decisions to {args.path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.getenv("NEUROCHAIN_API_URL", "http://localhost:8000"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="import decisions from an NDJSON file")
+    import_parser.add_argument("path")
+    import_parser.set_defaults(run=import_file)
+
+    export_parser = commands.add_parser("export", help="export decisions to an NDJSON file, newest first")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--category")
+    export_parser.add_argument("--status")
+    export_parser.add_argument("--min-confidence", type=float)
+    export_parser.add_argument("--max-confidence", type=float)
+    export_parser.add_argument("--since", help="ISO 8601 date or time")
+    export_parser.add_argument("--until", help="ISO 8601 date or time")
+    export_parser.set_defaults(run=export_file)
+
+    args = parser.parse_args()
+    sys.exit(args.run(args))
@@ -0,0 +1,150 @@
+"""Streaming NDJSON parsing for bulk decision imports
+
+An import body is read as it arrives and split into lines, then into
+batches of parsed items, so memory stays bounded by one batch and one
+line no matter how large the upload is. The caller awaits each batch
+before the next one is read, which applies backpressure to the client.
+
+Each line is a JSON object with a `question`. Lines that also carry
+`decision`, `reasoning`, `confidence` and `category` are historical
+decisions and are stored as given; other lines are analyzed by the
+engine. `id` and `timestamp` are optional. A supplied `block_hash` must
+match the record's content, so exports can be re-imported and verified.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from decision_repository import ID_TIME_SLACK_MS
+from ids import decision_id_at, decision_id_timestamp
+
+HISTORICAL_FIELDS = ("decision", "reasoning", "confidence", "category")
+
+
+class ImportLineError(ValueError):
+    """Raised for an import line that cannot be stored"""
+
+
+async def decompress(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Undo a gzip or deflate Content-Encoding incrementally"""
+    if not encoding or encoding == "identity":
+        async for chunk in chunks:
+            yield chunk
+        return
+    if encoding not in ("gzip", "deflate"):
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    decompressor = zlib.decompressobj(wbits=47)  # gzip or zlib header, detected automatically
+    async for chunk in chunks:
+        # Cap each output so a small compressed chunk cannot expand into a huge buffer
+        data = decompressor.decompress(chunk, 1 << 20)
+        while data:
+            yield data
+            data = decompressor.decompress(decompressor.unconsumed_tail, 1 << 20)
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (line number, line) for every non-blank line of a byte stream"""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line {line_number + 1} exceeds {max_line_bytes} bytes")
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+async def iter_batches(lines: AsyncIterator[Tuple[int, bytes]], size: int) -> AsyncIterator[List[Tuple[int, bytes]]]:
+    batch = []
+    async for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _local_timestamp(value: str) -> Tuple[str, int]:
+    """Return the stored form of an ISO timestamp (naive local time) and its epoch ms"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ImportLineError(f"invalid timestamp {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+        value = parsed.isoformat()
+    return value, int(parsed.timestamp() * 1000)
+
+
+def parse_import_line(line: bytes, now: datetime) -> dict:
+    """Validate one import line and fill in its id and timestamp
+
+    The result holds the record fields found on the line, plus `context`
+    and the claimed `block_hash`, if any.
+    """
+    try:
+        item = json.loads(line)
+    except ValueError as e:
+        raise ImportLineError(f"invalid JSON: {e}")
+    if not isinstance(item, dict):
+        raise ImportLineError("expected a JSON object")
+
+    question = item.get("question")
+    if not isinstance(question, str) or not question.strip():
+        raise ImportLineError("question is required")
+
+    if item.get("timestamp") is None:
+        timestamp, timestamp_ms = now.isoformat(), int(now.timestamp() * 1000)
+    else:
+        timestamp, timestamp_ms = _local_timestamp(item["timestamp"])
+
+    decision_id = item.get("id")
+    if decision_id is None:
+        # Derive the ID from the decision's own time so time-window queries find it
+        decision_id = decision_id_at(timestamp_ms)
+    else:
+        id_ms = decision_id_timestamp(decision_id) if isinstance(decision_id, str) else None
+        if id_ms is None:
+            raise ImportLineError(f"invalid decision id {decision_id!r}")
+        if abs(id_ms - timestamp_ms) > ID_TIME_SLACK_MS:
+            raise ImportLineError(f"id {decision_id} does not match timestamp {timestamp}")
+
+    parsed = {
+        "id": decision_id,
+        "timestamp": timestamp,
+        "question": question,
+        "context": item.get("context") or "",
+        "status": item.get("status") or "pending",
+        "anchor_tx_hash": item.get("anchor_tx_hash"),
+        "block_hash": item.get("block_hash")
+    }
+
+    present = [field for field in HISTORICAL_FIELDS if item.get(field) is not None]
+    if present:
+        if len(present) != len(HISTORICAL_FIELDS):
+            missing = ", ".join(field for field in HISTORICAL_FIELDS if field not in present)
+            raise ImportLineError(f"historical decisions also need {missing}")
+        confidence = item["confidence"]
+        if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            raise ImportLineError("confidence must be a number")
+        for field in ("decision", "reasoning", "category"):
+            if not isinstance(item[field], str):
+                raise ImportLineError(f"{field} must be a string")
+        parsed.update({field: item[field] for field in HISTORICAL_FIELDS})
+
+    for field in ("status", "anchor_tx_hash", "block_hash", "context"):
+        if parsed[field] is not None and not isinstance(parsed[field], str):
+            raise ImportLineError(f"{field} must be a string")
+    return parsed
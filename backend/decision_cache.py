@@ -0,0 +1,162 @@
+"""Memoizing cache in front of AIDecisionEngine.analyze_question
+
+analyze_question is deterministic for a given engine configuration, so
+repeated questions (templated moderation or loan pre-checks) can reuse
+earlier results. Entries live in a size-bounded in-process LRU with a TTL
+and, optionally, in a shared Redis tier so workers can reuse each other's
+results.
+
+Keys combine the engine's config fingerprint with a hash of the question
+and normalized context. Reloading a changed decision policy changes the
+fingerprint, which clears the local tier and makes every older Redis
+entry unreachable.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import redis.asyncio as redis
+
+REDIS_KEY_PREFIX = "analysis_cache:"
+
+
+class DecisionCache:
+    def __init__(self, engine, max_size: int = 10000, ttl: float = 300,
+                 redis_client: Optional[redis.Redis] = None, redis_ttl: int = 3600):
+        self.engine = engine
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._fingerprint = engine.config_fingerprint
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, question: str, context: str = "") -> str:
+        """Hash the question and whitespace-normalized context under the current config
+
+        The question is used verbatim because analyze_question echoes it into
+        the reasoning text; two spellings must not share a cached result.
+        """
+        normalized_context = " ".join((context or "").split())
+        digest = hashlib.sha256(f"{question}\x00{normalized_context}".encode()).hexdigest()
+        return f"{self.engine.config_fingerprint}:{digest}"
+
+    def _check_config(self) -> None:
+        if self.engine.config_fingerprint != self._fingerprint:
+            self._fingerprint = self.engine.config_fingerprint
+            self._entries.clear()
+            self.invalidations += 1
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, analysis = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(analysis)
+
+    def _put_local(self, key: str, analysis: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, dict(analysis))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def analyze(self, question: str, context: str = "") -> dict:
+        """Return a cached analysis, falling back to Redis and then the engine"""
+        self._check_config()
+        key = self.key(question, context)
+
+        analysis = self._get_local(key)
+        if analysis is not None:
+            return analysis
+
+        if self.redis_client is not None:
+            payload = await self.redis_client.get(REDIS_KEY_PREFIX + key)
+            if payload:
+                analysis = json.loads(payload)
+                self.redis_hits += 1
+                self._put_local(key, analysis)
+                return analysis
+
+        self.misses += 1
+        analysis = self.engine.analyze_question(question, context)
+        self._put_local(key, analysis)
+        if self.redis_client is not None:
+            await self.redis_client.setex(REDIS_KEY_PREFIX + key, self.redis_ttl, json.dumps(analysis))
+        return analysis
+
+    async def analyze_batch(self, questions: List[str], contexts: Optional[List[str]] = None) -> List[dict]:
+        """Batch variant of analyze; misses go through engine.analyze_batch"""
+        self._check_config()
+        contexts = contexts or [""] * len(questions)
+        keys = [self.key(question, context) for question, context in zip(questions, contexts)]
+
+        results: List[Optional[dict]] = [self._get_local(key) for key in keys]
+        pending = [index for index, analysis in enumerate(results) if analysis is None]
+
+        if pending and self.redis_client is not None:
+            payloads = await self.redis_client.mget([REDIS_KEY_PREFIX + keys[index] for index in pending])
+            still_pending = []
+            for index, payload in zip(pending, payloads):
+                if payload:
+                    results[index] = json.loads(payload)
+                    self.redis_hits += 1
+                    self._put_local(keys[index], results[index])
+                else:
+                    still_pending.append(index)
+            pending = still_pending
+
+        if pending:
+            self.misses += len(pending)
+            analyses = self.engine.analyze_batch(
+                [questions[index] for index in pending],
+                [contexts[index] for index in pending]
+            )
+            for index, analysis in zip(pending, analyses):
+                results[index] = analysis
+                self._put_local(keys[index], analysis)
+
+            if self.redis_client is not None:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for index in pending:
+                        pipe.setex(REDIS_KEY_PREFIX + keys[index], self.redis_ttl, json.dumps(results[index]))
+                    await pipe.execute()
+
+        return results
+
+    def clear(self) -> None:
+        """Drop every local entry"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters for monitoring"""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0
+        }
@@ -0,0 +1,171 @@
+"""Server-sent event stream of decision changes
+
+Writes append a "created" or "updated" event to a capped Redis Stream in
+the same transaction as the change itself. Each API worker runs a single
+reader task that tails the stream and fans every event out to its local
+subscribers, so thousands of open connections cost one Redis connection
+per worker and each event is serialized once, not once per client.
+
+Every subscriber has a bounded queue. A client too slow to keep up is
+disconnected rather than allowed to grow memory without bound; browsers
+reconnect with the Last-Event-ID header and missed events are replayed
+from the stream. If the client is so far behind that those events have
+been trimmed away, it receives a "reset" event and should re-read
+GET /api/decisions instead.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+EVENTS_KEY = "decision:events"
+
+
+def _stream_position(entry_id: str) -> Tuple[int, int]:
+    milliseconds, sequence = entry_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+def format_event(entry_id: str, event_type: str, data: str) -> bytes:
+    """Encode one SSE frame"""
+    return f"id: {entry_id}\nevent: {event_type}\ndata: {data}\n\n".encode()
+
+
+class _Subscriber:
+    __slots__ = ("queue", "closed")
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.closed = False
+
+
+class DecisionEventHub:
+    def __init__(self, maxlen: int = 10000, queue_size: int = 1000, block_ms: int = 1000,
+                 heartbeat: float = 15.0, retry_ms: int = 2000):
+        self.maxlen = maxlen
+        self.queue_size = queue_size
+        self.block_ms = block_ms
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+
+        self._subscribers: Set[_Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.overflows = 0
+
+    def publish(self, pipe: redis.client.Pipeline, event_type: str, records: List[dict]) -> None:
+        """Queue one event per record on a pipeline or transaction"""
+        for record in records:
+            pipe.xadd(EVENTS_KEY, {"type": event_type, "data": json.dumps(record)},
+                      maxlen=self.maxlen, approximate=True)
+
+    def start(self, client: redis.Redis) -> None:
+        """Start tailing the stream for this worker's subscribers"""
+        self._task = asyncio.create_task(self._tail(client))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.close_subscribers()
+
+    def close_subscribers(self) -> None:
+        """End every open subscription; clients reconnect and resume"""
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
+
+    async def _tail(self, client: redis.Redis) -> None:
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    # Start after the newest existing entry; "$" would skip events written between reads
+                    newest = await client.xrevrange(EVENTS_KEY, count=1)
+                    last_id = newest[0][0] if newest else "0-0"
+                response = await client.xread({EVENTS_KEY: last_id}, count=500, block=self.block_ms)
+                for entry_id, fields in (response[0][1] if response else []):
+                    last_id = entry_id
+                    self._broadcast((entry_id, format_event(entry_id, fields["type"], fields["data"])))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Decision event reader failed")
+                await asyncio.sleep(1)
+
+    def _broadcast(self, event: Tuple[str, bytes]) -> None:
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: disconnect it and let it resume from its last event
+                self.overflows += 1
+                self._close(subscriber)
+
+    def _close(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        subscriber.closed = True
+        try:
+            subscriber.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    async def subscribe(self, client: redis.Redis, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield SSE frames for events after last_event_id, then live events"""
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+
+            # Live events are buffered from here on; replay whatever came before them
+            replayed_until = None
+            if last_event_id:
+                try:
+                    last_position = _stream_position(last_event_id)
+                except ValueError:
+                    last_position = None
+                entries = await client.xrange(EVENTS_KEY, min="-", max="+", count=1)
+                if last_position is None or (entries and _stream_position(entries[0][0]) > last_position):
+                    yield format_event(last_event_id, "reset", "{}")
+                else:
+                    async for entry_id, frame in self._replay(client, last_event_id):
+                        replayed_until = _stream_position(entry_id)
+                        yield frame
+
+            while not subscriber.closed:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                entry_id, frame = event
+                if replayed_until is not None and _stream_position(entry_id) <= replayed_until:
+                    continue
+                yield frame
+        finally:
+            self._subscribers.discard(subscriber)
+
+    async def _replay(self, client: redis.Redis, last_event_id: str) -> AsyncIterator[Tuple[str, bytes]]:
+        start = f"({last_event_id}"
+        while True:
+            entries = await client.xrange(EVENTS_KEY, min=start, max="+", count=500)
+            for entry_id, fields in entries:
+                yield entry_id, format_event(entry_id, fields["type"], fields["data"])
+            if len(entries) < 500:
+                return
+            start = f"({entries[-1][0]}"
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "overflows": self.overflows
+        }
@@ -0,0 +1,368 @@
+"""Durable decision storage behind a repository interface
+
+Redis keeps only the last hour of decisions. A repository stores every
+decision permanently and answers filtered, cursor-paginated queries, while
+Redis stays in front of it as the hot cache.
+
+SQLiteDecisionRepository uses WAL mode so readers never block the writer,
+including readers in other uvicorn worker processes. The table is keyed by
+the decision ID, which is a time-sortable ULID, so "newest first" is a
+primary-key range scan and the last ID of a page is the cursor for the
+next one. Secondary indexes end in the ID for the same reason.
+
+Time windows are narrowed to the matching ID range before the timestamp
+itself is compared, so they never scan outside the window. SQLite has no
+histogram to tell a selective confidence range from a broad one, so the
+confidence index is probed first and only used when few rows match.
+
+Sealed ledger blocks are stored here too, with one index row per decision
+giving its block height and leaf position, so inclusion proofs outlive the
+Redis copies.
+"""
+import asyncio
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from ids import decision_id_floor
+
+COLUMNS = ("id", "timestamp", "question", "reasoning", "decision", "confidence",
+           "category", "block_hash", "status", "anchor_tx_hash")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    question TEXT NOT NULL,
+    reasoning TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    category TEXT NOT NULL,
+    block_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    anchor_tx_hash TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_decisions_timestamp ON decisions (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_category ON decisions (category, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions (status, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_category_status ON decisions (category, status, id);
+CREATE INDEX IF NOT EXISTS idx_decisions_confidence ON decisions (confidence, id);
+CREATE TABLE IF NOT EXISTS ledger_blocks (
+    height INTEGER PRIMARY KEY,
+    block TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ledger_index (
+    decision_id TEXT PRIMARY KEY,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# A record's timestamp is taken within the same request as its ID
+ID_TIME_SLACK_MS = 60000
+
+# Confidence ranges matching fewer rows than this are read through their index
+SELECTIVE_RANGE_ROWS = 10000
+
+
+class DecisionRepository(ABC):
+    """Interface for durable decision storage"""
+
+    @abstractmethod
+    async def save_many(self, records: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, decision_ids: List[str]) -> None:
+        """Remove decisions, such as ones whose creation failed after they were saved"""
+
+    async def compare_and_set(self, decision_id: str, changes: dict, expected_status: str) -> bool:
+        """Write the changed fields only if the stored status is still expected_status"""
+        return (await self.compare_and_set_many([(decision_id, changes, expected_status)]))[0]
+
+    @abstractmethod
+    async def compare_and_set_many(self, updates: List[Tuple[str, dict, str]]) -> List[bool]:
+        """Apply (decision ID, changes, expected status) updates together; returns which were written"""
+
+    @abstractmethod
+    async def get(self, decision_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def existing_ids(self, decision_ids: List[str]) -> Set[str]:
+        """Return the subset of decision_ids that are already stored"""
+
+    @abstractmethod
+    async def statuses(self, decision_ids: List[str]) -> Dict[str, str]:
+        """Return the status of each stored decision among decision_ids"""
+
+    @abstractmethod
+    async def query(self, limit: int = 10, cursor: Optional[str] = None, category: Optional[str] = None,
+                    status: Optional[str] = None, min_confidence: Optional[float] = None,
+                    max_confidence: Optional[float] = None, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        """Return decisions newest first and the cursor for the next page (None on the last page)"""
+
+    @abstractmethod
+    async def save_blocks(self, blocks: List[dict]) -> None:
+        """Store sealed ledger blocks and the position of each decision in them"""
+
+    @abstractmethod
+    async def get_block(self, height: int) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def block_location(self, decision_id: str) -> Optional[Tuple[int, int]]:
+        """Return the (block height, leaf index) a decision was sealed at"""
+
+    @abstractmethod
+    async def ledger_height(self) -> int:
+        """Return the highest stored block height, or -1 when none are stored"""
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteDecisionRepository(DecisionRepository):
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+
+        # One writer thread serializes writes; readers get a connection per thread
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decision-db-writer")
+        self._reader_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="decision-db-reader")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._writer = connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=30000")
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    async def _write(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer_executor, fn, *args)
+
+    async def _read(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._reader_executor, fn, *args)
+
+    @staticmethod
+    def _row(record: dict) -> tuple:
+        return tuple(record.get(column) for column in COLUMNS)
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        # The REAL column turns the engine's integer confidences into floats,
+        # which would change the JSON the block hash is computed over
+        if record["confidence"].is_integer():
+            record["confidence"] = int(record["confidence"])
+        return record
+
+    def _save_many(self, records: List[dict]) -> None:
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._writer:
+            self._writer.executemany(
+                f"INSERT OR REPLACE INTO decisions ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                [self._row(record) for record in records]
+            )
+
+    async def save_many(self, records: List[dict]) -> None:
+        await self._write(self._save_many, records)
+
+    def _delete_many(self, decision_ids: List[str]) -> None:
+        with self._writer:
+            self._writer.executemany("DELETE FROM decisions WHERE id = ?", [(decision_id,) for decision_id in decision_ids])
+
+    async def delete_many(self, decision_ids: List[str]) -> None:
+        await self._write(self._delete_many, decision_ids)
+
+    def _compare_and_set_many(self, updates: List[Tuple[str, dict, str]]) -> List[bool]:
+        written = []
+        with self._writer:
+            for decision_id, changes, expected_status in updates:
+                columns = [column for column in COLUMNS[1:] if column in changes] or ["status"]
+                values = [changes.get(column, expected_status) for column in columns]
+                cursor = self._writer.execute(
+                    f"UPDATE decisions SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ? AND status = ?",
+                    values + [decision_id, expected_status]
+                )
+                written.append(cursor.rowcount == 1)
+        return written
+
+    async def compare_and_set_many(self, updates: List[Tuple[str, dict, str]]) -> List[bool]:
+        if not updates:
+            return []
+        return await self._write(self._compare_and_set_many, updates)
+
+    def _get(self, decision_id: str) -> Optional[dict]:
+        row = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM decisions WHERE id = ?", (decision_id,)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    async def get(self, decision_id: str) -> Optional[dict]:
+        return await self._read(self._get, decision_id)
+
+    def _existing_ids(self, decision_ids: List[str]) -> Set[str]:
+        placeholders = ", ".join("?" for _ in decision_ids)
+        rows = self._reader().execute(
+            f"SELECT id FROM decisions WHERE id IN ({placeholders})", decision_ids
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    async def existing_ids(self, decision_ids: List[str]) -> Set[str]:
+        if not decision_ids:
+            return set()
+        return await self._read(self._existing_ids, decision_ids)
+
+    def _statuses(self, decision_ids: List[str]) -> Dict[str, str]:
+        placeholders = ", ".join("?" for _ in decision_ids)
+        rows = self._reader().execute(
+            f"SELECT id, status FROM decisions WHERE id IN ({placeholders})", decision_ids
+        ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    async def statuses(self, decision_ids: List[str]) -> Dict[str, str]:
+        if not decision_ids:
+            return {}
+        return await self._read(self._statuses, decision_ids)
+
+    @staticmethod
+    def _local_timestamp(value: datetime) -> str:
+        """Format value like the stored timestamps, which are naive local time"""
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value.isoformat()
+
+    def _confidence_is_selective(self, connection: sqlite3.Connection, clauses: List[str], params: list) -> bool:
+        (matches,) = connection.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM decisions INDEXED BY idx_decisions_confidence "
+            f"WHERE {' AND '.join(clauses)} LIMIT {SELECTIVE_RANGE_ROWS})",
+            params
+        ).fetchone()
+        return matches < SELECTIVE_RANGE_ROWS
+
+    def _query(self, limit, cursor, category, status, min_confidence, max_confidence, since, until):
+        connection = self._reader()
+        confidence_clauses, confidence_params = [], []
+        for clause, value in (("confidence >= ?", min_confidence), ("confidence <= ?", max_confidence)):
+            if value is not None:
+                confidence_clauses.append(clause)
+                confidence_params.append(value)
+
+        upper_id = cursor
+        lower_id = None
+        if until is not None:
+            until_id = decision_id_floor(int(until.timestamp() * 1000) + ID_TIME_SLACK_MS)
+            upper_id = min(upper_id, until_id) if upper_id else until_id
+        if since is not None:
+            lower_id = decision_id_floor(int(since.timestamp() * 1000) - ID_TIME_SLACK_MS)
+
+        clauses, params = [], []
+        for clause, value in (
+            ("id < ?", upper_id),
+            ("id >= ?", lower_id),
+            ("category = ?", category),
+            ("status = ?", status),
+            ("timestamp >= ?", self._local_timestamp(since) if since else None),
+            ("timestamp < ?", self._local_timestamp(until) if until else None),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+
+        source = "decisions"
+        if confidence_clauses and self._confidence_is_selective(connection, confidence_clauses, confidence_params):
+            source = "decisions INDEXED BY idx_decisions_confidence"
+        clauses += confidence_clauses
+        params += confidence_params
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM {source} {where} ORDER BY id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        records = [self._record(row) for row in rows[:limit]]
+        next_cursor = records[-1]["id"] if len(rows) > limit else None
+        return records, next_cursor
+
+    async def query(self, limit: int = 10, cursor: Optional[str] = None, category: Optional[str] = None,
+                    status: Optional[str] = None, min_confidence: Optional[float] = None,
+                    max_confidence: Optional[float] = None, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None) -> Tuple[List[dict], Optional[str]]:
+        return await self._read(self._query, limit, cursor, category, status,
+                                min_confidence, max_confidence, since, until)
+
+    def _save_blocks(self, blocks: List[dict]) -> None:
+        with self._writer:
+            self._writer.executemany(
+                "INSERT OR REPLACE INTO ledger_blocks (height, block) VALUES (?, ?)",
+                [(block["height"], json.dumps(block)) for block in blocks]
+            )
+            self._writer.executemany(
+                "INSERT OR REPLACE INTO ledger_index (decision_id, height, position) VALUES (?, ?, ?)",
+                [(decision["id"], block["height"], index)
+                 for block in blocks for index, decision in enumerate(block["decisions"])]
+            )
+
+    async def save_blocks(self, blocks: List[dict]) -> None:
+        await self._write(self._save_blocks, blocks)
+
+    def _get_block(self, height: int) -> Optional[dict]:
+        row = self._reader().execute("SELECT block FROM ledger_blocks WHERE height = ?", (height,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def get_block(self, height: int) -> Optional[dict]:
+        return await self._read(self._get_block, height)
+
+    def _block_location(self, decision_id: str) -> Optional[Tuple[int, int]]:
+        row = self._reader().execute(
+            "SELECT height, position FROM ledger_index WHERE decision_id = ?", (decision_id,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    async def block_location(self, decision_id: str) -> Optional[Tuple[int, int]]:
+        return await self._read(self._block_location, decision_id)
+
+    def _ledger_height(self) -> int:
+        (height,) = self._reader().execute("SELECT MAX(height) FROM ledger_blocks").fetchone()
+        return -1 if height is None else height
+
+    async def ledger_height(self) -> int:
+        return await self._read(self._ledger_height)
+
+    async def close(self) -> None:
+        self._writer_executor.shutdown(wait=True)
+        self._reader_executor.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+
+
+def create_repository(path: str) -> Optional[DecisionRepository]:
+    """Open the repository at path, or return None when persistence is disabled"""
+    if not path:
+        return None
+    return SQLiteDecisionRepository(path)
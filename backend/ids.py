@@ -0,0 +1,98 @@
+"""Collision-free, time-sortable decision IDs
+
+IDs are ULIDs: a 48-bit millisecond timestamp followed by 80 random bits,
+written as 26 Crockford base32 characters, so they sort lexicographically
+by creation time. Within one process, IDs generated in the same
+millisecond increment the random part, which keeps them strictly
+increasing. Across processes and hosts, 80 bits of randomness per
+millisecond make a collision negligible without assigning worker IDs or
+any coordination round trip.
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+def encode_ulid(value: int) -> str:
+    """Encode a 128-bit integer as 26 Crockford base32 characters"""
+    chars = []
+    for _ in range(26):
+        chars.append(CROCKFORD_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class ULIDGenerator:
+    """Thread-safe monotonic ULID generator"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _after_fork(self) -> None:
+        # The lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self._reset()
+
+    def new(self) -> str:
+        with self._lock:
+            now_ms = int(time.time() * 1000)
+            if now_ms <= self._last_ms:
+                # Same (or an earlier, after a clock step back) millisecond:
+                # stay on the last timestamp and count up
+                now_ms = self._last_ms
+                random_part = self._last_random + 1
+                if random_part > _RANDOM_MAX:
+                    now_ms += 1
+                    random_part = int.from_bytes(os.urandom(10), "big")
+            else:
+                random_part = int.from_bytes(os.urandom(10), "big")
+
+            self._last_ms = now_ms
+            self._last_random = random_part
+            return encode_ulid((now_ms << _RANDOM_BITS) | random_part)
+
+
+_generator = ULIDGenerator()
+
+# A forked worker must not continue the parent's monotonic sequence
+os.register_at_fork(after_in_child=_generator._after_fork)
+
+
+def new_decision_id() -> str:
+    """Return a new unique decision ID"""
+    return f"decision_{_generator.new()}"
+
+
+def decision_id_floor(timestamp_ms: int) -> str:
+    """Return the smallest decision ID that could be generated at timestamp_ms"""
+    return f"decision_{encode_ulid(max(0, timestamp_ms) << _RANDOM_BITS)}"
+
+
+def decision_id_at(timestamp_ms: int) -> str:
+    """Return a new decision ID for a decision made at timestamp_ms, such as an imported one"""
+    return f"decision_{encode_ulid((max(0, timestamp_ms) << _RANDOM_BITS) | int.from_bytes(os.urandom(10), 'big'))}"
+
+
+def decision_id_timestamp(decision_id: str) -> Optional[int]:
+    """Return the millisecond timestamp in a decision ID, or None if it is not a ULID decision ID"""
+    prefix, _, ulid = decision_id.partition("_")
+    if prefix != "decision" or len(ulid) != 26 or ulid[0] > "7":
+        return None
+    value = 0
+    for char in ulid:
+        index = CROCKFORD_ALPHABET.find(char)
+        if index < 0:
+            return None
+        value = (value << 5) | index
+    return value >> _RANDOM_BITS
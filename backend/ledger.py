@@ -0,0 +1,263 @@
+"""Merkle-batched decision ledger
+
+Decisions are queued as they are created and sealed into blocks, either
+when LEDGER_BLOCK_SIZE decisions are waiting or when the oldest has waited
+LEDGER_BLOCK_INTERVAL seconds. Each block stores a Merkle root over its
+decisions and is chained to the previous block, so one root per block is
+all that needs anchoring on chain, and any decision can be proven part of
+a block with O(log n) sibling hashes.
+
+Hashing scheme (SHA-256, domain separated to prevent leaf/node confusion):
+    leaf       = H(0x00 || decision block_hash)
+    node       = H(0x01 || left || right)        odd nodes are promoted
+    block_root = H(0x02 || previous_root || merkle_root)
+
+Sealing WATCHes the head, so if two workers read the same head (say the
+lock expired under a slow one), only the first to commit seals that
+height and the other aborts. Blocks and the decision index are kept in
+Redis for LEDGER_RETENTION seconds and copied to the decision repository,
+which serves proofs once the Redis copies expire.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import List, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import LockError, WatchError
+
+from decision_repository import DecisionRepository
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "ledger:pending"
+HEAD_KEY = "ledger:head"
+INDEX_KEY_PREFIX = "ledger:index:"
+LOCK_KEY = "ledger:lock"
+BLOCK_KEY_PREFIX = "ledger:block:"
+
+GENESIS_ROOT = "00" * 32
+
+# Blocks copied to the repository per pass
+PERSIST_BATCH_SIZE = 100
+
+
+def _sha256(*parts: bytes) -> bytes:
+    return hashlib.sha256(b"".join(parts)).digest()
+
+
+def leaf_hash(block_hash: str) -> str:
+    """Hash a decision's block_hash into a Merkle leaf"""
+    return _sha256(b"\x00", bytes.fromhex(block_hash)).hex()
+
+
+def _parent(left: bytes, right: bytes) -> bytes:
+    return _sha256(b"\x01", left, right)
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    parents = [_parent(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """Compute the Merkle root of hex-encoded leaves"""
+    if not leaves:
+        return GENESIS_ROOT
+
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[dict]:
+    """Return the sibling path proving leaves[index] is under the root"""
+    proof = []
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"position": "left" if sibling < index else "right", "hash": level[sibling].hex()})
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: str, proof: List[dict], root: str) -> bool:
+    """Check a sibling path from a leaf up to a Merkle root"""
+    node = bytes.fromhex(leaf)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        node = _parent(sibling, node) if step["position"] == "left" else _parent(node, sibling)
+    return node.hex() == root
+
+
+def chain_root(previous_root: str, root: str) -> str:
+    """Link a block's Merkle root to the previous block"""
+    return _sha256(b"\x02", bytes.fromhex(previous_root), bytes.fromhex(root)).hex()
+
+
+class DecisionLedger:
+    def __init__(self, block_size: int = 256, block_interval: float = 5.0, poll_interval: float = 0.25,
+                 retention: int = 86400):
+        self.block_size = block_size
+        self.block_interval = block_interval
+        self.poll_interval = poll_interval
+        self.retention = retention
+        # Durable copy of sealed blocks (set in the lifespan handler when persistence is enabled)
+        self.repository: Optional[DecisionRepository] = None
+
+    def queue(self, pipe: redis.client.Pipeline, records: List[dict]) -> None:
+        """Queue created decisions for the next block"""
+        pipe.rpush(PENDING_KEY, *[f"{record['id']}:{record['block_hash']}:{time.time()}" for record in records])
+
+    async def seal_block(self, client: redis.Redis, force: bool = False) -> Optional[dict]:
+        """Seal waiting decisions into the next block
+
+        Returns the new block, or None when nothing is ready or another
+        worker is sealing or sealed this height first.
+        """
+        lock = client.lock(LOCK_KEY, timeout=30, blocking=False)
+        if not await lock.acquire():
+            return None
+
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                await pipe.watch(HEAD_KEY)
+                entries = await pipe.lrange(PENDING_KEY, 0, self.block_size - 1)
+                if not entries:
+                    return None
+
+                oldest_age = time.time() - float(entries[0].rsplit(":", 1)[1])
+                if not force and len(entries) < self.block_size and oldest_age < self.block_interval:
+                    return None
+
+                head = await pipe.get(HEAD_KEY)
+                head = json.loads(head) if head else {"height": -1, "block_root": GENESIS_ROOT}
+
+                decisions = []
+                for entry in entries:
+                    decision_id, block_hash, _ = entry.rsplit(":", 2)
+                    decisions.append({"id": decision_id, "leaf": leaf_hash(block_hash)})
+
+                root = merkle_root([decision["leaf"] for decision in decisions])
+                block = {
+                    "height": head["height"] + 1,
+                    "timestamp": time.time(),
+                    "previous_root": head["block_root"],
+                    "merkle_root": root,
+                    "block_root": chain_root(head["block_root"], root),
+                    "size": len(decisions),
+                    "decisions": decisions
+                }
+
+                pipe.multi()
+                pipe.set(f"{BLOCK_KEY_PREFIX}{block['height']}", json.dumps(block), ex=self.retention)
+                pipe.set(HEAD_KEY, json.dumps({"height": block["height"], "block_root": block["block_root"]}))
+                for index, decision in enumerate(decisions):
+                    pipe.set(f"{INDEX_KEY_PREFIX}{decision['id']}", f"{block['height']}:{index}", ex=self.retention)
+                pipe.ltrim(PENDING_KEY, len(entries), -1)
+                try:
+                    await pipe.execute()
+                except WatchError:
+                    # Another worker sealed this height first; its block already trimmed these entries
+                    logger.warning("Ledger block %d was sealed by another worker", block["height"])
+                    return None
+
+            return block
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                logger.warning("Ledger lock expired while sealing a block")
+
+    async def persist_blocks(self, client: redis.Redis) -> int:
+        """Copy sealed blocks the repository does not have yet; returns how many were copied"""
+        if self.repository is None:
+            return 0
+
+        head = await self.get_head(client)
+        if not head:
+            return 0
+
+        first = await self.repository.ledger_height() + 1
+        heights = list(range(first, min(head["height"], first + PERSIST_BATCH_SIZE - 1) + 1))
+        if not heights:
+            return 0
+
+        payloads = await client.mget([f"{BLOCK_KEY_PREFIX}{height}" for height in heights])
+        blocks = [json.loads(payload) for payload in payloads if payload]
+        if len(blocks) < len(heights):
+            logger.error("Ledger blocks %d-%d expired from Redis before they were persisted", heights[0], heights[-1])
+        if blocks:
+            await self.repository.save_blocks(blocks)
+        return len(blocks)
+
+    async def run(self, client: redis.Redis) -> None:
+        """Seal blocks in the background until cancelled"""
+        while True:
+            try:
+                while await self.seal_block(client):
+                    pass
+                while await self.persist_blocks(client):
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to seal ledger block")
+            await asyncio.sleep(self.poll_interval)
+
+    async def get_block(self, client: redis.Redis, height: int) -> Optional[dict]:
+        payload = await client.get(f"{BLOCK_KEY_PREFIX}{height}")
+        if payload:
+            return json.loads(payload)
+        if self.repository is not None:
+            return await self.repository.get_block(height)
+        return None
+
+    async def get_head(self, client: redis.Redis) -> Optional[dict]:
+        payload = await client.get(HEAD_KEY)
+        return json.loads(payload) if payload else None
+
+    async def get_proof(self, client: redis.Redis, decision_id: str) -> Optional[dict]:
+        """Return the inclusion proof for a sealed decision, or None if not sealed yet"""
+        location = await client.get(f"{INDEX_KEY_PREFIX}{decision_id}")
+        if location:
+            height, index = (int(part) for part in location.split(":"))
+        elif self.repository is not None:
+            location = await self.repository.block_location(decision_id)
+            if not location:
+                return None
+            height, index = location
+        else:
+            return None
+
+        block = await self.get_block(client, height)
+        if not block:
+            return None
+        leaves = [decision["leaf"] for decision in block["decisions"]]
+        return {
+            "decision_id": decision_id,
+            "block_height": height,
+            "leaf_index": index,
+            "leaf": leaves[index],
+            "proof": merkle_proof(leaves, index),
+            "merkle_root": block["merkle_root"],
+            "previous_root": block["previous_root"],
+            "block_root": block["block_root"]
+        }
+
+
+def verify_inclusion(block_hash: str, inclusion: dict) -> bool:
+    """Verify a decision's block_hash against its proof and chained block root"""
+    leaf = leaf_hash(block_hash)
+    return (
+        leaf == inclusion["leaf"]
+        and verify_proof(leaf, inclusion["proof"], inclusion["merkle_root"])
+        and chain_root(inclusion["previous_root"], inclusion["merkle_root"]) == inclusion["block_root"]
+    )
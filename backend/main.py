@@ -1,24 +1,116 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
 import json
 import hashlib
-import time
+import zlib
 from datetime import datetime
-import redis
+import redis.asyncio as redis
 import os
 from dotenv import load_dotenv
 
+from redis_pool import create_redis_pool, create_redis_client, close_redis, wait_for_redis
+import stats
+from rule_engine import CompiledPolicy, PolicyError, compile_policy_file, watch_policy
+from decision_cache import DecisionCache
+from ledger import DecisionLedger, verify_inclusion
+from anchoring import AnchoringPipeline, create_chain_from_env
+from record_codec import StringTable, create_codec, decode_records
+from redis.client import NEVER_DECODE
+from ids import new_decision_id
+from decision_repository import DecisionRepository, create_repository
+from decision_events import DecisionEventHub
+from bulk_io import ImportLineError, decompress, iter_batches, iter_lines, parse_import_line
+from validation import ACCEPTED, CLOSED, DUPLICATE, NOT_FOUND, SETTLED_STATUSES, ValidationTally
+import metrics
+from admission import AdmissionMiddleware, ConcurrencyLimiter, RateLimiter, Rejected, rate_limit_key
+from profiler import SamplingProfiler
+import time
+import asyncio
+
 load_dotenv()
 
+# Redis connection (created per worker in the lifespan handler)
+redis_pool: Optional[redis.ConnectionPool] = None
+redis_client: Optional[redis.Redis] = None
+
+# Seconds a starting worker waits for Redis to answer before giving up
+REDIS_STARTUP_TIMEOUT = float(os.getenv("REDIS_STARTUP_TIMEOUT", 30))
+
+# Set once the worker starts shutting down; /ready then reports 503
+draining = False
+
+# Durable decision history (opened per worker in the lifespan handler; DECISION_DB_PATH= disables it)
+decision_repository: Optional[DecisionRepository] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global redis_pool, redis_client, decision_repository
+    redis_pool = create_redis_pool()
+    redis_client = create_redis_client(redis_pool)
+    await wait_for_redis(redis_client, REDIS_STARTUP_TIMEOUT)
+    decision_repository = create_repository(os.getenv("DECISION_DB_PATH", "neurochain.db"))
+    if DECISION_CACHE_REDIS:
+        decision_cache.redis_client = redis_client
+    decision_ledger.repository = decision_repository
+    ledger_task = asyncio.create_task(decision_ledger.run(redis_client))
+    anchoring_pipeline.start(redis_client, mark_anchored)
+    event_hub.start(redis_client)
+    policy_task = asyncio.create_task(watch_policy(ai_engine, POLICY_RELOAD_INTERVAL)) if POLICY_RELOAD_INTERVAL > 0 else None
+    try:
+        yield
+    finally:
+        if policy_task is not None:
+            policy_task.cancel()
+        profiler.stop()
+        await event_hub.stop()
+        await anchoring_pipeline.stop()
+        ledger_task.cancel()
+        try:
+            await ledger_task
+        except asyncio.CancelledError:
+            pass
+        decision_cache.redis_client = None
+        decision_ledger.repository = None
+        if decision_repository is not None:
+            await decision_repository.close()
+            decision_repository = None
+        await close_redis(redis_client, redis_pool)
+        redis_client = None
+        redis_pool = None
+
 app = FastAPI(
     title="Neurochain AI API",
     description="AI decision-making system with blockchain transparency",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
+# Admission control for /api/ routes; /health, /ready and /metrics are never limited
+rate_limiter = RateLimiter(
+    key_rate=float(os.getenv("RATE_LIMIT_PER_KEY", 0)),
+    key_burst=float(os.getenv("RATE_LIMIT_PER_KEY_BURST", 0)),
+    global_rate=float(os.getenv("RATE_LIMIT_GLOBAL", 0)),
+    global_burst=float(os.getenv("RATE_LIMIT_GLOBAL_BURST", 0))
+)
+concurrency_limiter = ConcurrencyLimiter(
+    limit=int(os.getenv("MAX_CONCURRENT_REQUESTS", 100)),
+    target_delay=float(os.getenv("QUEUE_TARGET_MS", 100)) / 1000,
+    timeout=float(os.getenv("QUEUE_TIMEOUT_MS", 1000)) / 1000
+)
+app.add_middleware(
+    AdmissionMiddleware,
+    rate_limiter=rate_limiter,
+    concurrency=concurrency_limiter,
+    get_client=lambda: redis_client,
+    long_running=("/api/decisions/stream", "/api/decisions/import", "/api/decisions/export"),
+    priced_per_item=("/api/decisions/batch", "/api/decisions/validations")
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify your frontend domain
@@ -27,12 +119,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Redis connection
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "localhost"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
-)
+# Per-route latency histograms for /metrics
+app.add_middleware(metrics.MetricsMiddleware, histogram=metrics.HTTP_REQUEST_DURATION)
 
 # Pydantic models
 class DecisionRequest(BaseModel):
@@ -43,274 +131,215 @@ class Decision(BaseModel):
     id: str
     timestamp: str
     question: str
-    reasoning: str
+    reasoning: Optional[str]
     decision: str
     confidence: float
     block_hash: str
     status: str
     category: str
+    anchor_tx_hash: Optional[str] = None
 
 class DecisionResponse(BaseModel):
     decision: Decision
     message: str
 
+class DecisionBatchRequest(BaseModel):
+    decisions: List[DecisionRequest]
+
+class DecisionBatchResponse(BaseModel):
+    decisions: List[Decision]
+    message: str
+
+class ValidationVote(BaseModel):
+    decision_id: str
+    validator: str
+    is_valid: bool
+    reason: Optional[str] = None
+
+class ValidationBatchRequest(BaseModel):
+    votes: List[ValidationVote]
+
 # AI Decision Engine
 class AIDecisionEngine:
-    def __init__(self):
-        self.ethical_guidelines = [
-            "Ensure decisions align with human values and well-being",
-            "Consider potential harm to stakeholders and society",
-            "Maintain transparency in reasoning and decision process",
-            "Respect privacy and data protection principles",
-            "Promote fairness and non-discrimination",
-            "Consider long-term consequences and sustainability",
-            "Prioritize safety and risk mitigation",
-            "Ensure accountability and traceability"
-        ]
+    def __init__(self, policy_path: Optional[str] = None):
+        # Categories, rules and wording live in the policy file (DECISION_POLICY_PATH)
+        self.policy_path = policy_path or os.getenv("DECISION_POLICY_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "decision_policy.json"
+        )
+        self._policy = compile_policy_file(self.policy_path)
+    
+    @property
+    def policy(self) -> CompiledPolicy:
+        return self._policy
+    
+    def reload_policy(self) -> CompiledPolicy:
+        """Compile the policy file and swap it in; the current policy stays on error
         
-        # Decision categories and their specific considerations
-        self.decision_categories = {
-            "financial": {
-                "keywords": ["loan", "credit", "investment", "financial", "money", "payment", "transaction"],
-                "considerations": ["Risk assessment", "Regulatory compliance", "Creditworthiness", "Market conditions"],
-                "confidence_factors": ["Data completeness", "Historical patterns", "Regulatory clarity"]
-            },
-            "medical": {
-                "keywords": ["medical", "diagnosis", "treatment", "health", "patient", "symptom", "disease"],
-                "considerations": ["Medical evidence", "Patient safety", "Treatment efficacy", "Ethical guidelines"],
-                "confidence_factors": ["Test results", "Medical history", "Expert consensus"]
-            },
-            "legal": {
-                "keywords": ["legal", "contract", "law", "compliance", "regulation", "court", "judgment"],
-                "considerations": ["Legal precedent", "Regulatory requirements", "Risk assessment", "Due diligence"],
-                "confidence_factors": ["Legal clarity", "Precedent strength", "Regulatory certainty"]
-            },
-            "content": {
-                "keywords": ["content", "media", "video", "text", "image", "appropriate", "moderation"],
-                "considerations": ["Community guidelines", "Safety standards", "Cultural sensitivity", "Age appropriateness"],
-                "confidence_factors": ["Content clarity", "Guideline specificity", "Context availability"]
-            },
-            "hiring": {
-                "keywords": ["hiring", "recruitment", "candidate", "job", "employment", "interview"],
-                "considerations": ["Qualifications match", "Cultural fit", "Legal compliance", "Diversity goals"],
-                "confidence_factors": ["Resume completeness", "Interview quality", "Reference checks"]
-            },
-            "safety": {
-                "keywords": ["safety", "security", "risk", "danger", "hazard", "protection"],
-                "considerations": ["Risk assessment", "Safety protocols", "Emergency procedures", "Compliance standards"],
-                "confidence_factors": ["Risk data quality", "Protocol clarity", "Compliance status"]
-            }
-        }
+        Requests already running keep the policy object they started with.
+        """
+        self._policy = compile_policy_file(self.policy_path)
+        return self._policy
+    
+    @property
+    def config_fingerprint(self) -> str:
+        # Identifies the rules behind an analysis so cached results can be invalidated
+        return self._policy.fingerprint
+    
+    @property
+    def ethical_guidelines(self) -> list:
+        return self._policy.ethical_guidelines
+    
+    @property
+    def decision_categories(self) -> dict:
+        return self._policy.categories
+    
+    @property
+    def approval_keywords(self) -> list:
+        return self._policy.scoring_keywords["approval"]
+    
+    @property
+    def rejection_keywords(self) -> list:
+        return self._policy.scoring_keywords["rejection"]
+    
+    @property
+    def conditional_keywords(self) -> list:
+        return self._policy.scoring_keywords["conditional"]
     
     def categorize_question(self, question: str) -> str:
         """Categorize the question based on keywords"""
-        question_lower = question.lower()
-        
-        for category, config in self.decision_categories.items():
-            if any(keyword in question_lower for keyword in config["keywords"]):
-                return category
-        
-        return "general"
+        return self._policy.score(question)[0]
     
     def analyze_question(self, question: str, context: str = "") -> dict:
         """Analyze a question and provide a decision with reasoning"""
-        
-        category = self.categorize_question(question)
-        question_lower = question.lower()
-        
-        # Decision patterns with more nuanced analysis
-        approval_keywords = ["approve", "accept", "recommend", "allow", "grant", "positive", "proceed", "continue"]
-        rejection_keywords = ["reject", "deny", "refuse", "block", "negative", "suspicious", "stop", "halt"]
-        conditional_keywords = ["condition", "review", "additional", "further", "pending"]
-        
-        approval_score = sum(1 for keyword in approval_keywords if keyword in question_lower)
-        rejection_score = sum(1 for keyword in rejection_keywords if keyword in question_lower)
-        conditional_score = sum(1 for keyword in conditional_keywords if keyword in question_lower)
-        
-        # Category-specific decision logic
-        if category in self.decision_categories:
-            config = self.decision_categories[category]
-            considerations = config["considerations"]
-            confidence_factors = config["confidence_factors"]
-            
-            # Enhanced decision logic based on category
-            if category == "financial":
-                decision, reasoning = self._analyze_financial_decision(question, approval_score, rejection_score, conditional_score)
-            elif category == "medical":
-                decision, reasoning = self._analyze_medical_decision(question, approval_score, rejection_score, conditional_score)
-            elif category == "legal":
-                decision, reasoning = self._analyze_legal_decision(question, approval_score, rejection_score, conditional_score)
-            elif category == "content":
-                decision, reasoning = self._analyze_content_decision(question, approval_score, rejection_score, conditional_score)
-            elif category == "hiring":
-                decision, reasoning = self._analyze_hiring_decision(question, approval_score, rejection_score, conditional_score)
-            elif category == "safety":
-                decision, reasoning = self._analyze_safety_decision(question, approval_score, rejection_score, conditional_score)
-            else:
-                decision, reasoning = self._analyze_general_decision(question, approval_score, rejection_score, conditional_score)
-        else:
-            decision, reasoning = self._analyze_general_decision(question, approval_score, rejection_score, conditional_score)
-            considerations = ["General best practices", "Risk assessment", "Stakeholder impact"]
-            confidence_factors = ["Information completeness", "Decision clarity", "Context availability"]
-        
-        # Add ethical considerations
-        ethical_considerations = self._get_ethical_considerations(category)
-        reasoning += f" Ethical considerations: {', '.join(ethical_considerations)}."
-        
-        # Calculate confidence based on multiple factors
-        confidence = self._calculate_confidence(approval_score, rejection_score, conditional_score, category, question)
-        
-        return {
-            "decision": decision,
-            "reasoning": reasoning,
-            "confidence": confidence,
-            "category": category
-        }
+        return self._policy.analyze(question)
     
-    def _analyze_financial_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0 or abs(approval_score - rejection_score) <= 1:
-            decision = "APPROVE WITH CONDITIONS"
-            reasoning = f"Financial decision analysis: {question}. Requires additional documentation or risk mitigation measures."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Financial decision analysis: {question}. All criteria met with acceptable risk profile."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Financial decision analysis: {question}. Risk factors exceed acceptable thresholds."
-        return decision, reasoning
-    
-    def _analyze_medical_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "REQUIRE ADDITIONAL TESTING"
-            reasoning = f"Medical decision analysis: {question}. Insufficient information for confident diagnosis."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Medical decision analysis: {question}. Evidence supports the proposed course of action."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Medical decision analysis: {question}. Evidence does not support the proposed course of action."
-        return decision, reasoning
-    
-    def _analyze_legal_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "REQUIRE LEGAL REVIEW"
-            reasoning = f"Legal decision analysis: {question}. Complex legal considerations require expert review."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Legal decision analysis: {question}. Complies with applicable laws and regulations."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Legal decision analysis: {question}. Does not comply with applicable laws and regulations."
-        return decision, reasoning
-    
-    def _analyze_content_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "FLAG FOR MANUAL REVIEW"
-            reasoning = f"Content decision analysis: {question}. Content requires human review for context."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Content decision analysis: {question}. Content meets community guidelines."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Content decision analysis: {question}. Content violates community guidelines."
-        return decision, reasoning
-    
-    def _analyze_hiring_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "REQUIRE ADDITIONAL INTERVIEWS"
-            reasoning = f"Hiring decision analysis: {question}. Candidate shows potential but needs further evaluation."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Hiring decision analysis: {question}. Candidate meets all requirements and is a good fit."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Hiring decision analysis: {question}. Candidate does not meet requirements or is not a good fit."
-        return decision, reasoning
-    
-    def _analyze_safety_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "IMPLEMENT SAFETY MEASURES"
-            reasoning = f"Safety decision analysis: {question}. Proceed with additional safety protocols."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"Safety decision analysis: {question}. Safety requirements are met."
-        else:
-            decision = "REJECTED"
-            reasoning = f"Safety decision analysis: {question}. Safety requirements are not met."
-        return decision, reasoning
-    
-    def _analyze_general_decision(self, question: str, approval_score: int, rejection_score: int, conditional_score: int) -> tuple:
-        if conditional_score > 0:
-            decision = "REQUIRE ADDITIONAL INFORMATION"
-            reasoning = f"General decision analysis: {question}. More information needed for confident decision."
-        elif approval_score > rejection_score:
-            decision = "APPROVED"
-            reasoning = f"General decision analysis: {question}. Decision aligns with best practices and objectives."
-        else:
-            decision = "REJECTED"
-            reasoning = f"General decision analysis: {question}. Decision does not align with best practices or objectives."
-        return decision, reasoning
-    
-    def _get_ethical_considerations(self, category: str) -> list:
-        """Get relevant ethical considerations for the decision category"""
-        if category == "financial":
-            return [self.ethical_guidelines[0], self.ethical_guidelines[1], self.ethical_guidelines[4]]
-        elif category == "medical":
-            return [self.ethical_guidelines[0], self.ethical_guidelines[1], self.ethical_guidelines[3]]
-        elif category == "legal":
-            return [self.ethical_guidelines[4], self.ethical_guidelines[6], self.ethical_guidelines[7]]
-        elif category == "content":
-            return [self.ethical_guidelines[1], self.ethical_guidelines[3], self.ethical_guidelines[4]]
-        elif category == "hiring":
-            return [self.ethical_guidelines[4], self.ethical_guidelines[5], self.ethical_guidelines[7]]
-        elif category == "safety":
-            return [self.ethical_guidelines[1], self.ethical_guidelines[6], self.ethical_guidelines[7]]
-        else:
-            return self.ethical_guidelines[:3]
+    def analyze_batch(self, questions: List[str], contexts: Optional[List[str]] = None) -> List[dict]:
+        """Analyze many questions at once; results match analyze_question per item"""
+        # One policy for the whole batch, even if it is reloaded meanwhile
+        policy = self._policy
+        analyses = {}
+        results = []
+        for question in questions:
+            # Identical questions in a batch are analyzed once
+            analysis = analyses.get(question)
+            if analysis is None:
+                analysis = analyses[question] = policy.analyze(question)
+            results.append(dict(analysis))
+        return results
+    
+    def _score_question(self, question: str) -> tuple:
+        """Return the category and approval/rejection/conditional keyword scores"""
+        return self._policy.score(question)
+    
+    def _build_analysis(self, question: str, category: str, approval_score: int, rejection_score: int, conditional_score: int) -> dict:
+        return self._policy.build(question, category, approval_score, rejection_score, conditional_score)
     
     def _calculate_confidence(self, approval_score: int, rejection_score: int, conditional_score: int, category: str, question: str) -> float:
         """Calculate confidence score based on multiple factors"""
-        base_confidence = 70
-        
-        # Decision clarity factor
-        decision_clarity = abs(approval_score - rejection_score) * 5
-        base_confidence += decision_clarity
-        
-        # Category-specific confidence adjustments
-        category_confidence = {
-            "financial": 5,  # Financial decisions often have clear criteria
-            "medical": -5,   # Medical decisions can be complex
-            "legal": 0,      # Legal decisions vary in complexity
-            "content": 10,   # Content decisions often have clear guidelines
-            "hiring": -3,    # Hiring decisions can be subjective
-            "safety": 8,     # Safety decisions often have clear standards
-            "general": 0
-        }
-        
-        base_confidence += category_confidence.get(category, 0)
-        
-        # Conditional factor (reduces confidence)
-        if conditional_score > 0:
-            base_confidence -= conditional_score * 10
-        
-        # Question complexity factor
-        question_length = len(question.split())
-        if question_length > 20:
-            base_confidence -= 5
-        elif question_length < 5:
-            base_confidence -= 3
-        
-        # Ensure confidence is within bounds
-        return max(50, min(95, base_confidence))
+        return self._policy.confidence(approval_score, rejection_score, conditional_score, category, question)
     
     def generate_block_hash(self, decision_data: dict) -> str:
         """Generate a blockchain transaction hash"""
         data_string = json.dumps(decision_data, sort_keys=True)
         return hashlib.sha256(data_string.encode()).hexdigest()
+    
+    def generate_block_hashes(self, decisions: List[dict]) -> List[str]:
+        """Hash many decisions; each result equals generate_block_hash for that decision"""
+        encode = json.JSONEncoder(sort_keys=True).encode
+        sha256 = hashlib.sha256
+        return [sha256(encode(decision_data).encode()).hexdigest() for decision_data in decisions]
 
 # Initialize AI engine
 ai_engine = AIDecisionEngine()
 
+# Seconds between checks of the policy file for changes (0 disables hot reload)
+POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", 5))
+
+# Memoize analyses of repeated questions, optionally shared between workers through Redis
+decision_cache = DecisionCache(
+    ai_engine,
+    max_size=int(os.getenv("DECISION_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("DECISION_CACHE_TTL", 300)),
+    redis_ttl=int(os.getenv("DECISION_CACHE_REDIS_TTL", 3600))
+)
+DECISION_CACHE_REDIS = os.getenv("DECISION_CACHE_REDIS", "false").lower() == "true"
+
+# Seal decisions into Merkle blocks by size or time window; Redis keeps sealed blocks for LEDGER_RETENTION seconds
+decision_ledger = DecisionLedger(
+    block_size=int(os.getenv("LEDGER_BLOCK_SIZE", 256)),
+    block_interval=float(os.getenv("LEDGER_BLOCK_INTERVAL", 5)),
+    retention=int(os.getenv("LEDGER_RETENTION", 86400))
+)
+
+# Anchor decisions on chain in the background (ANCHOR_BACKEND=mock|web3 to enable)
+anchoring_pipeline = AnchoringPipeline(
+    create_chain_from_env(),
+    workers=int(os.getenv("ANCHOR_WORKERS", 2)),
+    batch_size=int(os.getenv("ANCHOR_BATCH_SIZE", 20)),
+    max_attempts=int(os.getenv("ANCHOR_MAX_ATTEMPTS", 5)),
+    claim_idle=float(os.getenv("ANCHOR_CLAIM_IDLE", 60))
+)
+
+# Storage format for new decision records (json or msgpack); reads accept both
+codec_strings = StringTable()
+record_codec = create_codec(os.getenv("DECISION_CODEC", "json"), codec_strings, ai_engine)
+
+# Fan out decision changes to server-sent event subscribers
+event_hub = DecisionEventHub(
+    maxlen=int(os.getenv("EVENT_STREAM_MAXLEN", 10000)),
+    queue_size=int(os.getenv("EVENT_QUEUE_SIZE", 1000))
+)
+
+# Upper bound on decisions accepted by the batch endpoint
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 1000))
+
+# Validator votes: agreeing votes that settle a decision, seconds a tally is kept, votes per request
+validation_tally = ValidationTally(
+    quorum=int(os.getenv("VALIDATION_QUORUM", 3)),
+    ttl=float(os.getenv("VALIDATION_TTL", 7 * 86400))
+)
+MAX_VOTE_BATCH_SIZE = int(os.getenv("MAX_VOTE_BATCH_SIZE", 10000))
+
+# Decisions kept in the Redis recent list, which serves the first page when there is no repository
+RECENT_DECISIONS_SIZE = 100
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 1000))
+
+# Bulk NDJSON import/export: lines per write batch, longest accepted line, errors listed in the summary
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+MAX_IMPORT_LINE_BYTES = int(os.getenv("MAX_IMPORT_LINE_BYTES", 1 << 20))
+MAX_REPORTED_IMPORT_ERRORS = 100
+EXPORT_PAGE_SIZE = 1000
+
+async def read_decisions(decision_ids: List[str], include_reasoning: bool = True) -> List[Optional[dict]]:
+    """Read decision records in a single MGET round trip; expired keys come back as None"""
+    if not decision_ids:
+        return []
+    
+    payloads = await redis_client.execute_command(
+        "MGET", *[f"decision:{decision_id}" for decision_id in decision_ids], **{NEVER_DECODE: True}
+    )
+    return await decode_records(redis_client, codec_strings, payloads, include_reasoning)
+
+async def load_decisions(decision_ids: List[str], include_reasoning: bool = True) -> List[dict]:
+    """Load decision records, skipping expired keys"""
+    return [record for record in await read_decisions(decision_ids, include_reasoning) if record]
+
+async def read_statuses(decision_ids: List[str]) -> dict:
+    """Return the status of each decision found in Redis or, once expired there, in the repository"""
+    records = await read_decisions(decision_ids, include_reasoning=False)
+    statuses = {decision_dict["id"]: decision_dict["status"] for decision_dict in records if decision_dict}
+    expired = [decision_id for decision_id in decision_ids if decision_id not in statuses]
+    if expired and decision_repository is not None:
+        statuses.update(await decision_repository.statuses(expired))
+    return statuses
+
+async def read_decision(decision_id: str) -> Optional[dict]:
+    """Read a single decision record, falling back to the repository once it expires from Redis"""
+    decision_dict = (await read_decisions([decision_id]))[0]
+    if decision_dict is None and decision_repository is not None:
+        decision_dict = await decision_repository.get(decision_id)
+    return decision_dict
+
 @app.get("/")
 async def root():
     return {
@@ -322,7 +351,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     try:
-        redis_client.ping()
+        await redis_client.ping()
         redis_status = "healthy"
     except:
         redis_status = "unhealthy"
@@ -333,42 +362,272 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 while this worker accepts traffic and Redis answers"""
+    if draining:
+        raise HTTPException(status_code=503, detail="Draining")
+    try:
+        await redis_client.ping()
+    except Exception:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    return {"status": "ready"}
+
+async def drain() -> None:
+    """Prepare for shutdown: fail readiness and end event streams
+    
+    Event streams never finish on their own and would hold the worker
+    until the graceful shutdown timeout. Their clients reconnect to
+    another worker and resume from Last-Event-ID.
+    """
+    global draining
+    draining = True
+    event_hub.close_subscribers()
+
+def observe_stage(operation: str, stage: str, start: float) -> float:
+    """Record the time since `start` for one stage and return the current time"""
+    now = time.perf_counter()
+    metrics.DECISION_STAGE_DURATION.observe(now - start, operation, stage)
+    return now
+
+# Fields covered by a decision's block_hash
+HASHED_FIELDS = ("id", "timestamp", "question", "reasoning", "decision", "confidence", "category")
+
+def build_decision_record(decision_id: str, timestamp: str, question: str, analysis: dict) -> dict:
+    """Assemble a pending decision record and its blockchain hash"""
+    decision_data = {
+        "id": decision_id,
+        "timestamp": timestamp,
+        "question": question,
+        "reasoning": analysis["reasoning"],
+        "decision": analysis["decision"],
+        "confidence": analysis["confidence"],
+        "category": analysis["category"]
+    }
+    
+    # Generate blockchain hash
+    block_hash = ai_engine.generate_block_hash(decision_data)
+    decision_data["block_hash"] = block_hash
+    decision_data["status"] = "pending"
+    return decision_data
+
+async def store_decisions(records: List[dict], operation: str = "create", live: bool = True) -> None:
+    """Persist records, then cache them and update the recent list and statistics in one transaction
+    
+    Each stage is timed under its `operation` label. Records that are not
+    `live`, such as bulk imports, are only persisted, counted and queued
+    for the ledger: they are not cached in Redis or published to event
+    subscribers, and only those still pending without a transaction hash
+    are queued for anchoring.
+    
+    If the Redis transaction fails, the records are deleted from the
+    repository again, so a failed request leaves no decision behind
+    without its statistics, ledger entry and anchoring.
+    """
+    stage_start = time.perf_counter()
+    if decision_repository is not None:
+        await decision_repository.save_many(records)
+        stage_start = observe_stage(operation, "repository", stage_start)
+    
+    try:
+        await cache_decisions(records, operation, live, stage_start)
+    except Exception:
+        if decision_repository is not None:
+            await decision_repository.delete_many([decision_data["id"] for decision_data in records])
+        raise
+    
+    for decision_data in records:
+        metrics.DECISIONS_CREATED.inc(decision_data["category"], decision_data["decision"])
+
+async def cache_decisions(records: List[dict], operation: str, live: bool, stage_start: float) -> None:
+    """Cache, count, list and queue saved records in one Redis transaction"""
+    payloads = [await record_codec.encode(redis_client, decision_data) for decision_data in records] if live else []
+    stage_start = observe_stage(operation, "encode", stage_start)
+    
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for decision_data, payload in zip(records, payloads):
+            pipe.setex(
+                f"decision:{decision_data['id']}",
+                3600,  # 1 hour TTL
+                payload
+            )
+        stats.record_created(pipe, records)
+        
+        # Add to recent decisions list, newest first
+        pipe.lpush("recent_decisions", *[decision_data["id"] for decision_data in records])
+        if live:
+            pipe.ltrim("recent_decisions", 0, RECENT_DECISIONS_SIZE - 1)
+        else:
+            # Imported decisions may be older than the listed ones; keep the list in ID order
+            pipe.sort("recent_decisions", start=0, num=RECENT_DECISIONS_SIZE, desc=True, alpha=True,
+                      store="recent_decisions")
+        
+        # Queue for the next ledger block and for on-chain anchoring, and notify subscribers
+        decision_ledger.queue(pipe, records)
+        if live:
+            anchoring_pipeline.enqueue(pipe, records)
+        else:
+            anchoring_pipeline.enqueue(pipe, [
+                decision_data for decision_data in records
+                if decision_data["status"] == "pending" and not decision_data.get("anchor_tx_hash")
+            ])
+        if live:
+            event_hub.publish(pipe, "created", records)
+        await pipe.execute()
+    observe_stage(operation, "redis_write", stage_start)
+
+def changed_fields(before: dict, after: dict) -> dict:
+    return {field: value for field, value in after.items() if before.get(field) != value}
+
+async def update_decisions(decision_ids: List[str], update) -> List[Optional[dict]]:
+    """Atomically apply `update` to stored decisions and keep the status counters in step
+    
+    Records still cached in Redis are updated there in one transaction
+    under WATCH and then written through to the repository. Older records
+    are updated in the repository only, each guarded by its previous status.
+    
+    Returns the updated records in order, with None for those that do not exist.
+    """
+    decision_keys = [f"decision:{decision_id}" for decision_id in decision_ids]
+    
+    async def apply(pipe):
+        payloads = await pipe.execute_command("MGET", *decision_keys, **{NEVER_DECODE: True})
+        decision_dicts = await decode_records(redis_client, codec_strings, payloads)
+        
+        # (record, changed fields, status before the update) for records the update changes
+        changes = []
+        for decision_dict in decision_dicts:
+            if decision_dict is not None:
+                before = dict(decision_dict)
+                update(decision_dict)
+                changed = changed_fields(before, decision_dict)
+                if changed:
+                    changes.append((decision_dict, changed, before["status"]))
+        if not changes:
+            return decision_dicts, changes
+        payloads = [await record_codec.encode(redis_client, decision_dict) for decision_dict, _, _ in changes]
+        
+        # Retried by the client if any of the records changes concurrently
+        pipe.multi()
+        for (decision_dict, _, previous_status), payload in zip(changes, payloads):
+            pipe.setex(f"decision:{decision_dict['id']}", 3600, payload)
+            stats.record_status_change(pipe, decision_dict, previous_status, decision_dict["status"])
+        event_hub.publish(pipe, "updated", [decision_dict for decision_dict, _, _ in changes])
+        return decision_dicts, changes
+    
+    decision_dicts, changes = await redis_client.transaction(apply, *decision_keys, value_from_callable=True)
+    if decision_repository is not None:
+        if changes:
+            await write_through([(decision_dict["id"], changed, previous_status) for decision_dict, changed, previous_status in changes])
+        for index, decision_dict in enumerate(decision_dicts):
+            if decision_dict is None:
+                decision_dicts[index] = await update_stored_decision(decision_ids[index], update)
+    
+    for decision_dict in decision_dicts:
+        if decision_dict is not None:
+            metrics.DECISION_UPDATES.inc(decision_dict["status"])
+    return decision_dicts
+
+async def update_decision(decision_id: str, update) -> Optional[dict]:
+    """Atomically apply `update` to a stored decision; returns None if it does not exist"""
+    return (await update_decisions([decision_id], update))[0]
+
+# Attempts to write an update through before the record is copied from Redis instead
+WRITE_THROUGH_ATTEMPTS = 5
+
+async def write_through(changes: List[tuple]) -> None:
+    """Copy (decision ID, changed fields, previous status) updates made in Redis to the repository
+    
+    Only the changed columns are written, guarded by the status the update
+    started from, so updates reach the repository in the order Redis
+    applied them. A guard fails when an earlier update from another worker
+    has not arrived yet, so the write is retried. If it still fails, the
+    earlier update was lost or a later one overtook it, and the record's
+    current state in Redis is copied instead.
+    """
+    for attempt in range(WRITE_THROUGH_ATTEMPTS):
+        applied = await decision_repository.compare_and_set_many(changes)
+        changes = [change for change, ok in zip(changes, applied) if not ok]
+        if not changes:
+            return
+        await asyncio.sleep(0.005 * 2 ** attempt)
+    
+    for decision_id, _, _ in changes:
+        await sync_stored_decision(decision_id)
+
+async def sync_stored_decision(decision_id: str) -> None:
+    """Make the repository's copy of a decision match the one cached in Redis"""
+    while True:
+        cached = (await read_decisions([decision_id]))[0]
+        stored = await decision_repository.get(decision_id)
+        if cached is None or stored is None:
+            return
+        changed = changed_fields(stored, cached)
+        if not changed or await decision_repository.compare_and_set(decision_id, changed, stored["status"]):
+            return
+
+async def update_stored_decision(decision_id: str, update) -> Optional[dict]:
+    """Apply `update` to a decision that has expired from Redis, in the repository only"""
+    while True:
+        decision_dict = await decision_repository.get(decision_id)
+        if decision_dict is None:
+            return None
+        
+        before = dict(decision_dict)
+        update(decision_dict)
+        changed = changed_fields(before, decision_dict)
+        if not changed:
+            return decision_dict
+        if await decision_repository.compare_and_set(decision_id, changed, before["status"]):
+            break
+    
+    async with redis_client.pipeline(transaction=True) as pipe:
+        stats.record_status_change(pipe, decision_dict, before["status"], decision_dict["status"])
+        event_hub.publish(pipe, "updated", [decision_dict])
+        await pipe.execute()
+    return decision_dict
+
+async def charge_items(http_request: Request, count: int) -> None:
+    """Charge a batch request's rate limit buckets one token per item"""
+    if not rate_limiter.enabled or redis_client is None:
+        return
+    try:
+        await rate_limiter.acquire(redis_client, rate_limit_key(http_request.scope), cost=count)
+    except Rejected as e:
+        metrics.ADMISSION_REJECTIONS.inc(e.reason)
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+
+async def mark_anchored(confirmations: Dict[str, str]) -> None:
+    """Record a batch of on-chain confirmations (decision ID to transaction hash) reported by the anchoring pipeline"""
+    def anchor(decision_dict):
+        # A decision is anchored once; a redelivered entry must not replace its hash
+        if decision_dict.get("anchor_tx_hash"):
+            return
+        decision_dict["anchor_tx_hash"] = confirmations[decision_dict["id"]]
+        if decision_dict["status"] == "pending":
+            decision_dict["status"] = "anchored"
+    
+    await update_decisions(list(confirmations), anchor)
+
 @app.post("/api/decisions", response_model=DecisionResponse)
 async def create_decision(request: DecisionRequest):
     """Create a new AI decision"""
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
     try:
         # Generate AI decision
-        analysis = ai_engine.analyze_question(request.question, request.context or "")
+        stage_start = time.perf_counter()
+        analysis = await decision_cache.analyze(request.question, request.context or "")
+        stage_start = observe_stage("create", "analyze", stage_start)
         
         # Create decision object
-        decision_id = f"decision_{int(time.time() * 1000)}"
+        decision_id = new_decision_id()
         timestamp = datetime.now().isoformat()
         
-        decision_data = {
-            "id": decision_id,
-            "timestamp": timestamp,
-            "question": request.question,
-            "reasoning": analysis["reasoning"],
-            "decision": analysis["decision"],
-            "confidence": analysis["confidence"],
-            "category": analysis["category"]
-        }
-        
-        # Generate blockchain hash
-        block_hash = ai_engine.generate_block_hash(decision_data)
-        decision_data["block_hash"] = block_hash
-        decision_data["status"] = "pending"
-        
-        # Store in Redis
-        redis_client.setex(
-            f"decision:{decision_id}",
-            3600,  # 1 hour TTL
-            json.dumps(decision_data)
-        )
-        
-        # Add to recent decisions list
-        redis_client.lpush("recent_decisions", decision_id)
-        redis_client.ltrim("recent_decisions", 0, 99)  # Keep last 100 decisions
+        decision_data = build_decision_record(decision_id, timestamp, request.question, analysis)
+        observe_stage("create", "hash", stage_start)
+        await store_decisions([decision_data])
         
         decision = Decision(**decision_data)
         
@@ -380,56 +639,275 @@ async def create_decision(request: DecisionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating decision: {str(e)}")
 
+@app.post("/api/decisions/batch", response_model=DecisionBatchResponse)
+async def create_decisions_batch(request: DecisionBatchRequest, http_request: Request):
+    """Create many AI decisions in one request"""
+    if not request.decisions:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one decision")
+    if len(request.decisions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds maximum size of {MAX_BATCH_SIZE}")
+    if any(not item.question.strip() for item in request.decisions):
+        raise HTTPException(status_code=400, detail="Every decision needs a question")
+    await charge_items(http_request, len(request.decisions))
+    
+    try:
+        stage_start = time.perf_counter()
+        analyses = await decision_cache.analyze_batch(
+            [item.question for item in request.decisions],
+            [item.context or "" for item in request.decisions]
+        )
+        stage_start = observe_stage("batch", "analyze", stage_start)
+        
+        timestamp = datetime.now().isoformat()
+        
+        records = [
+            build_decision_record(new_decision_id(), timestamp, item.question, analysis)
+            for item, analysis in zip(request.decisions, analyses)
+        ]
+        observe_stage("batch", "hash", stage_start)
+        await store_decisions(records, operation="batch")
+        
+        return DecisionBatchResponse(
+            decisions=[Decision(**decision_data) for decision_data in records],
+            message=f"{len(records)} decisions created successfully and recorded on blockchain"
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating decisions: {str(e)}")
+
 @app.get("/api/decisions", response_model=List[Decision])
-async def get_decisions(limit: int = 10):
-    """Get recent decisions"""
+async def get_decisions(
+    response: Response,
+    limit: int = 10,
+    include_reasoning: bool = True,
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get decisions newest first, optionally filtered
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
+    Pages come from the repository, which is in ID order. The Redis recent
+    list is in the order records were cached, which concurrent requests
+    can make differ from ID order, so it only serves the first page when
+    there is no repository and hence no cursor.
+    """
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"Limit must be between 1 and {MAX_PAGE_SIZE}")
+    
     try:
-        # Get recent decision IDs
-        decision_ids = redis_client.lrange("recent_decisions", 0, limit - 1)
+        records = None
+        next_cursor = None
+        filters = (cursor, category, status, min_confidence, max_confidence, since, until)
+        if decision_repository is None and all(value is None for value in filters):
+            decision_ids = await redis_client.lrange("recent_decisions", 0, limit - 1)
+            records = await load_decisions(decision_ids, include_reasoning)
         
-        decisions = []
-        for decision_id in decision_ids:
-            decision_data = redis_client.get(f"decision:{decision_id}")
-            if decision_data:
-                decisions.append(Decision(**json.loads(decision_data)))
+        if records is None:
+            if decision_repository is None:
+                raise HTTPException(status_code=400, detail="Filtered queries require the decision repository")
+            records, next_cursor = await decision_repository.query(
+                limit=limit, cursor=cursor, category=category, status=status,
+                min_confidence=min_confidence, max_confidence=max_confidence, since=since, until=until
+            )
+            if not include_reasoning:
+                for decision_dict in records:
+                    decision_dict["reasoning"] = None
         
-        return decisions
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [Decision(**decision_dict) for decision_dict in records]
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving decisions: {str(e)}")
 
+async def import_batch(lines: List[tuple], summary: dict) -> None:
+    """Parse, analyze, hash and store one batch of import lines, updating summary"""
+    def fail(line_number: int, error: str) -> None:
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_IMPORT_ERRORS:
+            summary["errors"].append({"line": line_number, "error": error})
+    
+    stage_start = time.perf_counter()
+    now = datetime.now()
+    items = []
+    for line_number, line in lines:
+        try:
+            items.append((line_number, parse_import_line(line, now)))
+        except ImportLineError as e:
+            fail(line_number, str(e))
+    
+    # Decisions that are already stored (e.g. when resuming an import) are skipped
+    existing = await decision_repository.existing_ids([item["id"] for _, item in items])
+    pending = []
+    for line_number, item in items:
+        if item["id"] in existing:
+            summary["skipped"] += 1
+        else:
+            existing.add(item["id"])
+            pending.append((line_number, item))
+    stage_start = observe_stage("import", "parse", stage_start)
+    
+    to_analyze = [item for _, item in pending if "decision" not in item]
+    for item, analysis in zip(to_analyze, ai_engine.analyze_batch([item["question"] for item in to_analyze])):
+        item.update(analysis)
+    stage_start = observe_stage("import", "analyze", stage_start)
+    
+    hashed = [{field: item[field] for field in HASHED_FIELDS} for _, item in pending]
+    records = []
+    for (line_number, item), decision_data, block_hash in zip(pending, hashed, ai_engine.generate_block_hashes(hashed)):
+        if item["block_hash"] is not None and item["block_hash"] != block_hash:
+            fail(line_number, "block_hash does not match the decision content")
+            continue
+        decision_data["block_hash"] = block_hash
+        decision_data["status"] = item["status"]
+        if item["anchor_tx_hash"] is not None:
+            decision_data["anchor_tx_hash"] = item["anchor_tx_hash"]
+        records.append(decision_data)
+    observe_stage("import", "hash", stage_start)
+    
+    if records:
+        await store_decisions(records, operation="import", live=False)
+    summary["imported"] += len(records)
+
+@app.post("/api/decisions/import")
+async def import_decisions(request: Request):
+    """Import decisions from an NDJSON request body, one JSON object per line
+    
+    The body is processed in batches as it streams in, so uploads of any
+    size use constant memory. Invalid lines are reported and skipped;
+    decisions whose ID is already stored are skipped, so an interrupted
+    import can be re-run. Accepts gzip Content-Encoding.
+    """
+    if decision_repository is None:
+        raise HTTPException(status_code=400, detail="Bulk import requires the decision repository")
+    
+    summary = {"lines": 0, "imported": 0, "skipped": 0, "failed": 0, "errors": []}
+    try:
+        chunks = decompress(request.stream(), request.headers.get("content-encoding"))
+        async for batch in iter_batches(iter_lines(chunks, MAX_IMPORT_LINE_BYTES), IMPORT_BATCH_SIZE):
+            summary["lines"] = batch[-1][0]
+            counts = (summary["imported"], summary["skipped"], summary["failed"])
+            await import_batch(batch, summary)
+            for result, before in zip(("imported", "skipped", "failed"), counts):
+                metrics.DECISIONS_IMPORTED.inc(result, amount=summary[result] - before)
+        return summary
+        
+    except (ValueError, zlib.error) as e:
+        # Malformed stream: report how far the import got before stopping
+        summary["error"] = str(e)
+        return JSONResponse(status_code=400, content=summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing decisions after {summary['imported']} imported: {str(e)}")
+
+@app.get("/api/decisions/export")
+async def export_decisions(
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Stream matching decisions newest first as NDJSON, one page of the repository at a time"""
+    if decision_repository is None:
+        raise HTTPException(status_code=400, detail="Export requires the decision repository")
+    
+    async def lines():
+        cursor = None
+        while True:
+            records, cursor = await decision_repository.query(
+                limit=EXPORT_PAGE_SIZE, cursor=cursor, category=category, status=status,
+                min_confidence=min_confidence, max_confidence=max_confidence, since=since, until=until
+            )
+            yield "".join(json.dumps(decision_dict) + "\n" for decision_dict in records).encode()
+            if cursor is None:
+                return
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="decisions.ndjson"'}
+    )
+
+@app.get("/api/decisions/stream")
+async def stream_decisions(request: Request, last_event_id: Optional[str] = None):
+    """Stream created and updated decisions as server-sent events
+    
+    Reconnecting clients resume after the Last-Event-ID header (or the
+    last_event_id query parameter).
+    """
+    return StreamingResponse(
+        event_hub.subscribe(redis_client, request.headers.get("last-event-id") or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/decisions/{decision_id}", response_model=Decision)
 async def get_decision(decision_id: str):
     """Get a specific decision by ID"""
     try:
-        decision_data = redis_client.get(f"decision:{decision_id}")
-        if not decision_data:
+        decision_dict = await read_decision(decision_id)
+        if not decision_dict:
             raise HTTPException(status_code=404, detail="Decision not found")
         
-        return Decision(**json.loads(decision_data))
+        return Decision(**decision_dict)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving decision: {str(e)}")
 
+# Settled decisions whose status updates run at once
+OUTCOME_UPDATE_CONCURRENCY = int(os.getenv("OUTCOME_UPDATE_CONCURRENCY", 16))
+
+async def apply_validation_outcomes(progress: dict, statuses: dict) -> None:
+    """Set the status of every decision whose tally is settled to the tally's outcome
+    
+    Runs for all decisions a request touches, not only those it settles,
+    so an outcome whose status update failed is applied on the next vote.
+    Each decision is updated in its own transaction watching only its key,
+    so a concurrent change to one decision retries that update alone. The
+    whole record is still re-encoded, since status is stored inside it.
+    """
+    outcomes = {
+        decision_id: tally["outcome"] for decision_id, tally in progress.items()
+        if tally["outcome"] and statuses.get(decision_id) != tally["outcome"]
+    }
+    
+    def settle(decision_dict):
+        decision_dict["status"] = outcomes[decision_dict["id"]]
+    
+    decision_ids = list(outcomes)
+    for start in range(0, len(decision_ids), OUTCOME_UPDATE_CONCURRENCY):
+        await asyncio.gather(*[
+            update_decision(decision_id, settle)
+            for decision_id in decision_ids[start:start + OUTCOME_UPDATE_CONCURRENCY]
+        ])
+
 @app.post("/api/decisions/{decision_id}/validate")
 async def validate_decision(decision_id: str):
-    """Validate a decision (simulate blockchain consensus)"""
+    """Validate a decision (simulate blockchain consensus)
+    
+    Settles the decision's validator tally as validated, so later votes are
+    refused. A decision already rejected by validator quorum gets 409.
+    """
     try:
-        decision_data = redis_client.get(f"decision:{decision_id}")
-        if not decision_data:
+        statuses = await read_statuses([decision_id])
+        if decision_id not in statuses:
             raise HTTPException(status_code=404, detail="Decision not found")
         
-        decision_dict = json.loads(decision_data)
-        decision_dict["status"] = "validated"
-        
-        # Update in Redis
-        redis_client.setex(
-            f"decision:{decision_id}",
-            3600,
-            json.dumps(decision_dict)
-        )
+        status = statuses[decision_id]
+        progress = await validation_tally.close(redis_client, decision_id, status if status in SETTLED_STATUSES else "validated")
+        await apply_validation_outcomes({decision_id: progress}, statuses)
+        if progress["outcome"] != "validated":
+            raise HTTPException(status_code=409, detail=f"Decision was already {progress['outcome']} by validator quorum")
         
         return {
             "message": "Decision validated successfully",
@@ -442,44 +920,261 @@ async def validate_decision(decision_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error validating decision: {str(e)}")
 
-@app.get("/api/stats")
-async def get_stats():
-    """Get system statistics"""
+@app.post("/api/decisions/validations")
+async def submit_validations(request: ValidationBatchRequest, http_request: Request):
+    """Record votes from any number of validators on any number of decisions
+    
+    Each validator's first vote on a decision counts. A decision is
+    validated or rejected as soon as VALIDATION_QUORUM votes agree, and
+    later votes on it are refused as closed. The response holds each
+    vote's result and the progress of every decision voted on.
+    """
+    if not request.votes:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one vote")
+    if len(request.votes) > MAX_VOTE_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds maximum size of {MAX_VOTE_BATCH_SIZE}")
+    if any(not vote.validator.strip() for vote in request.votes):
+        raise HTTPException(status_code=400, detail="Every vote needs a validator")
+    await charge_items(http_request, len(request.votes))
+    
+    try:
+        statuses = await read_statuses(list(dict.fromkeys(vote.decision_id for vote in request.votes)))
+        votes = [
+            {"decision_id": vote.decision_id, "validator": vote.validator, "is_valid": vote.is_valid, "reason": vote.reason}
+            for vote in request.votes if vote.decision_id in statuses
+        ]
+        results, progress = await validation_tally.submit(redis_client, votes, statuses)
+        await apply_validation_outcomes(progress, statuses)
+        
+        recorded = iter(results)
+        results = [next(recorded) if vote.decision_id in statuses else NOT_FOUND for vote in request.votes]
+        counts = {result: results.count(result) for result in (ACCEPTED, DUPLICATE, CLOSED, NOT_FOUND)}
+        for result, count in counts.items():
+            if count:
+                metrics.VALIDATION_VOTES.inc(result, amount=count)
+        
+        return {**counts, "results": results, "decisions": progress}
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error recording validations: {str(e)}")
+
+@app.get("/api/decisions/{decision_id}/validation")
+async def get_validation(decision_id: str):
+    """Get a decision's validator votes and progress towards quorum"""
+    try:
+        statuses = await read_statuses([decision_id])
+        if decision_id not in statuses:
+            raise HTTPException(status_code=404, detail="Decision not found")
+        
+        progress = await validation_tally.get(redis_client, decision_id)
+        if progress["outcome"] is None and statuses[decision_id] in SETTLED_STATUSES:
+            # The tally has expired; the decision's status still holds its outcome
+            progress["outcome"] = statuses[decision_id]
+        
+        return {"decision_id": decision_id, **progress}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving validation: {str(e)}")
+
+@app.get("/api/decisions/{decision_id}/proof")
+async def get_decision_proof(decision_id: str):
+    """Get the Merkle inclusion proof for a decision"""
+    try:
+        inclusion = await decision_ledger.get_proof(redis_client, decision_id)
+        if not inclusion:
+            raise HTTPException(status_code=404, detail="Decision has not been sealed into a ledger block")
+        
+        return inclusion
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving proof: {str(e)}")
+
+@app.get("/api/decisions/{decision_id}/verify")
+async def verify_decision(decision_id: str):
+    """Verify a decision's content against its ledger block"""
     try:
-        total_decisions = redis_client.llen("recent_decisions")
-        
-        # Get recent decisions for status counts
-        decision_ids = redis_client.lrange("recent_decisions", 0, 99)
-        validated_count = 0
-        pending_count = 0
-        total_confidence = 0
-        confidence_count = 0
-        
-        for decision_id in decision_ids:
-            decision_data = redis_client.get(f"decision:{decision_id}")
-            if decision_data:
-                decision_dict = json.loads(decision_data)
-                if decision_dict["status"] == "validated":
-                    validated_count += 1
-                elif decision_dict["status"] == "pending":
-                    pending_count += 1
-                
-                total_confidence += decision_dict["confidence"]
-                confidence_count += 1
-        
-        avg_confidence = total_confidence / confidence_count if confidence_count > 0 else 0
+        decision_dict = await read_decision(decision_id)
+        if not decision_dict:
+            raise HTTPException(status_code=404, detail="Decision not found")
+        
+        inclusion = await decision_ledger.get_proof(redis_client, decision_id)
+        if not inclusion:
+            raise HTTPException(status_code=409, detail="Decision has not been sealed into a ledger block yet")
+        
+        content_hash = ai_engine.generate_block_hash({field: decision_dict[field] for field in HASHED_FIELDS})
+        content_valid = content_hash == decision_dict["block_hash"]
+        proof_valid = verify_inclusion(content_hash, inclusion)
+        
+        # The block must also extend the block before it
+        chain_valid = True
+        if inclusion["block_height"] > 0:
+            previous_block = await decision_ledger.get_block(redis_client, inclusion["block_height"] - 1)
+            chain_valid = previous_block is not None and previous_block["block_root"] == inclusion["previous_root"]
         
         return {
-            "total_decisions": total_decisions,
-            "validated_decisions": validated_count,
-            "pending_decisions": pending_count,
-            "average_confidence": round(avg_confidence, 2),
-            "system_status": "healthy"
+            "decision_id": decision_id,
+            "valid": content_valid and proof_valid and chain_valid,
+            "content_valid": content_valid,
+            "proof_valid": proof_valid,
+            "chain_valid": chain_valid,
+            "block_height": inclusion["block_height"],
+            "block_root": inclusion["block_root"]
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error verifying decision: {str(e)}")
+
+@app.get("/api/ledger/head")
+async def get_ledger_head():
+    """Get the latest sealed ledger block header"""
+    try:
+        head = await decision_ledger.get_head(redis_client)
+        if not head:
+            raise HTTPException(status_code=404, detail="No ledger blocks sealed yet")
+        
+        return head
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving ledger head: {str(e)}")
+
+@app.get("/api/ledger/blocks/{height}")
+async def get_ledger_block(height: int):
+    """Get a sealed ledger block"""
+    try:
+        block = await decision_ledger.get_block(redis_client, height)
+        if not block:
+            raise HTTPException(status_code=404, detail="Block not found")
+        
+        return block
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving block: {str(e)}")
+
+@app.get("/api/anchoring/status")
+async def get_anchoring_status():
+    """Get anchoring queue depth and lag"""
+    try:
+        return await anchoring_pipeline.metrics(redis_client)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving anchoring status: {str(e)}")
+
+@app.get("/api/policy")
+async def get_policy():
+    """Get the active decision policy"""
+    policy = ai_engine.policy
+    return {
+        "path": ai_engine.policy_path,
+        "fingerprint": policy.fingerprint,
+        "version": policy.document.get("version"),
+        "categories": list(policy.categories)
+    }
+
+@app.post("/api/policy/reload")
+async def reload_policy():
+    """Reload the decision policy file in this worker"""
+    try:
+        policy = ai_engine.reload_policy()
+        return {"fingerprint": policy.fingerprint, "categories": list(policy.categories)}
+        
+    except PolicyError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid decision policy: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading decision policy: {str(e)}")
+
+@app.get("/api/stats")
+async def get_stats():
+    """Get system statistics"""
+    try:
+        system_stats = await stats.read_stats(redis_client)
+        system_stats["analysis_cache"] = decision_cache.stats()
+        system_stats["event_stream"] = event_hub.stats()
+        system_stats["system_status"] = "healthy"
+        return system_stats
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
 
+# Metrics read from their sources at scrape time
+metrics.CallbackMetric(
+    "neurochain_redis_pool_connections", "Redis connections in this worker's pool", "gauge", ("state",),
+    lambda: [((state,), count) for state, count in redis_pool.usage().items()] if redis_pool is not None else []
+)
+metrics.CallbackMetric(
+    "neurochain_analysis_cache_lookups_total", "Analysis cache lookups by result", "counter", ("result",),
+    lambda: [((result,), decision_cache.stats()[result]) for result in ("hits", "redis_hits", "misses")]
+)
+metrics.CallbackMetric(
+    "neurochain_analysis_cache_removals_total", "Analysis cache entries removed by reason", "counter", ("reason",),
+    lambda: [((reason,), decision_cache.stats()[reason]) for reason in ("evictions", "expirations", "invalidations")]
+)
+metrics.CallbackMetric(
+    "neurochain_analysis_cache_hit_ratio", "Share of analysis cache lookups served from cache", "gauge", (),
+    lambda: [((), decision_cache.stats()["hit_rate"])]
+)
+metrics.CallbackMetric(
+    "neurochain_admission_requests", "API requests in progress or queued for a slot in this worker", "gauge", ("state",),
+    lambda: [(("active",), concurrency_limiter.active), (("queued",), concurrency_limiter.queued)]
+)
+metrics.CallbackMetric(
+    "neurochain_event_subscribers", "Open decision event streams in this worker", "gauge", (),
+    lambda: [((), event_hub.stats()["subscribers"])]
+)
+metrics.CallbackMetric(
+    "neurochain_event_overflows_total", "Event subscribers disconnected for falling behind", "counter", (),
+    lambda: [((), event_hub.overflows)]
+)
+metrics.CallbackMetric(
+    "neurochain_anchoring_decisions_total", "Anchoring outcomes in this worker", "counter", ("outcome",),
+    lambda: [(("anchored",), anchoring_pipeline.anchored), (("failed_attempt",), anchoring_pipeline.failed_attempts),
+             (("dead_lettered",), anchoring_pipeline.dead_lettered)]
+)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics for this worker"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Sampling profiler, switched on at runtime (only when PROFILER_ENABLED=true)
+profiler = SamplingProfiler()
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+
+def require_profiler() -> None:
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.post("/debug/profiler/start", include_in_schema=False)
+async def start_profiler(interval_ms: float = 5):
+    """Start sampling the event loop thread, discarding earlier samples"""
+    require_profiler()
+    if interval_ms < 1:
+        raise HTTPException(status_code=400, detail="Interval must be at least 1 ms")
+    profiler.start(interval_ms / 1000)
+    return profiler.status()
+
+@app.post("/debug/profiler/stop", include_in_schema=False)
+async def stop_profiler():
+    """Stop sampling; the samples stay available until the next start"""
+    require_profiler()
+    profiler.stop()
+    return profiler.status()
+
+@app.get("/debug/profiler", include_in_schema=False)
+async def get_profile():
+    """Samples so far as collapsed stacks for flamegraph.pl or speedscope"""
+    require_profiler()
+    return PlainTextResponse(profiler.collapsed())
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
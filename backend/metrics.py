@@ -0,0 +1,222 @@
+"""In-process metrics in the Prometheus text exposition format
+
+A small dependency-free subset of the Prometheus client: counters, gauges
+and histograms with labels, plus metrics whose values are read from a
+callback at scrape time. Recording a sample is a dict lookup and an
+addition (a bisect as well for histograms), so instrumentation can stay on
+in production.
+
+Each uvicorn worker process keeps its own values, so scrape each worker
+as its own target, or run a single worker per container.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 1.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        registry.register(self)
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labelvalues, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+
+class CallbackMetric:
+    """A metric whose samples are read from `collect` at scrape time
+
+    `collect` returns (labelvalues, value) pairs.
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Sequence[str], float]]], registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        registry.register(self)
+
+    def samples(self) -> Iterable[str]:
+        try:
+            collected = list(self.collect())
+        except Exception:
+            # A scrape must not fail because one source is unavailable
+            return
+        for labelvalues, value in collected:
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        registry.register(self)
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def samples(self) -> Iterable[str]:
+        names = self.labelnames + ("le",)
+        for labelvalues, (counts, total) in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, labelvalues + (_format_value(bound),))} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template"""
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates keep the label set bounded; unmatched paths share one label
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.histogram.observe(time.perf_counter() - start, scope["method"], path, status)
+
+
+# Metrics recorded across modules
+HTTP_REQUEST_DURATION = Histogram(
+    "neurochain_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status")
+)
+DECISION_STAGE_DURATION = Histogram(
+    "neurochain_decision_stage_duration_seconds", "Time spent in each stage of creating decisions",
+    ("operation", "stage"), buckets=STAGE_BUCKETS
+)
+DECISIONS_CREATED = Counter(
+    "neurochain_decisions_created_total", "Decisions created by category and outcome",
+    ("category", "decision")
+)
+DECISIONS_IMPORTED = Counter(
+    "neurochain_decisions_imported_total", "Bulk import lines by result (imported, skipped, failed)",
+    ("result",)
+)
+DECISION_UPDATES = Counter(
+    "neurochain_decision_updates_total", "Decision updates by resulting status", ("status",)
+)
+VALIDATION_VOTES = Counter(
+    "neurochain_validation_votes_total", "Validator votes by result (accepted, duplicate, closed, not_found)",
+    ("result",)
+)
+ADMISSION_REJECTIONS = Counter(
+    "neurochain_admission_rejections_total", "API requests turned away by admission control, by reason",
+    ("reason",)
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "neurochain_admission_queue_wait_seconds", "Time admitted requests waited for a concurrency slot",
+    buckets=STAGE_BUCKETS
+)
+REDIS_ROUND_TRIPS = Counter(
+    "neurochain_redis_round_trips_total", "Commands or pipelines sent to Redis"
+)
+REDIS_POOL_WAIT = Histogram(
+    "neurochain_redis_pool_acquire_seconds", "Time spent waiting for a pooled Redis connection",
+    buckets=STAGE_BUCKETS
+)
+
+
+def render(registry: Optional[Registry] = None) -> str:
+    return (registry or REGISTRY).render()
@@ -0,0 +1,206 @@
+"""Pluggable codecs for decision records stored in Redis
+
+JSONCodec writes the original human-readable format. MsgpackCodec writes a
+compact binary form. A reasoning string produced by the decision policy
+is one of its rule templates around the question, so only the template's
+prefix and suffix are stored, as small integer IDs into a string table
+shared through Redis. The decision label and category are interned the
+same way, and the block hash is packed as raw bytes. Only strings that
+belong to the policy are interned: anything else, such as the reasoning
+of an imported record, is stored inline, so user text never enters the
+table.
+
+Reads detect the format from the first byte, so records written by either
+codec can be read regardless of which one is configured. Changing
+DECISION_CODEC therefore needs no migration.
+"""
+import json
+from typing import Dict, List, Optional, Union
+
+import msgpack
+import redis.asyncio as redis
+
+# 0xc1 is never used by msgpack and cannot start a JSON document
+MSGPACK_MARKER = b"\xc1"
+
+STRING_IDS_KEY = "codec:string_ids"
+STRINGS_KEY = "codec:strings"
+STRING_SEQUENCE_KEY = "codec:string_seq"
+
+# Fields stored positionally by MsgpackCodec; anything else goes in a trailing dict
+PACKED_FIELDS = ("id", "timestamp", "question", "reasoning", "decision", "confidence", "category", "block_hash", "status")
+
+# Assign an ID to a string exactly once, even with concurrent writers
+INTERN_SCRIPT = """
+local id = redis.call('HGET', KEYS[1], ARGV[1])
+if id then
+    return id
+end
+id = redis.call('INCR', KEYS[3])
+redis.call('HSET', KEYS[1], ARGV[1], id)
+redis.call('HSET', KEYS[2], id, ARGV[1])
+return id
+"""
+
+
+class StringTable:
+    """Process-local view of the shared string intern table
+
+    Only repeated template fragments are meant to be interned. Once
+    max_strings are known, new strings are left inline instead of growing
+    the table without bound.
+    """
+
+    def __init__(self, max_strings: int = 10000):
+        self.max_strings = max_strings
+        self._ids: Dict[str, int] = {}
+        self._strings: Dict[int, str] = {}
+        self._script = None
+
+    async def intern(self, client: redis.Redis, value: str) -> Union[int, str]:
+        """Return the string's ID, or the string itself once the table is full"""
+        string_id = self._ids.get(value)
+        if string_id is None:
+            if len(self._ids) >= self.max_strings:
+                return value
+            if self._script is None:
+                self._script = client.register_script(INTERN_SCRIPT)
+            string_id = int(await self._script(keys=[STRING_IDS_KEY, STRINGS_KEY, STRING_SEQUENCE_KEY], args=[value]))
+            self._ids[value] = string_id
+            self._strings[string_id] = value
+        return string_id
+
+    async def resolve(self, client: redis.Redis, string_ids: set) -> None:
+        """Load any IDs this process has not seen yet in one HMGET"""
+        missing = [string_id for string_id in string_ids if string_id not in self._strings]
+        if not missing:
+            return
+        for string_id, value in zip(missing, await client.hmget(STRINGS_KEY, missing)):
+            if value is None:
+                raise KeyError(f"Unknown interned string id {string_id}")
+            if isinstance(value, bytes):
+                value = value.decode()
+            self._strings[string_id] = value
+            self._ids[value] = string_id
+
+    def lookup(self, reference: Union[int, str]) -> str:
+        """Resolve a value produced by intern()"""
+        return self._strings[reference] if isinstance(reference, int) else reference
+
+
+class JSONCodec:
+    name = "json"
+
+    async def encode(self, client: redis.Redis, record: dict) -> bytes:
+        return json.dumps(record).encode()
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def __init__(self, strings: StringTable, engine):
+        # The engine's current policy says which strings are templated
+        self.strings = strings
+        self.engine = engine
+
+    async def encode(self, client: redis.Redis, record: dict) -> bytes:
+        policy = self.engine.policy
+        question = record["question"]
+        reasoning = record["reasoning"]
+
+        # Store the reasoning as its interned template prefix and suffix around the question
+        template = policy.split_reasoning(question, reasoning)
+        if template is not None:
+            reasoning = [await self.strings.intern(client, fragment) for fragment in template]
+        decision = record["decision"]
+        if decision in policy.decision_labels:
+            decision = await self.strings.intern(client, decision)
+        category = record["category"]
+        if category in policy.categories:
+            category = await self.strings.intern(client, category)
+
+        # Pack the hash as raw bytes only when that round-trips to the same text
+        block_hash = record["block_hash"]
+        try:
+            if bytes.fromhex(block_hash).hex() == block_hash:
+                block_hash = bytes.fromhex(block_hash)
+        except ValueError:
+            pass
+
+        extra = {key: value for key, value in record.items() if key not in PACKED_FIELDS}
+        packed = [
+            record["id"],
+            record["timestamp"],
+            question,
+            reasoning,
+            decision,
+            record["confidence"],
+            category,
+            block_hash,
+            record["status"],
+            extra or None
+        ]
+        return MSGPACK_MARKER + msgpack.packb(packed, use_bin_type=True)
+
+
+async def decode_records(client: redis.Redis, strings: StringTable, payloads: List[Optional[bytes]],
+                         include_reasoning: bool = True) -> List[Optional[dict]]:
+    """Decode payloads written by any codec; missing payloads stay None
+
+    With include_reasoning=False the reasoning text is not rebuilt and is
+    returned as None.
+    """
+    unpacked = {}
+    string_ids = set()
+    for index, payload in enumerate(payloads):
+        if payload and payload[:1] == MSGPACK_MARKER:
+            fields = msgpack.unpackb(payload[1:], raw=False)
+            unpacked[index] = fields
+            references = [fields[4], fields[6]]
+            if include_reasoning and isinstance(fields[3], list):
+                references.extend(fields[3])
+            string_ids.update(reference for reference in references if isinstance(reference, int))
+    await strings.resolve(client, string_ids)
+
+    records = []
+    for index, payload in enumerate(payloads):
+        if not payload:
+            records.append(None)
+        elif index not in unpacked:
+            record = json.loads(payload)
+            if not include_reasoning:
+                record["reasoning"] = None
+            records.append(record)
+        else:
+            fields = unpacked[index]
+            reasoning = fields[3]
+            if not include_reasoning:
+                reasoning = None
+            elif isinstance(reasoning, list):
+                reasoning = strings.lookup(reasoning[0]) + fields[2] + strings.lookup(reasoning[1])
+            block_hash = fields[7].hex() if isinstance(fields[7], bytes) else fields[7]
+
+            record = {
+                "id": fields[0],
+                "timestamp": fields[1],
+                "question": fields[2],
+                "reasoning": reasoning,
+                "decision": strings.lookup(fields[4]),
+                "confidence": fields[5],
+                "category": strings.lookup(fields[6]),
+                "block_hash": block_hash,
+                "status": fields[8]
+            }
+            if fields[9]:
+                record.update(fields[9])
+            records.append(record)
+    return records
+
+
+def create_codec(name: str, strings: StringTable, engine):
+    """Return the codec used for new writes"""
+    if name == "msgpack":
+        return MsgpackCodec(strings, engine)
+    if name == "json":
+        return JSONCodec()
+    raise ValueError(f"Unknown decision codec: {name}")
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedConnection(redis.Connection):
+    """Connection that counts every command or pipeline it sends"""
+
+    async def send_packed_command(self, command, check_health: bool = True) -> None:
+        metrics.REDIS_ROUND_TRIPS.inc()
+        await super().send_packed_command(command, check_health)
+
+
+class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+    """Blocking pool that records how long callers wait for a connection"""
+
+    async def get_connection(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(*args, **kwargs)
+        finally:
+            metrics.REDIS_POOL_WAIT.observe(time.perf_counter() - start)
+
+    def usage(self) -> dict:
+        return {
+            "max": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections)
+        }
+
+
+def create_redis_pool() -> InstrumentedBlockingConnectionPool:
+    """Create a bounded async connection pool from the environment
+
+    A blocking pool makes callers wait for a free connection instead of
+    opening unbounded sockets when concurrency exceeds the pool size.
+    """
+    return InstrumentedBlockingConnectionPool(
+        connection_class=InstrumentedConnection,
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+        max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
+        timeout=float(os.getenv("REDIS_POOL_TIMEOUT", 5)),
+        socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", 5)),
+        socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", 5)),
+        health_check_interval=int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+        decode_responses=True
+    )
+
+
+def create_redis_client(pool: redis.ConnectionPool) -> redis.Redis:
+    """Create an async Redis client bound to a shared pool"""
+    return redis.Redis(connection_pool=pool)
+
+
+async def close_redis(client: redis.Redis, pool: redis.ConnectionPool) -> None:
+    """Close the client and release every pooled connection"""
+    await client.aclose()
+    await pool.disconnect()
+
+
+async def wait_for_redis(client: redis.Redis, timeout: float, interval: float = 0.5) -> None:
+    """Ping Redis until it answers, re-raising the last error after `timeout` seconds
+
+    Workers call this before accepting requests, so a worker that starts
+    before Redis waits for it instead of failing every request.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await client.ping()
+            return
+        except (redis.ConnectionError, redis.TimeoutError, OSError) as e:
+            if time.monotonic() >= deadline:
+                raise
+            logger.warning("Waiting for Redis: %s", e)
+            await asyncio.sleep(interval)
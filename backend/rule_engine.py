@@ -0,0 +1,288 @@
+"""Decision policies declared as data and compiled into dispatch tables
+
+A policy document (JSON, or YAML when PyYAML is installed) lists the
+ethical guidelines, the scoring keywords, the confidence formula and, per
+category, its keywords, considerations and an ordered list of rules. A
+rule has an optional `when` condition over the approval, rejection and
+conditional keyword scores, a decision label and a reasoning template in
+which `{question}` stands for the question. The first matching rule
+wins; the last rule of each category must have no condition.
+
+CompiledPolicy turns a document into one generated Python function per
+category, with the conditions inlined as `if`/`elif` tests and every
+reasoning string, including its ethical considerations, pre-joined
+around the question. Analyzing a question is then one keyword scan plus
+a dict lookup and a single function call, with no per-request branching
+on the category. The policy keeps those prefixes and suffixes, so a
+reasoning string can later be split back into template and question.
+
+Conditions are parsed with `ast` and only comparisons, boolean logic,
+integer arithmetic, abs(), min(), max() and the three score names are
+accepted, so a policy file cannot run arbitrary code. Confidence settings
+must be finite numbers, and every compiled category is run once on a
+sample question, so a policy that compiles but would fail at request time
+is rejected instead of swapped in.
+
+A CompiledPolicy is immutable. Reloading builds a new one and swaps a
+single reference, so requests already running finish on the policy they
+started with.
+"""
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+SCORE_NAMES = ("approval", "rejection", "conditional")
+ALLOWED_FUNCTIONS = ("abs", "min", "max")
+# Smallest and largest number of arguments each function accepts (None for no limit)
+FUNCTION_ARITY = {"abs": (1, 1), "min": (2, None), "max": (2, None)}
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE,
+    ast.Gt, ast.GtE, ast.Name, ast.Load, ast.Constant, ast.Call
+)
+# Analyzed once per category when a policy is compiled
+POLICY_CHECK_QUESTION = "Should this sample decision be approved?"
+CONFIDENCE_FIELDS = (
+    "base", "clarity_weight", "conditional_penalty", "long_question_words", "long_question_penalty",
+    "short_question_words", "short_question_penalty", "minimum", "maximum"
+)
+
+
+class PolicyError(ValueError):
+    """Raised when a policy document is invalid"""
+
+
+def load_policy_document(path: str) -> dict:
+    """Read a policy document from a JSON or YAML file"""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise PolicyError(f"{path}: {e}")
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise PolicyError(f"{path}: {e}")
+
+
+def _compile_condition(expression: str, where: str) -> str:
+    """Validate a rule condition and return it as normalized Python source"""
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise PolicyError(f"{where}: invalid condition {expression!r}: {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise PolicyError(f"{where}: {type(node).__name__} is not allowed in {expression!r}")
+        if isinstance(node, ast.Name) and node.id not in SCORE_NAMES + ALLOWED_FUNCTIONS:
+            raise PolicyError(f"{where}: unknown name {node.id!r} in {expression!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in ALLOWED_FUNCTIONS or node.keywords:
+                raise PolicyError(f"{where}: only abs(), min() and max() may be called in {expression!r}")
+            fewest, most = FUNCTION_ARITY[node.func.id]
+            if len(node.args) < fewest or (most is not None and len(node.args) > most):
+                raise PolicyError(f"{where}: wrong number of arguments to {node.func.id}() in {expression!r}")
+        if isinstance(node, ast.Name) and node.id in ALLOWED_FUNCTIONS and not _is_called(tree, node):
+            raise PolicyError(f"{where}: {node.id} must be called in {expression!r}")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise PolicyError(f"{where}: only numeric constants are allowed in {expression!r}")
+    return ast.unparse(tree)
+
+
+def _is_called(tree: ast.AST, name: ast.Name) -> bool:
+    return any(isinstance(node, ast.Call) and node.func is name for node in ast.walk(tree))
+
+
+def _number(value, where: str) -> float:
+    """Return value if it is a finite int or float, else raise PolicyError"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise PolicyError(f"{where} must be a finite number, not {value!r}")
+    return value
+
+
+def _split_template(template: str, where: str) -> Tuple[str, str]:
+    if not isinstance(template, str):
+        raise PolicyError(f"{where}: reasoning must be a string")
+    parts = template.split("{question}")
+    if len(parts) != 2:
+        raise PolicyError(f"{where}: reasoning must contain {{question}} exactly once")
+    return parts[0], parts[1]
+
+
+class CompiledPolicy:
+    """An immutable, compiled decision policy"""
+
+    def __init__(self, document: dict):
+        self.document = document
+        self.fingerprint = hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()[:16]
+
+        try:
+            self.ethical_guidelines = list(document["ethical_guidelines"])
+            self.scoring_keywords = {name: list(document["scoring_keywords"][name]) for name in SCORE_NAMES}
+            self.confidence_settings = {field: document["confidence"][field] for field in CONFIDENCE_FIELDS}
+            self.categories = dict(document["categories"])
+            self.default_category = document["default_category"]
+        except (KeyError, TypeError) as e:
+            raise PolicyError(f"Policy is missing required field {e}")
+        if self.default_category not in self.categories:
+            raise PolicyError(f"default_category {self.default_category!r} is not a declared category")
+        for field, value in self.confidence_settings.items():
+            _number(value, f"confidence.{field}")
+        if not all(isinstance(guideline, str) for guideline in self.ethical_guidelines):
+            raise PolicyError("ethical_guidelines must be strings")
+
+        self.matcher = KeywordMatcher(
+            {name: category.get("keywords", []) for name, category in self.categories.items()},
+            self.scoring_keywords
+        )
+        # Reasoning (prefix, suffix) pairs by their combined length, and every decision label
+        self._templates: Dict[int, List[Tuple[str, str]]] = {}
+        self.decision_labels = set()
+        self._analyzers: Dict[str, Callable] = {}
+        for name, category in self.categories.items():
+            self._analyzers[name] = self._compile_category(name, category)
+        self._default = self._analyzers[self.default_category]
+        self._check_analyzers()
+
+    def _check_analyzers(self) -> None:
+        # A last guard against anything the checks above miss failing on every request
+        for name in self._analyzers:
+            try:
+                analysis = self.build(POLICY_CHECK_QUESTION, name, 1, 1, 1)
+                _number(analysis["confidence"], "confidence")
+            except Exception as e:
+                raise PolicyError(f"category {name!r} fails on a sample question: {e}")
+
+    def _compile_category(self, name: str, category: dict) -> Callable:
+        where = f"category {name!r}"
+        try:
+            rules = category["rules"]
+            ethical = [self.ethical_guidelines[index] for index in category["ethical_guidelines"]]
+            adjustment = _number(category.get("confidence_adjustment", 0), f"{where} confidence_adjustment")
+        except (KeyError, TypeError, IndexError) as e:
+            raise PolicyError(f"{where}: invalid definition ({e})")
+        if not rules or "when" in rules[-1]:
+            raise PolicyError(f"{where}: the last rule must have no 'when' condition")
+
+        settings = self.confidence_settings
+        ethical_suffix = f" Ethical considerations: {', '.join(ethical)}."
+
+        # Same arithmetic, in the same order, as the original confidence calculation
+        lines = [
+            "def analyze(question, approval, rejection, conditional):",
+            f"    confidence = {settings['base']!r} + abs(approval - rejection) * {settings['clarity_weight']!r}"
+            f" + {adjustment!r} - conditional * {settings['conditional_penalty']!r}",
+            "    words = len(question.split())",
+            f"    if words > {settings['long_question_words']!r}:",
+            f"        confidence -= {settings['long_question_penalty']!r}",
+            f"    elif words < {settings['short_question_words']!r}:",
+            f"        confidence -= {settings['short_question_penalty']!r}",
+            f"    confidence = max({settings['minimum']!r}, min({settings['maximum']!r}, confidence))",
+        ]
+
+        for index, rule in enumerate(rules):
+            rule_where = f"{where} rule {index}"
+            try:
+                decision = rule["decision"]
+                prefix, suffix = _split_template(rule["reasoning"], rule_where)
+            except KeyError as e:
+                raise PolicyError(f"{rule_where}: missing {e}")
+            except TypeError as e:
+                raise PolicyError(f"{rule_where}: invalid definition ({e})")
+            if not isinstance(decision, str) or not decision:
+                raise PolicyError(f"{rule_where}: decision must be a non-empty string")
+            self._add_template(prefix, suffix + ethical_suffix)
+            self.decision_labels.add(decision)
+            result = (
+                f"{{'decision': {decision!r}, 'reasoning': {prefix!r} + question + {suffix + ethical_suffix!r}, "
+                f"'confidence': confidence, 'category': {name!r}}}"
+            )
+            if "when" in rule:
+                lines.append(f"    if {_compile_condition(rule['when'], rule_where)}:")
+                lines.append(f"        return {result}")
+            else:
+                lines.append(f"    return {result}")
+                break
+
+        namespace = {}
+        exec(compile("\n".join(lines), f"<policy:{name}>", "exec"), namespace)
+        return namespace["analyze"]
+
+    def _add_template(self, prefix: str, suffix: str) -> None:
+        templates = self._templates.setdefault(len(prefix) + len(suffix), [])
+        if (prefix, suffix) not in templates:
+            templates.append((prefix, suffix))
+
+    def split_reasoning(self, question: str, reasoning: str) -> Optional[Tuple[str, str]]:
+        """Return the (prefix, suffix) of the rule template that produced `reasoning`
+
+        Returns None unless the reasoning is exactly a template of this
+        policy around the question.
+        """
+        for prefix, suffix in self._templates.get(len(reasoning) - len(question), ()):
+            if reasoning.startswith(prefix) and reasoning.endswith(suffix) and \
+                    reasoning[len(prefix):len(reasoning) - len(suffix)] == question:
+                return prefix, suffix
+        return None
+
+    def score(self, question: str) -> tuple:
+        """Return the category and approval/rejection/conditional keyword scores"""
+        category, (approval_score, rejection_score, conditional_score) = self.matcher.match(question)
+        return category or self.default_category, approval_score, rejection_score, conditional_score
+
+    def analyze(self, question: str) -> dict:
+        return self.build(question, *self.score(question))
+
+    def build(self, question: str, category: str, approval_score: int, rejection_score: int,
+              conditional_score: int) -> dict:
+        """Apply the category's rules to precomputed scores"""
+        analyzer = self._analyzers.get(category)
+        if analyzer is None:
+            # Unknown categories get the default category's rules but keep their own name
+            analysis = self._default(question, approval_score, rejection_score, conditional_score)
+            analysis["category"] = category
+            return analysis
+        return analyzer(question, approval_score, rejection_score, conditional_score)
+
+    def confidence(self, approval_score: int, rejection_score: int, conditional_score: int,
+                   category: str, question: str) -> float:
+        return self.build(question, category, approval_score, rejection_score, conditional_score)["confidence"]
+
+
+def compile_policy_file(path: str) -> CompiledPolicy:
+    return CompiledPolicy(load_policy_document(path))
+
+
+async def watch_policy(engine, interval: float) -> None:
+    """Reload the engine's policy file whenever it changes, until cancelled
+
+    An invalid file is logged and the current policy stays in effect. Write
+    the file to a temporary name and rename it into place, so a reload never
+    reads it half written.
+    """
+    last_mtime = os.stat(engine.policy_path).st_mtime_ns
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            mtime = os.stat(engine.policy_path).st_mtime_ns
+            if mtime != last_mtime:
+                last_mtime = mtime
+                engine.reload_policy()
+                logger.info("Reloaded decision policy %s (%s)", engine.policy_path, engine.config_fingerprint)
+        except PolicyError as e:
+            logger.error("Keeping the current decision policy: %s", e)
+        except Exception:
+            logger.exception("Failed to reload decision policy %s", engine.policy_path)
@@ -0,0 +1,158 @@
+"""Production serve mode: one uvicorn worker process per core
+
+The supervisor binds the listening socket once and starts a worker per
+usable core, each pinned to its own core (on Linux) and sharing that
+socket, so the kernel spreads connections across workers. Workers share
+nothing: each imports the app, compiles its decision policy and opens its
+own Redis pool and repository connections, and waits for Redis before it
+accepts requests.
+
+The supervisor itself only imports the standard library and never the
+app, so it starts instantly; workers are spawned fresh rather than forked.
+A worker that dies is restarted on the same core.
+
+On SIGTERM or SIGINT each worker fails its /ready probe, ends its event
+streams, keeps serving for --drain-delay seconds so load balancers can
+take it out of rotation, then stops accepting connections and finishes
+in-flight requests within --graceful-timeout.
+
+Usage (from backend/):
+    python serve.py [--workers N] [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("neurochain.serve")
+
+
+def usable_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def run_worker(sock: socket.socket, core: Optional[int], options: dict) -> None:
+    """Worker process entry point"""
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+
+    import uvicorn
+
+    class DrainingServer(uvicorn.Server):
+        async def shutdown(self, sockets=None):
+            import asyncio
+            import main
+
+            await main.drain()
+            if options["drain_delay"] and not self.force_exit:
+                await asyncio.sleep(options["drain_delay"])
+            await super().shutdown(sockets)
+
+    config = uvicorn.Config(
+        "main:app",
+        log_level=options["log_level"],
+        timeout_graceful_shutdown=options["graceful_timeout"],
+        timeout_keep_alive=options["keep_alive"]
+    )
+    DrainingServer(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, host: str, port: int, workers: int, pin: bool, options: dict):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.pin = pin
+        self.options = options
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._stop = threading.Event()
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, slot: int, sock: socket.socket) -> None:
+        cores = usable_cores()
+        core = cores[slot % len(cores)] if self.pin else None
+        process = self._context.Process(
+            target=run_worker, args=(sock, core, self.options), name=f"neurochain-worker-{slot}"
+        )
+        process.start()
+        self._processes[slot] = process
+        logger.info("Started worker %d (pid %d%s)", slot, process.pid, f", core {core}" if core is not None else "")
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        sock = self._bind()
+        logger.info("Listening on http://%s:%d with %d workers", self.host, self.port, self.workers)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._handle_signal)
+
+        for slot in range(self.workers):
+            self._spawn(slot, sock)
+
+        try:
+            while not self._stop.wait(0.5):
+                for slot, process in list(self._processes.items()):
+                    if not process.is_alive() and not self._stop.is_set():
+                        logger.warning("Worker %d (pid %d) exited with %s, restarting", slot, process.pid, process.exitcode)
+                        self._spawn(slot, sock)
+        finally:
+            self.shutdown()
+            sock.close()
+
+    def shutdown(self) -> None:
+        """Ask every worker to drain, then kill any that outlive the grace period"""
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = self.options["graceful_timeout"] + self.options["drain_delay"] + 5
+        for slot, process in self._processes.items():
+            process.join(deadline)
+            if process.is_alive():
+                logger.error("Worker %d (pid %d) did not stop in time, killing it", slot, process.pid)
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 0)),
+                        help="worker processes (default: one per usable core)")
+    parser.add_argument("--no-pin", dest="pin", action="store_false", help="do not pin workers to cores")
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("GRACEFUL_TIMEOUT", 30)),
+                        help="seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--drain-delay", type=float, default=float(os.getenv("DRAIN_DELAY", 0)),
+                        help="seconds to keep serving after /ready starts failing")
+    parser.add_argument("--keep-alive", type=int, default=5, help="idle keep-alive timeout in seconds")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     [supervisor] %(message)s")
+    options = {
+        "graceful_timeout": args.graceful_timeout,
+        "drain_delay": args.drain_delay,
+        "keep_alive": args.keep_alive,
+        "log_level": args.log_level
+    }
+    Supervisor(args.host, args.port, args.workers or len(usable_cores()), args.pin, options).run()
+
+
+if __name__ == "__main__":
+    main()
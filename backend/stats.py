@@ -0,0 +1,99 @@
+"""Incrementally maintained decision statistics
+
+Counters live in a single Redis hash and are updated inside the same
+MULTI/EXEC transaction that writes the decision record, so reading them is
+O(1) regardless of how much history is kept.
+"""
+from collections import defaultdict
+from typing import Dict, List
+
+import redis.asyncio as redis
+
+STATS_KEY = "decision_stats"
+
+TRACKED_STATUSES = ("pending", "validated", "anchored", "rejected")
+
+
+def _category_field(category: str, field: str) -> str:
+    return f"category:{category}:{field}"
+
+
+def record_created(pipe: redis.client.Pipeline, records: List[dict]) -> None:
+    """Queue the counter updates for newly created decisions
+
+    Increments are summed per field first, so a batch costs one command
+    per distinct field rather than several per decision.
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    sums: Dict[str, float] = defaultdict(int)
+    for decision_data in records:
+        category = decision_data["category"]
+        status = decision_data["status"]
+        confidence = decision_data["confidence"]
+
+        counts["total"] += 1
+        sums["confidence_sum"] += confidence
+        counts[_category_field(category, "total")] += 1
+        sums[_category_field(category, "confidence_sum")] += confidence
+        if status in TRACKED_STATUSES:
+            counts[status] += 1
+            counts[_category_field(category, status)] += 1
+
+    for field, count in counts.items():
+        pipe.hincrby(STATS_KEY, field, count)
+    for field, total in sums.items():
+        pipe.hincrbyfloat(STATS_KEY, field, total)
+
+
+def record_status_change(pipe: redis.client.Pipeline, decision_data: dict,
+                         old_status: str, new_status: str) -> None:
+    """Queue the counter updates for a decision moving between statuses"""
+    if old_status == new_status:
+        return
+
+    category = decision_data["category"]
+    if old_status in TRACKED_STATUSES:
+        pipe.hincrby(STATS_KEY, old_status, -1)
+        pipe.hincrby(STATS_KEY, _category_field(category, old_status), -1)
+    if new_status in TRACKED_STATUSES:
+        pipe.hincrby(STATS_KEY, new_status, 1)
+        pipe.hincrby(STATS_KEY, _category_field(category, new_status), 1)
+
+
+def _average(total: float, count: int) -> float:
+    return round(total / count, 2) if count > 0 else 0
+
+
+async def read_stats(client: redis.Redis) -> dict:
+    """Read the aggregated counters with a single HGETALL"""
+    raw = await client.hgetall(STATS_KEY)
+
+    categories = {}
+    for key, value in raw.items():
+        if not key.startswith("category:"):
+            continue
+        _, name, field = key.split(":", 2)
+        categories.setdefault(name, {})[field] = value
+
+    breakdown = {}
+    for name, fields in sorted(categories.items()):
+        total = int(fields.get("total", 0))
+        breakdown[name] = {
+            "total_decisions": total,
+            "validated_decisions": int(fields.get("validated", 0)),
+            "pending_decisions": int(fields.get("pending", 0)),
+            "anchored_decisions": int(fields.get("anchored", 0)),
+            "rejected_decisions": int(fields.get("rejected", 0)),
+            "average_confidence": _average(float(fields.get("confidence_sum", 0)), total),
+        }
+
+    total = int(raw.get("total", 0))
+    return {
+        "total_decisions": total,
+        "validated_decisions": int(raw.get("validated", 0)),
+        "pending_decisions": int(raw.get("pending", 0)),
+        "anchored_decisions": int(raw.get("anchored", 0)),
+        "rejected_decisions": int(raw.get("rejected", 0)),
+        "average_confidence": _average(float(raw.get("confidence_sum", 0)), total),
+        "categories": breakdown,
+    }
@@ -0,0 +1,7 @@
+"""In-process HTTP client for the app under test"""
+import httpx
+
+
+def asgi_client(app) -> httpx.AsyncClient:
+    """Return an httpx client that calls the ASGI app in-process"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
@@ -0,0 +1,56 @@
+"""Shared fixtures: the app runs in-process against fakeredis
+
+Tests are plain functions that drive coroutines through `run`, one event
+loop for the whole session, so the module-level Redis scripts the app
+registers stay usable from test to test.
+"""
+import asyncio
+
+import fakeredis
+import pytest
+
+import main
+from app_client import asgi_client
+from decision_repository import create_repository
+
+
+@pytest.fixture(scope="session")
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def session_redis(run):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield client
+    run(client.aclose())
+
+
+@pytest.fixture
+def redis_client(run, session_redis):
+    """An empty Redis the app is connected to, with no repository behind it"""
+    run(session_redis.flushdb())
+    main.redis_client = session_redis
+    main.decision_repository = None
+    yield session_redis
+    main.redis_client = None
+
+
+@pytest.fixture
+def repository(run, redis_client, tmp_path):
+    """A fresh SQLite repository the app writes through to"""
+    main.decision_repository = create_repository(str(tmp_path / "decisions.db"))
+    main.decision_ledger.repository = main.decision_repository
+    yield main.decision_repository
+    run(main.decision_repository.close())
+    main.decision_ledger.repository = None
+    main.decision_repository = None
+
+
+@pytest.fixture
+def api(run, redis_client):
+    client = asgi_client(main.app)
+    yield client
+    run(client.aclose())
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import main
+from admission import ConcurrencyLimiter, Rejected
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    def configure(key_rate=0, key_burst=0, global_rate=0, global_burst=0):
+        monkeypatch.setattr(main.rate_limiter, "key_rate", key_rate)
+        monkeypatch.setattr(main.rate_limiter, "key_burst", key_burst or key_rate)
+        monkeypatch.setattr(main.rate_limiter, "global_rate", global_rate)
+        monkeypatch.setattr(main.rate_limiter, "global_burst", global_burst or global_rate)
+    return configure
+
+
+def get_stats(run, api, api_key: str):
+    return run(api.get("/api/stats", headers={"X-API-Key": api_key}))
+
+
+def test_key_over_its_limit_gets_429(run, api, rate_limits):
+    rate_limits(key_rate=1, key_burst=3)
+    codes = [get_stats(run, api, "a").status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+    assert get_stats(run, api, "a").headers["retry-after"] == "1"
+
+    # Other keys and unlimited paths are unaffected
+    assert get_stats(run, api, "b").status_code == 200
+    assert run(api.get("/health")).status_code == 200
+
+
+def test_global_limit_gets_503(run, api, rate_limits):
+    rate_limits(key_rate=100, global_rate=1, global_burst=2)
+    codes = [get_stats(run, api, key).status_code for key in ("a", "b", "c")]
+    assert codes == [200, 200, 503]
+
+
+def test_batches_are_charged_per_item(run, api, rate_limits):
+    rate_limits(key_rate=1, key_burst=5)
+    headers = {"X-API-Key": "a"}
+
+    # A full bucket admits a batch larger than the burst, which leaves the key in debt
+    response = run(api.post("/api/decisions/batch", json={"decisions": [{"question": f"q {i}"} for i in range(8)]}, headers=headers))
+    assert response.status_code == 200
+    response = get_stats(run, api, "a")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 3
+
+    decision_ids = [decision["id"] for decision in run(api.get("/api/decisions?limit=5")).json()]
+    votes = [{"decision_id": decision_id, "validator": "v", "is_valid": True} for decision_id in decision_ids]
+    assert run(api.post("/api/decisions/validations", json={"votes": votes}, headers={"X-API-Key": "b"})).status_code == 200
+    assert run(api.post("/api/decisions/validations", json={"votes": votes[:1]}, headers={"X-API-Key": "b"})).status_code == 429
+
+
+def test_concurrency_limiter_sheds_once_the_queue_is_slow(run):
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, target_delay=0.05, timeout=0.2)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.1)
+        with pytest.raises(Rejected) as overloaded:
+            await limiter.acquire()
+        assert overloaded.value.reason == "overloaded"
+
+        # The released slot goes to the queued request, not to a new arrival
+        limiter.release()
+        await waiter
+        assert limiter.active == 1 and limiter.queued == 0
+
+        with pytest.raises(Rejected) as timed_out:
+            await limiter.acquire()
+        assert timed_out.value.reason == "queue_timeout"
+
+    run(scenario())
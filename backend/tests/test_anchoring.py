@@ -0,0 +1,114 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+import main
+from anchoring import DEAD_LETTER_KEY, SENT_KEY, STREAM_KEY, AnchoringPipeline, MockDecisionChain
+
+
+class FlakyChain(MockDecisionChain):
+    """Mock chain whose first receipt wait fails after the transactions were sent"""
+
+    def __init__(self):
+        super().__init__()
+        self.wait_failures = 1
+
+    async def wait_batch(self, tx_hashes):
+        if self.wait_failures:
+            self.wait_failures -= 1
+            raise ConnectionError("receipt lookup failed")
+        return await super().wait_batch(tx_hashes)
+
+
+def create_records(run, api, count: int) -> list:
+    response = run(api.post("/api/decisions/batch", json={"decisions": [{"question": f"Approve loan {i}?"} for i in range(count)]}))
+    return response.json()["decisions"]
+
+
+@pytest.fixture
+def blocking_reads(redis_client, monkeypatch):
+    """Make XREADGROUP wait out its block time when nothing is ready, as Redis does; fakeredis returns at once"""
+    xreadgroup = redis_client.xreadgroup
+
+    async def read(*args, block=None, **kwargs):
+        response = await xreadgroup(*args, **kwargs)
+        if not response and block:
+            await asyncio.sleep(block / 1000)
+        return response
+
+    monkeypatch.setattr(redis_client, "xreadgroup", read)
+
+
+def anchor(run, redis_client, pipeline: AnchoringPipeline, records: list, on_confirmed) -> None:
+    async def scenario():
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipeline.enqueue(pipe, records)
+            await pipe.execute()
+        pipeline.start(redis_client, on_confirmed)
+        try:
+            for _ in range(200):
+                metrics = await pipeline.metrics(redis_client)
+                if metrics["queue_depth"] == 0 and metrics["anchored"] + metrics["dead_lettered"] >= len(records):
+                    return
+                await asyncio.sleep(0.01)
+            pytest.fail(f"anchoring did not finish: {metrics}")
+        finally:
+            await pipeline.stop()
+
+    run(scenario())
+
+
+def make_pipeline(chain) -> AnchoringPipeline:
+    return AnchoringPipeline(chain, workers=1, backoff_base=0.001, claim_idle=0.01, block_ms=5)
+
+
+def recorded_ids(chain: MockDecisionChain) -> Counter:
+    return Counter(item["id"] for item in chain.decisions.values())
+
+
+@pytest.mark.usefixtures("blocking_reads")
+def test_refused_decision_is_dead_lettered_alone(run, api, redis_client):
+    records = create_records(run, api, 3)
+    records[1] = dict(records[1], question="")
+    chain = MockDecisionChain()
+    anchor(run, redis_client, make_pipeline(chain), records, main.mark_anchored)
+
+    assert set(recorded_ids(chain)) == {records[0]["id"], records[2]["id"]}
+    dead = run(redis_client.xrange(DEAD_LETTER_KEY))
+    assert [fields["id"] for _, fields in dead] == [records[1]["id"]]
+    assert run(redis_client.xlen(STREAM_KEY)) == 0
+
+
+@pytest.mark.usefixtures("blocking_reads")
+def test_retry_waits_for_sent_transactions_instead_of_resending(run, api, redis_client):
+    records = create_records(run, api, 4)
+    chain = FlakyChain()
+    anchor(run, redis_client, make_pipeline(chain), records, main.mark_anchored)
+
+    assert recorded_ids(chain) == Counter({record["id"]: 1 for record in records})
+    assert all(run(main.read_decision(record["id"]))["status"] == "anchored" for record in records)
+    assert run(redis_client.hlen(SENT_KEY)) == 0
+
+
+@pytest.mark.usefixtures("blocking_reads")
+def test_reclaimed_entries_are_not_sent_twice(run, api, redis_client):
+    records = create_records(run, api, 3)
+    chain = MockDecisionChain()
+    failures = [RuntimeError("status update failed")]
+
+    async def on_confirmed(confirmations):
+        if failures:
+            raise failures.pop()
+        await main.mark_anchored(confirmations)
+
+    anchor(run, redis_client, make_pipeline(chain), records, on_confirmed)
+
+    assert recorded_ids(chain) == Counter({record["id"]: 1 for record in records})
+    assert all(run(main.read_decision(record["id"]))["anchor_tx_hash"] for record in records)
+
+
+def test_empty_questions_are_rejected(run, api):
+    assert run(api.post("/api/decisions", json={"question": " "})).status_code == 400
+    response = run(api.post("/api/decisions/batch", json={"decisions": [{"question": "Approve?"}, {"question": ""}]}))
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+import pytest
+
+import main
+from ids import new_decision_id
+
+
+def build_records(count: int) -> list:
+    return [
+        main.build_decision_record(new_decision_id(), "2025-01-01T00:00:00", f"Question {i}", main.ai_engine.analyze_question(f"Question {i}"))
+        for i in range(count)
+    ]
+
+
+def read_all_pages(run, api, limit: int) -> list:
+    decision_ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = run(api.get("/api/decisions", params=params))
+        response.raise_for_status()
+        decision_ids += [decision["id"] for decision in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return decision_ids
+
+
+def test_pages_hold_every_decision_once_in_id_order(run, api, repository):
+    records = build_records(9)
+    # Concurrent requests reach Redis in a different order than their IDs were generated
+    for index in (1, 0, 3, 2, 5, 4, 8, 6, 7):
+        run(main.store_decisions([records[index]]))
+
+    expected = sorted((record["id"] for record in records), reverse=True)
+    assert read_all_pages(run, api, 2) == expected
+    assert read_all_pages(run, api, 4) == expected
+
+
+def test_failed_redis_write_leaves_no_stored_decision(run, api, repository, monkeypatch):
+    def fail(pipe, records):
+        raise RuntimeError("Redis transaction failed")
+
+    monkeypatch.setattr(main.decision_ledger, "queue", fail)
+    record = build_records(1)[0]
+    with pytest.raises(RuntimeError):
+        run(main.store_decisions([record]))
+
+    assert run(repository.get(record["id"])) is None
+    assert run(main.read_decision(record["id"])) is None
+    assert run(api.get("/api/stats")).json()["total_decisions"] == 0
+
+
+def test_incomplete_repository_cannot_be_created():
+    from decision_repository import DecisionRepository
+
+    class Incomplete(DecisionRepository):
+        async def save_many(self, records):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,81 @@
+import asyncio
+import multiprocessing
+import threading
+
+import redis.asyncio as redis
+from fakeredis import TcpFakeServer
+
+from app_client import asgi_client
+from ids import decision_id_timestamp, new_decision_id
+
+WORKERS = 4
+REQUESTS = 200
+CONCURRENCY = 50
+
+
+def test_ids_increase_within_a_process():
+    ids = [new_decision_id() for _ in range(10000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(decision_id_timestamp(decision_id) is not None for decision_id in ids)
+
+
+def create_decisions(redis_url: str, results) -> None:
+    # Each process runs its own copy of the app against the shared Redis, as uvicorn workers do
+    import main
+
+    async def run() -> list:
+        main.redis_client = redis.from_url(redis_url, decode_responses=True)
+        main.decision_repository = None
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        questions = [f"Should we approve application {i}?" for i in range(REQUESTS)]
+
+        async with asgi_client(main.app) as client:
+            async def create(question: str) -> str:
+                async with semaphore:
+                    response = await client.post("/api/decisions", json={"question": question})
+                    response.raise_for_status()
+                    return response.json()["decision"]["id"]
+
+            ids = await asyncio.gather(*[create(question) for question in questions])
+
+        await main.redis_client.aclose()
+        return ids
+
+    results.extend(asyncio.run(run()))
+
+
+async def count_missing(redis_url: str, ids: list) -> int:
+    client = redis.from_url(redis_url, decode_responses=True)
+    missing = 0
+    for offset in range(0, len(ids), 1000):
+        chunk = ids[offset:offset + 1000]
+        missing += sum(1 for exists in await client.mget([f"decision:{i}" for i in chunk]) if exists is None)
+    await client.aclose()
+    return missing
+
+
+def test_concurrent_workers_create_unique_ids_and_lose_no_records():
+    server = TcpFakeServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    redis_url = f"redis://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        # fork exercises the ID generator's post-fork reseeding
+        context = multiprocessing.get_context("fork")
+        with context.Manager() as manager:
+            results = manager.list()
+            processes = [context.Process(target=create_decisions, args=(redis_url, results)) for _ in range(WORKERS)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            ids = list(results)
+
+        assert all(process.exitcode == 0 for process in processes)
+        assert len(ids) == WORKERS * REQUESTS
+        assert len(set(ids)) == len(ids)
+        assert asyncio.run(count_missing(redis_url, ids)) == 0
+    finally:
+        server.shutdown()
+        server.server_close()
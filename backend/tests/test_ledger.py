@@ -0,0 +1,106 @@
+import pytest
+
+import main
+from ledger import leaf_hash, merkle_proof, merkle_root, verify_inclusion, verify_proof
+
+
+@pytest.mark.parametrize("size", range(1, 18))
+def test_every_leaf_proves_against_the_root(size):
+    leaves = [leaf_hash(f"{i:064x}") for i in range(size)]
+    root = merkle_root(leaves)
+    for index, leaf in enumerate(leaves):
+        assert verify_proof(leaf, merkle_proof(leaves, index), root)
+    if size > 1:
+        assert not verify_proof(leaves[0], merkle_proof(leaves, 1), root)
+
+
+def create_and_seal(run, api, count: int) -> list:
+    response = run(api.post("/api/decisions/batch", json={
+        "decisions": [{"question": f"Should we approve loan {i}?"} for i in range(count)]
+    }))
+    response.raise_for_status()
+    while run(main.decision_ledger.seal_block(main.redis_client)):
+        pass
+    run(main.decision_ledger.seal_block(main.redis_client, force=True))
+    return [decision["id"] for decision in response.json()["decisions"]]
+
+
+def test_sealed_decisions_verify(run, api, monkeypatch):
+    monkeypatch.setattr(main.decision_ledger, "block_size", 4)
+    decision_ids = create_and_seal(run, api, 10)
+
+    for decision_id in decision_ids:
+        result = run(api.get(f"/api/decisions/{decision_id}/verify")).json()
+        assert result["valid"], result
+    assert run(api.get("/api/ledger/head")).json()["height"] == 2
+
+
+def test_proof_fails_for_altered_content(run, api, monkeypatch):
+    monkeypatch.setattr(main.decision_ledger, "block_size", 4)
+    decision_id = create_and_seal(run, api, 6)[5]
+    inclusion = run(api.get(f"/api/decisions/{decision_id}/proof")).json()
+    block_hash = run(api.get(f"/api/decisions/{decision_id}")).json()["block_hash"]
+
+    assert verify_inclusion(block_hash, inclusion)
+    assert not verify_inclusion("00" * 32, inclusion)
+    tampered = dict(inclusion, previous_root="11" * 32)
+    assert not verify_inclusion(block_hash, tampered)
+
+
+def test_unsealed_decision_has_no_proof(run, api):
+    decision_id = run(api.post("/api/decisions", json={"question": "Is this pending?"})).json()["decision"]["id"]
+    assert run(api.get(f"/api/decisions/{decision_id}/proof")).status_code == 404
+    assert run(api.get(f"/api/decisions/{decision_id}/verify")).status_code == 409
+
+
+def test_slower_sealer_aborts_when_the_head_moves(run, api, monkeypatch):
+    import ledger
+
+    monkeypatch.setattr(main.decision_ledger, "block_size", 4)
+    response = run(api.post("/api/decisions/batch", json={
+        "decisions": [{"question": f"Should we approve loan {i}?"} for i in range(4)]
+    }))
+    response.raise_for_status()
+
+    # This worker's lock expires and another worker seals the same entries before it reads the head
+    client = main.redis_client
+    real_pipeline = client.pipeline
+    rival_blocks = []
+
+    def racing_pipeline(*args, **kwargs):
+        pipe = real_pipeline(*args, **kwargs)
+        real_get = pipe.get
+
+        async def get(key):
+            monkeypatch.setattr(client, "pipeline", real_pipeline)
+            await client.delete(ledger.LOCK_KEY)
+            rival_blocks.append(await ledger.DecisionLedger(block_size=4).seal_block(client))
+            return await real_get(key)
+
+        pipe.get = get
+        return pipe
+
+    monkeypatch.setattr(client, "pipeline", racing_pipeline)
+    assert run(main.decision_ledger.seal_block(client)) is None
+    assert rival_blocks[0]["height"] == 0
+    assert run(main.decision_ledger.get_head(client))["block_root"] == rival_blocks[0]["block_root"]
+    assert run(client.llen(ledger.PENDING_KEY)) == 0
+
+
+def test_proofs_outlive_the_redis_copies(run, api, repository, monkeypatch):
+    import ledger
+
+    monkeypatch.setattr(main.decision_ledger, "block_size", 4)
+    decision_ids = create_and_seal(run, api, 6)
+    assert 0 < run(main.redis_client.ttl(f"{ledger.BLOCK_KEY_PREFIX}0")) <= main.decision_ledger.retention
+    assert 0 < run(main.redis_client.ttl(f"{ledger.INDEX_KEY_PREFIX}{decision_ids[0]}")) <= main.decision_ledger.retention
+
+    assert run(main.decision_ledger.persist_blocks(main.redis_client)) == 2
+    assert run(main.decision_ledger.persist_blocks(main.redis_client)) == 0
+    expired = run(main.redis_client.keys(f"{ledger.BLOCK_KEY_PREFIX}*")) + run(main.redis_client.keys(f"{ledger.INDEX_KEY_PREFIX}*"))
+    run(main.redis_client.delete(*expired))
+
+    for decision_id in decision_ids:
+        result = run(api.get(f"/api/decisions/{decision_id}/verify")).json()
+        assert result["valid"], result
+    assert run(api.get("/api/ledger/blocks/1")).json()["size"] == 2
@@ -0,0 +1,64 @@
+import pytest
+
+import main
+from record_codec import STRINGS_KEY, JSONCodec, MsgpackCodec, StringTable, decode_records
+
+QUESTIONS = ["a", "e", "Should I approve this loan application?", "Review this video content for moderation", ""]
+
+
+def build_records(questions) -> list:
+    return [
+        main.build_decision_record(f"decision_{i}", "2025-01-01T00:00:00", question, main.ai_engine.analyze_question(question))
+        for i, question in enumerate(questions)
+    ]
+
+
+def encode_all(run, client, codec, records) -> list:
+    return [run(codec.encode(client, record)) for record in records]
+
+
+@pytest.mark.parametrize("make_codec", [JSONCodec, lambda: MsgpackCodec(StringTable(), main.ai_engine)])
+def test_records_round_trip(run, redis_client, make_codec):
+    records = build_records(QUESTIONS)
+    records[2]["status"] = "anchored"
+    records[2]["anchor_tx_hash"] = "0xabc"
+    payloads = encode_all(run, redis_client, make_codec(), records)
+
+    # A fresh table, as in another worker, resolves the IDs from Redis
+    assert run(decode_records(redis_client, StringTable(), payloads)) == records
+
+
+def test_formats_mix_and_reasoning_can_be_skipped(run, redis_client):
+    records = build_records(QUESTIONS[:2])
+    payloads = [
+        run(JSONCodec().encode(redis_client, records[0])),
+        None,
+        run(MsgpackCodec(StringTable(), main.ai_engine).encode(redis_client, records[1]))
+    ]
+
+    decoded = run(decode_records(redis_client, StringTable(), payloads, include_reasoning=False))
+    assert decoded[1] is None
+    for record, expected in zip((decoded[0], decoded[2]), records):
+        assert record == dict(expected, reasoning=None)
+
+
+def test_only_policy_strings_are_interned(run, redis_client):
+    records = build_records(["a"])
+    records.append(dict(records[0], id="decision_imported", reasoning="General decision analysis: a secret",
+                        decision="ESCALATE", category="imported"))
+    codec = MsgpackCodec(StringTable(), main.ai_engine)
+    payloads = encode_all(run, redis_client, codec, records)
+
+    interned = set(run(redis_client.hgetall(STRINGS_KEY)).values())
+    prefix, suffix = main.ai_engine.policy.split_reasoning("a", records[0]["reasoning"])
+    assert prefix == "General decision analysis: "
+    assert interned == {prefix, suffix, records[0]["decision"], records[0]["category"]}
+    assert run(decode_records(redis_client, StringTable(), payloads)) == records
+
+
+def test_split_reasoning_requires_an_exact_template():
+    policy = main.ai_engine.policy
+    reasoning = main.ai_engine.analyze_question("loan")["reasoning"]
+    assert policy.split_reasoning("loan", reasoning) is not None
+    assert policy.split_reasoning("loans", reasoning) is None
+    assert policy.split_reasoning("loan", reasoning + " edited") is None
@@ -0,0 +1,58 @@
+import copy
+import json
+import os
+
+import pytest
+
+import main
+from rule_engine import CompiledPolicy, PolicyError, load_policy_document
+
+DEFAULT_POLICY = load_policy_document(os.path.join(os.path.dirname(main.__file__), "decision_policy.json"))
+
+
+def with_change(change) -> dict:
+    document = copy.deepcopy(DEFAULT_POLICY)
+    change(document)
+    return document
+
+
+def first_rule(document: dict) -> dict:
+    return document["categories"]["financial"]["rules"][0]
+
+
+def test_default_policy_matches_the_engine():
+    policy = CompiledPolicy(DEFAULT_POLICY)
+    question = "Should I approve this loan application?"
+    assert policy.analyze(question) == main.ai_engine.analyze_question(question)
+
+
+@pytest.mark.parametrize("change", [
+    lambda document: document["confidence"].update(base="70"),
+    lambda document: document["confidence"].update(minimum=True),
+    lambda document: document["confidence"].update(maximum=float("inf")),
+    lambda document: document["categories"]["financial"].update(confidence_adjustment="5"),
+    lambda document: first_rule(document).update(when="max()"),
+    lambda document: first_rule(document).update(when="abs(approval, rejection) > 1"),
+    lambda document: first_rule(document).update(when="min(approval) > 1"),
+    lambda document: first_rule(document).update(when="max > 1"),
+    lambda document: first_rule(document).update(when="__import__('os')"),
+    lambda document: first_rule(document).update(decision=1),
+    lambda document: first_rule(document).update(reasoning="No placeholder"),
+    lambda document: document["categories"]["financial"]["rules"][-1].update(when="approval > 1"),
+])
+def test_policies_that_would_fail_at_request_time_are_rejected(change):
+    with pytest.raises(PolicyError):
+        CompiledPolicy(with_change(change))
+
+
+def test_invalid_reload_keeps_the_current_policy(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps(DEFAULT_POLICY))
+    engine = main.AIDecisionEngine(str(path))
+    fingerprint = engine.config_fingerprint
+
+    path.write_text(json.dumps(with_change(lambda document: document["confidence"].update(base="70"))))
+    with pytest.raises(PolicyError):
+        engine.reload_policy()
+    assert engine.config_fingerprint == fingerprint
+    assert engine.analyze_question("Should I approve this loan?")["decision"]
@@ -0,0 +1,102 @@
+import pytest
+
+import main
+from validation import TALLY_KEY_PREFIX, ValidationTally
+
+
+def vote(decision_id: str, validator: str, is_valid: bool) -> dict:
+    return {"decision_id": decision_id, "validator": validator, "is_valid": is_valid}
+
+
+@pytest.fixture
+def decision_ids(run, api):
+    response = run(api.post("/api/decisions/batch", json={"decisions": [{"question": f"Question {i}"} for i in range(3)]}))
+    return [decision["id"] for decision in response.json()["decisions"]]
+
+
+def submit(run, api, votes) -> dict:
+    response = run(api.post("/api/decisions/validations", json={"votes": votes}))
+    response.raise_for_status()
+    return response.json()
+
+
+def status_of(run, api, decision_id: str) -> str:
+    return run(api.get(f"/api/decisions/{decision_id}")).json()["status"]
+
+
+def test_vote_script_counts_each_validator_once_and_closes_at_quorum(run, redis_client):
+    tally = ValidationTally(quorum=2)
+    results, progress = run(tally.submit(redis_client, [
+        vote("d1", "a", True), vote("d1", "a", False), vote("d1", "b", True), vote("d1", "c", False), vote("d2", "a", False)
+    ], {"d1": "pending", "d2": "pending"}))
+
+    assert results == ["accepted", "duplicate", "accepted", "closed", "accepted"]
+    assert progress["d1"] == {"quorum": 2, "approvals": 2, "rejections": 0, "outcome": "validated"}
+    assert progress["d2"] == {"quorum": 2, "approvals": 0, "rejections": 1, "outcome": None}
+    assert [v["validator"] for v in run(tally.get(redis_client, "d1"))["votes"]] == ["a", "b"]
+
+
+def test_settled_status_closes_an_expired_tally(run, redis_client):
+    tally = ValidationTally(quorum=1)
+    results, progress = run(tally.submit(redis_client, [vote("d1", "a", True)], {"d1": "rejected"}))
+    assert results == ["closed"]
+    assert progress["d1"]["outcome"] == "rejected"
+
+
+def test_validate_closes_the_tally(run, api, decision_ids):
+    assert run(api.post(f"/api/decisions/{decision_ids[0]}/validate")).status_code == 200
+
+    result = submit(run, api, [vote(decision_ids[0], f"v{i}", False) for i in range(3)])
+    assert result["closed"] == 3
+    assert status_of(run, api, decision_ids[0]) == "validated"
+
+
+def test_validate_refuses_a_rejected_decision(run, api, decision_ids):
+    submit(run, api, [vote(decision_ids[0], f"v{i}", False) for i in range(3)])
+
+    response = run(api.post(f"/api/decisions/{decision_ids[0]}/validate"))
+    assert response.status_code == 409
+    assert status_of(run, api, decision_ids[0]) == "rejected"
+    assert run(api.post("/api/decisions/decision_missing/validate")).status_code == 404
+
+
+def test_outcome_whose_status_update_failed_is_applied_by_the_next_vote(run, api, decision_ids, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("update failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main, "update_decisions", fail)
+        response = run(api.post("/api/decisions/validations", json={
+            "votes": [vote(decision_ids[1], f"v{i}", False) for i in range(3)]
+        }))
+        assert response.status_code == 500
+    assert status_of(run, api, decision_ids[1]) == "pending"
+
+    result = submit(run, api, [vote(decision_ids[1], "late", True)])
+    assert result["closed"] == 1
+    assert status_of(run, api, decision_ids[1]) == "rejected"
+
+
+def test_each_settled_decision_is_updated_under_its_own_watch(run, api, redis_client, decision_ids, monkeypatch):
+    watched = []
+    real_transaction = redis_client.transaction
+
+    async def transaction(func, *keys, **kwargs):
+        watched.append(keys)
+        return await real_transaction(func, *keys, **kwargs)
+
+    monkeypatch.setattr(redis_client, "transaction", transaction)
+    submit(run, api, [vote(decision_id, f"v{i}", True) for decision_id in decision_ids for i in range(3)])
+
+    assert sorted(watched) == sorted((f"decision:{decision_id}",) for decision_id in decision_ids)
+    assert all(status_of(run, api, decision_id) == "validated" for decision_id in decision_ids)
+
+
+def test_expired_tally_does_not_reopen_voting(run, api, redis_client, decision_ids):
+    submit(run, api, [vote(decision_ids[2], f"v{i}", False) for i in range(3)])
+    run(redis_client.delete(TALLY_KEY_PREFIX + decision_ids[2]))
+
+    result = submit(run, api, [vote(decision_ids[2], f"w{i}", True) for i in range(3)])
+    assert result["closed"] == 3
+    assert status_of(run, api, decision_ids[2]) == "rejected"
+    assert run(api.get(f"/api/decisions/{decision_ids[2]}/validation")).json()["outcome"] == "rejected"
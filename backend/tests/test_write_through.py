@@ -0,0 +1,78 @@
+import asyncio
+
+import main
+
+FIELDS = ("status", "anchor_tx_hash")
+
+
+def create_decision(run, api) -> str:
+    return run(api.post("/api/decisions", json={"question": "Should we approve this loan?"})).json()["decision"]["id"]
+
+
+def stored_fields(run, repository, decision_id: str) -> dict:
+    stored = run(repository.get(decision_id))
+    return {field: stored.get(field) for field in FIELDS}
+
+
+def cached_fields(run, decision_id: str) -> dict:
+    cached = run(main.read_decision(decision_id))
+    return {field: cached.get(field) for field in FIELDS}
+
+
+def validate(decision_dict: dict) -> None:
+    decision_dict["status"] = "validated"
+
+
+def test_delayed_write_does_not_overwrite_a_later_one(run, api, repository, monkeypatch):
+    decision_id = create_decision(run, api)
+    compare_and_set_many = repository.compare_and_set_many
+    release = asyncio.Event()
+    calls = []
+
+    async def delayed(updates):
+        calls.append(updates)
+        if len(calls) == 1:
+            # The anchoring update reaches the repository after the validation made after it in Redis
+            await release.wait()
+        return await compare_and_set_many(updates)
+
+    monkeypatch.setattr(repository, "compare_and_set_many", delayed)
+
+    async def scenario():
+        anchoring = asyncio.create_task(main.mark_anchored({decision_id: "0xabc"}))
+        await asyncio.sleep(0.01)
+        validation = asyncio.create_task(main.update_decision(decision_id, validate))
+        await asyncio.sleep(0.02)
+        release.set()
+        await asyncio.gather(anchoring, validation)
+
+    run(scenario())
+    assert cached_fields(run, decision_id) == {"status": "validated", "anchor_tx_hash": "0xabc"}
+    assert stored_fields(run, repository, decision_id) == {"status": "validated", "anchor_tx_hash": "0xabc"}
+    # Each write carries only the fields its update changed
+    assert [changes for updates in calls for _, changes, _ in updates][0] == {"status": "anchored", "anchor_tx_hash": "0xabc"}
+
+
+def test_lost_write_is_recovered_from_redis(run, api, repository, monkeypatch):
+    decision_id = create_decision(run, api)
+
+    async def lost(changes):
+        pass
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main, "write_through", lost)
+        run(main.mark_anchored({decision_id: "0xabc"}))
+    assert stored_fields(run, repository, decision_id) == {"status": "pending", "anchor_tx_hash": None}
+
+    monkeypatch.setattr(main, "WRITE_THROUGH_ATTEMPTS", 2)
+    run(main.update_decision(decision_id, validate))
+    assert stored_fields(run, repository, decision_id) == {"status": "validated", "anchor_tx_hash": "0xabc"}
+
+
+def test_expired_record_is_updated_in_the_repository(run, api, repository, redis_client):
+    decision_id = create_decision(run, api)
+    run(redis_client.delete(f"decision:{decision_id}"))
+
+    run(main.update_decision(decision_id, validate))
+    assert stored_fields(run, repository, decision_id)["status"] == "validated"
+    assert run(main.update_decision("decision_missing", validate)) is None
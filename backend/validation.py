@@ -0,0 +1,146 @@
+"""Multi-validator voting on decisions with quorum aggregation
+
+Mirrors the NeurochainDecision contract: many validators vote on a
+decision, each at most once, and the decision is settled once enough of
+them agree. Approvals reaching the quorum validate it; rejections
+reaching the quorum reject it. Votes after that are refused.
+
+Each decision's tally is a Redis hash holding one field per validator
+plus the approval and rejection counts and the outcome. A batch of votes
+for any number of decisions is applied by one Lua script, so every vote
+is a field-level update made atomically with its count: concurrent
+batches from any number of workers never lose or double-count a vote.
+
+The tally is the authority on a decision's outcome and the decision's
+status follows it. Every batch brings the status of each decision it
+touches in line with the tally, so an outcome whose status update failed
+is applied by the next vote. Tallies expire VALIDATION_TTL seconds after
+their last vote; a decision already validated or rejected passes its
+status back in as the outcome, so an expired tally never reopens voting.
+"""
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+TALLY_KEY_PREFIX = "validation:"
+VOTE_FIELD_PREFIX = "vote:"
+
+# Decision statuses that close voting
+SETTLED_STATUSES = ("validated", "rejected")
+
+# Results of a single vote
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+CLOSED = "closed"
+NOT_FOUND = "not_found"
+
+# KEYS are the tallies of the decisions voted on. ARGV holds the quorum and
+# the TTL in ms, then per key the outcome to close it with if it has none
+# ('' to leave it open), then four values per vote: the index of its tally
+# in KEYS, the validator, 1 to approve or 0 to reject, and the stored vote.
+# Returns {result per vote, {approvals, rejections, outcome} per key}.
+VOTE_SCRIPT = """
+local quorum = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+for index, key in ipairs(KEYS) do
+    local outcome = ARGV[2 + index]
+    if outcome ~= '' then
+        redis.call('HSETNX', key, 'outcome', outcome)
+    end
+end
+local results = {}
+for i = 3 + #KEYS, #ARGV, 4 do
+    local key = KEYS[tonumber(ARGV[i])]
+    if redis.call('HEXISTS', key, 'outcome') == 1 then
+        results[#results + 1] = 'closed'
+    elseif redis.call('HSETNX', key, 'vote:' .. ARGV[i + 1], ARGV[i + 3]) == 0 then
+        results[#results + 1] = 'duplicate'
+    else
+        local approve = ARGV[i + 2] == '1'
+        local count = redis.call('HINCRBY', key, approve and 'approvals' or 'rejections', 1)
+        if count >= quorum then
+            redis.call('HSET', key, 'outcome', approve and 'validated' or 'rejected')
+        end
+        results[#results + 1] = 'accepted'
+    end
+end
+local progress = {}
+for index, key in ipairs(KEYS) do
+    local tally = redis.call('HMGET', key, 'approvals', 'rejections', 'outcome')
+    redis.call('PEXPIRE', key, ttl)
+    progress[index] = {tonumber(tally[1]) or 0, tonumber(tally[2]) or 0, tally[3] or ''}
+end
+return {results, progress}
+"""
+
+
+def _progress(quorum: int, approvals: int, rejections: int, outcome: Optional[str]) -> dict:
+    return {
+        "quorum": quorum,
+        "approvals": approvals,
+        "rejections": rejections,
+        "outcome": outcome or None
+    }
+
+
+class ValidationTally:
+    def __init__(self, quorum: int = 3, ttl: float = 7 * 86400):
+        if quorum < 1:
+            raise ValueError("Validation quorum must be at least 1")
+        self.quorum = quorum
+        self.ttl = ttl
+        self._script = None
+
+    async def submit(self, client: redis.Redis, votes: List[dict],
+                     statuses: Dict[str, str]) -> Tuple[List[str], Dict[str, dict]]:
+        """Record votes ({decision_id, validator, is_valid, reason}) in one round trip
+
+        `statuses` holds the current status of every decision voted on; it
+        closes the tally of any decision already validated or rejected.
+        Returns the result of each vote and the progress of every decision.
+        """
+        if self._script is None:
+            self._script = client.register_script(VOTE_SCRIPT)
+
+        indexes: Dict[str, int] = {}
+        vote_args = []
+        now = time.time()
+        for vote in votes:
+            index = indexes.setdefault(vote["decision_id"], len(indexes) + 1)
+            stored = json.dumps({"is_valid": vote["is_valid"], "reason": vote.get("reason"), "timestamp": now})
+            vote_args += [index, vote["validator"], int(vote["is_valid"]), stored]
+        for decision_id in statuses:
+            indexes.setdefault(decision_id, len(indexes) + 1)
+        if not indexes:
+            return [], {}
+
+        closing = [statuses.get(decision_id) if statuses.get(decision_id) in SETTLED_STATUSES else "" for decision_id in indexes]
+        results, tallies = await self._script(
+            keys=[TALLY_KEY_PREFIX + decision_id for decision_id in indexes],
+            args=[self.quorum, int(self.ttl * 1000), *closing, *vote_args]
+        )
+        progress = {
+            decision_id: _progress(self.quorum, approvals, rejections, outcome)
+            for decision_id, (approvals, rejections, outcome) in zip(indexes, tallies)
+        }
+        return results, progress
+
+    async def close(self, client: redis.Redis, decision_id: str, outcome: str) -> dict:
+        """Settle a decision's tally with `outcome` unless it is already settled, and return its progress"""
+        _, progress = await self.submit(client, [], {decision_id: outcome})
+        return progress[decision_id]
+
+    async def get(self, client: redis.Redis, decision_id: str) -> dict:
+        """Return a decision's progress towards quorum and its individual votes"""
+        tally = await client.hgetall(TALLY_KEY_PREFIX + decision_id)
+        votes = []
+        for field, value in tally.items():
+            if field.startswith(VOTE_FIELD_PREFIX):
+                votes.append({"validator": field[len(VOTE_FIELD_PREFIX):], **json.loads(value)})
+        votes.sort(key=lambda vote: vote["timestamp"])
+
+        progress = _progress(self.quorum, int(tally.get("approvals", 0)), int(tally.get("rejections", 0)), tally.get("outcome"))
+        progress["votes"] = votes
+        return progress
@@ -3,6 +3,7 @@ export const API_CONFIG = {
   BASE_URL: process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000',
   ENDPOINTS: {
     DECISIONS: '/api/decisions',
+    DECISION_STREAM: '/api/decisions/stream',
     STATS: '/api/stats',
     HEALTH: '/health'
   },